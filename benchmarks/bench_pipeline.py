@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Throughput and peak memory of the dictionary generation hot paths
+(kana_to_romaji, classify_entry, normalize_entry, build_entry, conjugate,
+conjugate_many, deconjugate_many) over the real dictionary and synthetic
+lexicons, compared against a JSON baseline. Throughput is recorded relative
+to a fixed reference workload timed in the same run, so the baseline holds
+no absolute timings.
+
+Synthetic lexicons are the real raw entries repeated with a distinct kana
+prefix per copy, generated and measured in chunks so a 1M-entry run does not
+hold the whole lexicon in memory. Peak memory is measured in a second,
+tracemalloc pass so it does not distort the timings.
+
+    python benchmarks/bench_pipeline.py                        # compare with baseline
+    python benchmarks/bench_pipeline.py --save                 # record a new baseline
+    python benchmarks/bench_pipeline.py --sizes 10000 --threshold 0.1
+
+Relative throughput still moves with CPU frequency and load, so a drop
+beyond --threshold is reported as drift and only fails the run with
+--strict. Peak memory is deterministic and exits non-zero when it grows by
+more than --threshold.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from conjugation_engine import conjugate, conjugate_many  # noqa: E402
+from deconjugator import deconjugate_many  # noqa: E402
+from generate_dictionary_jisho import (  # noqa: E402
+    build_entry, classify_entry, kana_to_romaji, normalize_entry, prepare_entry,
+)
+from jisho_stub_server import fixture_from_dictionary  # noqa: E402
+
+DICTIONARY_FILE = os.path.join(ROOT, "src/data/dictionaries/dictionary.json")
+BASELINE_FILE = os.path.join(ROOT, "benchmarks/baseline.json")
+SIZES = [10_000, 100_000, 1_000_000]
+CHUNK = 10_000
+THRESHOLD = 0.25
+REPEAT_LIMIT = 100_000  # larger lexicons are timed once; their many chunks already average out noise
+# Syllables for the per-copy prefixes of synthetic entries
+_PREFIX_KANA = 'あいうえおかきくけこさしすせそたちつてとなにぬねのはひふへほまみむめもやゆよらりるれろわ'
+
+
+def real_entries(path=DICTIONARY_FILE):
+    """[(raw Jisho result, level)] for every word in the dictionary."""
+    return [(raw, level.upper())
+            for level, raws in fixture_from_dictionary(path).items() for raw in raws]
+
+
+def _prefix(n):
+    digits = []
+    while True:
+        n, d = divmod(n, len(_PREFIX_KANA))
+        digits.append(_PREFIX_KANA[d])
+        if not n:
+            return ''.join(digits)
+
+
+def synthetic_chunks(base, size, chunk=CHUNK):
+    """Yield lists of (raw, level) adding up to `size`, each copy of `base` prefixed differently."""
+    out = []
+    for i in range(size):
+        raw, level = base[i % len(base)]
+        copy = i // len(base)
+        if copy:
+            japanese = raw['japanese'][0]
+            prefix = _prefix(copy)
+            # 来る stays as is: a prefixed くる would no longer classify as kuru
+            if japanese['reading'] != 'くる':
+                reading = prefix + japanese['reading']
+                raw = dict(raw, japanese=[{'word': prefix + japanese['word'], 'reading': reading}])
+        out.append((raw, level))
+        if len(out) == chunk:
+            yield out
+            out = []
+    if out:
+        yield out
+
+
+# ---------------------------------------------------------------------------
+# Stages: each takes a chunk and returns (callable, items it processes)
+# ---------------------------------------------------------------------------
+def _stage_reference(chunk, state):
+    """Fixed dict-lookup loop over every reading: the yardstick stage throughput is divided by."""
+    texts = [raw['japanese'][0]['reading'] for raw, _ in chunk]
+    table = {ch: i for i, ch in enumerate(_PREFIX_KANA)}
+    return (lambda: [sum(table.get(ch, 0) for ch in text) for text in texts]), len(texts)
+
+
+def _stage_romaji(chunk, state):
+    texts = [raw['japanese'][0]['reading'] for raw, _ in chunk]
+    return (lambda: [kana_to_romaji(t) for t in texts]), len(texts)
+
+
+def _stage_classify(chunk, state):
+    raws = [raw for raw, _ in chunk]
+    return (lambda: [classify_entry(r) for r in raws]), len(raws)
+
+
+def _stage_normalize(chunk, state):
+    raws = [raw for raw, _ in chunk]
+    return (lambda: [normalize_entry(r) for r in raws]), len(raws)
+
+
+def _stage_build(chunk, state):
+    used_ids = state.setdefault('used_ids', set())
+    return (lambda: [build_entry(raw, level, used_ids) for raw, level in chunk]), len(chunk)
+
+
+def _pairs(chunk):
+    prepared = [prepare_entry(raw) for raw, _ in chunk]
+    return [(p.kana, p.group) for p in prepared if p]
+
+
+def _stage_conjugate(chunk, state):
+    pairs = _pairs(chunk)
+    return (lambda: [conjugate(kana, group) for kana, group in pairs]), len(pairs)
+
+
+def _stage_conjugate_many(chunk, state):
+    pairs = _pairs(chunk)
+    return (lambda: conjugate_many(pairs)), len(pairs)
+
+
+def _stage_deconjugate_many(chunk, state):
+    surfaces = [surface for conj in conjugate_many(_pairs(chunk)) if conj for surface in conj.values()]
+    return (lambda: deconjugate_many(surfaces)), len(surfaces)
+
+
+STAGES = {
+    'kana_to_romaji': _stage_romaji,
+    'classify_entry': _stage_classify,
+    'normalize_entry': _stage_normalize,
+    'build_entry': _stage_build,
+    'conjugate': _stage_conjugate,
+    'conjugate_many': _stage_conjugate_many,
+    'deconjugate_many': _stage_deconjugate_many,
+}
+
+
+def run_stage(setup, chunks, repeat=1):
+    """Best-of-`repeat` seconds and item count for one stage over all chunks."""
+    best, items = float('inf'), 0
+    for _ in range(repeat):
+        state, elapsed, items = {}, 0.0, 0
+        for chunk in chunks():
+            fn, n = setup(chunk, state)
+            start = time.perf_counter()
+            fn()
+            elapsed += time.perf_counter() - start
+            items += n
+        best = min(best, elapsed)
+    return best, items
+
+
+def peak_memory(setup, chunks):
+    """Largest number of bytes a single chunk's call allocates on top of what was live before it."""
+    state, peak = {}, 0
+    tracemalloc.start()
+    try:
+        for chunk in chunks():
+            fn, _ = setup(chunk, state)
+            baseline = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            result = fn()
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - baseline)
+            del result
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def run_suite(base, sizes, repeat, measure_memory=True):
+    lexicons = {'real': (len(base), lambda: [base])}
+    for size in sizes:
+        lexicons[f"synthetic-{size}"] = (size, lambda size=size: synthetic_chunks(base, size))
+
+    results = {}
+    for name, (size, chunks) in lexicons.items():
+        results[name] = {}
+        passes = repeat if size <= REPEAT_LIMIT else 1
+        seconds, items = run_stage(_stage_reference, chunks, passes)
+        reference = items / seconds
+        for stage, setup in STAGES.items():
+            seconds, items = run_stage(setup, chunks, passes)
+            record = {'items': items, 'seconds': round(seconds, 4),
+                      'items_per_second': round(items / seconds) if seconds else 0,
+                      'relative': round(items / seconds / reference, 4) if seconds else 0}
+            if measure_memory:
+                record['peak_bytes'] = peak_memory(setup, chunks)
+            results[name][stage] = record
+            print(f"  {name:<18} {stage:<16} {record['items_per_second']:>10,}/s"
+                  f" ({record['relative']:.3f}x reference)"
+                  + (f"  peak {record['peak_bytes'] / 1024:>9,.0f} KiB" if measure_memory else ''),
+                  file=sys.stderr)
+    return results
+
+
+def baseline_record(record):
+    """The part of a result that is kept in the baseline: no absolute timings."""
+    return {key: record[key] for key in ('items', 'relative', 'peak_bytes') if key in record}
+
+
+def compare(results, baseline, threshold):
+    """Yield (lexicon, stage, metric, baseline value, current value) for every regression."""
+    for name, stages in results.items():
+        for stage, record in stages.items():
+            old = baseline.get(name, {}).get(stage)
+            if not old:
+                continue
+            if 'relative' in old and record['relative'] < old['relative'] * (1 - threshold):
+                yield name, stage, 'relative', old['relative'], record['relative']
+            if 'peak_bytes' in record and 'peak_bytes' in old \
+                    and record['peak_bytes'] > old['peak_bytes'] * (1 + threshold):
+                yield name, stage, 'peak_bytes', old['peak_bytes'], record['peak_bytes']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='*', default=SIZES,
+                        help='synthetic lexicon sizes (default: %(default)s)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help=f'timed passes per stage, best kept, for lexicons up to {REPEAT_LIMIT:,} entries')
+    parser.add_argument('--dictionary', default=DICTIONARY_FILE)
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--save', action='store_true', help='write the results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help='allowed relative regression (default: %(default)s)')
+    parser.add_argument('--strict', action='store_true',
+                        help='also fail when relative throughput drifts beyond --threshold')
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc pass')
+    parser.add_argument('--output', help='also write this run\'s results here')
+    args = parser.parse_args()
+
+    base = real_entries(args.dictionary)
+    print(f"{len(base)} real entries; synthetic sizes {args.sizes}", file=sys.stderr)
+    results = run_suite(base, args.sizes, args.repeat, not args.no_memory)
+    report = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    print(f"{'Lexicon':<18} | {'Stage':<16} | {'Items':>9} | {'Items/s':>10} | {'Relative':>8} | {'Peak KiB':>9}")
+    print("-" * 86)
+    for name, stages in results.items():
+        for stage, record in stages.items():
+            peak = f"{record['peak_bytes'] / 1024:>9,.0f}" if 'peak_bytes' in record else f"{'-':>9}"
+            print(f"{name:<18} | {stage:<16} | {record['items']:>9,} | "
+                  f"{record['items_per_second']:>10,} | {record['relative']:>8.3f} | {peak}")
+
+    if args.save:
+        baseline = dict(report, results={name: {stage: baseline_record(record)
+                                                for stage, record in stages.items()}
+                                         for name, stages in results.items()})
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save to record one")
+        return
+
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)['results']
+    regressions = list(compare(results, baseline, args.threshold))
+    drift = [r for r in regressions if r[2] == 'relative']
+    for name, stage, metric, old, new in regressions:
+        mark = '❌' if metric != 'relative' or args.strict else '  drift:'
+        print(f"{mark} {name} {stage}: {metric} {old:,} -> {new:,}")
+    failures = regressions if args.strict else [r for r in regressions if r[2] != 'relative']
+    if failures:
+        print(f"❌ {len(failures)} regressions beyond {args.threshold:.0%}")
+        sys.exit(1)
+    if drift:
+        print(f"✅ Peak memory within {args.threshold:.0%}; {len(drift)} stages drifted in relative "
+              f"throughput (not a failure without --strict)")
+        return
+    print(f"✅ No stage regressed by more than {args.threshold:.0%}")
+
+
+if __name__ == '__main__':
+    main()
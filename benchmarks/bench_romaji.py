@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Throughput of kana_to_romaji over every dictionary form and conjugation in
+dictionary.json, compared with the previous list-scanning converter.
+Exits non-zero if the two ever disagree.
+
+    python benchmarks/bench_romaji.py [--repeat 5]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from generate_dictionary_jisho import _ROMAJI_MAP, kana_to_romaji, kana_to_romaji_many  # noqa: E402
+
+DICTIONARY_FILE = os.path.join(ROOT, "src/data/dictionaries/dictionary.json")
+
+
+def kana_to_romaji_scan(text):
+    """The original converter: linear scan of _ROMAJI_MAP at every position."""
+    result = ''
+    i = 0
+    while i < len(text):
+        if text[i] == 'っ':
+            if i + 1 < len(text):
+                for kana, romaji in _ROMAJI_MAP:
+                    if text[i+1:].startswith(kana) and romaji and romaji[0] not in 'aeiou':
+                        result += romaji[0]
+                        break
+            i += 1
+            continue
+        matched = False
+        for kana, romaji in _ROMAJI_MAP:
+            if text[i:].startswith(kana):
+                result += romaji
+                i += len(kana)
+                matched = True
+                break
+        if not matched:
+            result += text[i]
+            i += 1
+    return result
+
+
+def dictionary_strings(path=DICTIONARY_FILE):
+    with open(path, 'r', encoding='utf-8') as f:
+        words = json.load(f)['words']
+    strings = []
+    for word in words:
+        strings.append(word['dictionary_form']['kana'])
+        strings.extend(word['conjugations'].values())
+    return strings
+
+
+def best_time(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--dictionary', default=DICTIONARY_FILE)
+    args = parser.parse_args()
+
+    strings = dictionary_strings(args.dictionary)
+    chars = sum(map(len, strings))
+
+    mismatches = [(s, kana_to_romaji_scan(s), kana_to_romaji(s))
+                  for s in strings if kana_to_romaji_scan(s) != kana_to_romaji(s)]
+    for text, old, new in mismatches[:20]:
+        print(f"MISMATCH {text}: {old!r} != {new!r}")
+
+    timings = {
+        'scan (old)': best_time(lambda: [kana_to_romaji_scan(s) for s in strings], args.repeat),
+        'trie': best_time(lambda: [kana_to_romaji(s) for s in strings], args.repeat),
+        'trie batch': best_time(lambda: kana_to_romaji_many(strings), args.repeat),
+    }
+
+    print(f"{len(strings)} strings ({len(set(strings))} distinct, {chars} chars), best of {args.repeat}")
+    print(f"{'Converter':<12} | {'Seconds':>8} | {'Strings/s':>12} | {'Chars/s':>12}")
+    print("-" * 54)
+    for name, seconds in timings.items():
+        print(f"{name:<12} | {seconds:>8.4f} | {len(strings) / seconds:>12,.0f} | {chars / seconds:>12,.0f}")
+
+    if mismatches:
+        print(f"❌ {len(mismatches)} strings differ from the old converter")
+        sys.exit(1)
+    print("✅ Output identical to the old converter")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Compact stem + suffix-id encoding of dictionary.json / base.json.
+
+Almost every conjugation is the entry's stem plus one of a few dozen
+suffixes, so the compact format stores each entry's stem once and every
+form as an index into an interned suffix table. Fields are laid out in
+columns, one array per field:
+
+    {
+      "format": "katachi-compact/1",
+      "version": "2.0",
+      "suffixes": ["", "ます", ...],           # interned, most frequent first
+      "form_sets": [["polite", ...], ...],    # conjugation key orders
+      "levels": [...], "groups": [...], "word_types": [...],
+      "columns": {
+        "id": [null | "explicit id", ...],    # null: id_prefix + romaji
+        "level": [i, ...], "group": [i, ...], "word_type": [i, ...],
+        "kanji": [...], "stem": [...], "kana": [suffix id, ...], "romaji": [...],
+        "meaning": [...],                     # only if the source had meanings
+        "form_set": [i, ...],
+        "forms": [suffix id, ...]             # flat, form_set lengths apart
+      }
+    }
+
+`decode` reproduces the original JSON exactly, key order included.
+
+    python compact_dictionary.py [--input FILE] [--output FILE]
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+
+from conjugation_engine import ID_PREFIX
+
+DICTIONARY_FILE = "src/data/dictionaries/dictionary.json"
+FORMAT = "katachi-compact/1"
+
+
+def _common_prefix(strings):
+    first = min(strings)
+    last = max(strings)
+    n = 0
+    for a, b in zip(first, last):
+        if a != b:
+            break
+        n += 1
+    return first[:n]
+
+
+class _Interner:
+    def __init__(self):
+        self.index = {}
+        self.values = []
+
+    def __call__(self, value):
+        i = self.index.get(value)
+        if i is None:
+            i = self.index[value] = len(self.values)
+            self.values.append(value)
+        return i
+
+
+def encode(dictionary):
+    """Encode a {"version", "words"} dictionary into the compact columnar format."""
+    words = dictionary['words']
+    has_meaning = any('meaning' in w for w in words)
+
+    # Count suffixes first so the most frequent get the smallest ids
+    stems = []
+    counts = {}
+    for word in words:
+        kana = word['dictionary_form']['kana']
+        forms = list(word['conjugations'].values())
+        stem = _common_prefix(forms + [kana])
+        stems.append(stem)
+        for text in forms + [kana]:
+            suffix = text[len(stem):]
+            counts[suffix] = counts.get(suffix, 0) + 1
+    suffixes = sorted(counts, key=lambda s: (-counts[s], s))
+    suffix_id = {s: i for i, s in enumerate(suffixes)}
+
+    form_sets, levels, groups, word_types = _Interner(), _Interner(), _Interner(), _Interner()
+    columns = {name: [] for name in (
+        'id', 'level', 'group', 'word_type', 'kanji', 'stem', 'kana', 'romaji',
+        'meaning', 'form_set', 'forms')}
+
+    for word, stem in zip(words, stems):
+        form = word['dictionary_form']
+        derived_id = ID_PREFIX.get(word.get('word_type'), '') + form['romaji']
+        columns['id'].append(None if word['id'] == derived_id else word['id'])
+        columns['level'].append(levels(word['level']))
+        columns['group'].append(groups(word['group']))
+        columns['word_type'].append(word_types(word.get('word_type')))
+        columns['kanji'].append(form['kanji'])
+        columns['stem'].append(stem)
+        columns['kana'].append(suffix_id[form['kana'][len(stem):]])
+        columns['romaji'].append(form['romaji'])
+        columns['meaning'].append(word.get('meaning', ''))
+        columns['form_set'].append(form_sets(tuple(word['conjugations'])))
+        columns['forms'].extend(suffix_id[v[len(stem):]] for v in word['conjugations'].values())
+
+    if not has_meaning:
+        del columns['meaning']
+
+    return {
+        'format': FORMAT,
+        'version': dictionary['version'],
+        'suffixes': suffixes,
+        'form_sets': [list(keys) for keys in form_sets.values],
+        'levels': levels.values,
+        'groups': groups.values,
+        'word_types': word_types.values,
+        'columns': columns,
+    }
+
+
+def decode(compact):
+    """Reference decoder: rebuild the original {"version", "words"} dictionary."""
+    if compact.get('format') != FORMAT:
+        raise ValueError(f"unsupported format {compact.get('format')!r}")
+    suffixes = compact['suffixes']
+    form_sets = compact['form_sets']
+    levels, groups, word_types = compact['levels'], compact['groups'], compact['word_types']
+    columns = compact['columns']
+    meanings = columns.get('meaning')
+    forms = columns['forms']
+
+    words = []
+    cursor = 0
+    for i, stem in enumerate(columns['stem']):
+        word_type = word_types[columns['word_type'][i]]
+        romaji = columns['romaji'][i]
+        keys = form_sets[columns['form_set'][i]]
+        ids = forms[cursor:cursor + len(keys)]
+        cursor += len(keys)
+
+        word = {
+            'id': columns['id'][i] or ID_PREFIX.get(word_type, '') + romaji,
+            'level': levels[columns['level'][i]],
+            'group': groups[columns['group'][i]],
+        }
+        if word_type is not None:
+            word['word_type'] = word_type
+        word['dictionary_form'] = {
+            'kanji': columns['kanji'][i],
+            'kana': stem + suffixes[columns['kana'][i]],
+            'romaji': romaji,
+        }
+        if meanings is not None:
+            word['meaning'] = meanings[i]
+        word['conjugations'] = {key: stem + suffixes[s] for key, s in zip(keys, ids)}
+        words.append(word)
+
+    return {'version': compact['version'], 'words': words}
+
+
+def write_compact(input_path, output_path):
+    """Encode input_path into output_path; returns (original bytes, compact bytes)."""
+    with open(input_path, 'rb') as f:
+        original = f.read()
+    compact = encode(json.loads(original))
+    body = json.dumps(compact, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    with open(output_path, 'wb') as f:
+        f.write(body)
+    return original, body
+
+
+def _best_time(fn, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--input', default=DICTIONARY_FILE)
+    parser.add_argument('--output', help='default: <input>.compact.json')
+    args = parser.parse_args()
+    output = args.output or os.path.splitext(args.input)[0] + '.compact.json'
+
+    original, body = write_compact(args.input, output)
+
+    # Round trip must reproduce the original file byte for byte
+    decoded = decode(json.loads(body))
+    round_trip = json.dumps(decoded, ensure_ascii=False, indent=2).encode('utf-8')
+    ok = round_trip == original
+
+    parse_original = _best_time(lambda: json.loads(original))
+    parse_compact = _best_time(lambda: json.loads(body))
+    parse_decode = _best_time(lambda: decode(json.loads(body)))
+
+    print(f"{'Format':<10} | {'Bytes':>10} | {'Gzip':>9} | {'json.loads':>10} | {'+ decode':>10}")
+    print("-" * 62)
+    print(f"{'json':<10} | {len(original):>10,} | {len(gzip.compress(original)):>9,} | "
+          f"{parse_original * 1000:>8.2f}ms | {'':>10}")
+    print(f"{'compact':<10} | {len(body):>10,} | {len(gzip.compress(body)):>9,} | "
+          f"{parse_compact * 1000:>8.2f}ms | {parse_decode * 1000:>8.2f}ms")
+    print(f"Wrote {output}")
+    if not ok:
+        print("❌ Round trip differs from the original JSON")
+        sys.exit(1)
+    print("✅ Round trip matches the original JSON byte for byte")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Mines the most confusable real forms for every (word id, conjugation type):
+for each type, every word's form is scored against every other word's form
+of that type, and the top K are kept as candidate distractors that look like
+real answers rather than rule-made fakes (see generate_distractors.py for
+those). This is a build stage only: the app does not read the table yet.
+
+Pairs are ranked by edit distance, then by the length of the suffix they
+share (たべます is closer to しらべます than to よみます), then by word order
+so the result is deterministic. Identical forms are never offered: they
+would be correct answers.
+
+With NumPy the forms are encoded as padded code-point arrays and the
+matrix is computed a block of BLOCK x BLOCK pairs at a time, keeping only a
+running top K per row, so memory stays flat however large the vocabulary.
+Distances come from Myers' bit-parallel algorithm, one 64-bit word per pair
+(a plain DP row by row for forms longer than 64), and since the matrix is
+symmetric each block pair is scored once and used for both sides. Without
+NumPy the same scores are computed pair by pair, which gives identical
+output, only slower.
+
+Output (compact JSON):
+
+    {
+      "version": "2.0",
+      "k": 5,
+      "types": ["polite", ...],       # column order of every row
+      "ids": ["v_taberu", ...],
+      "entries": {id: [[index into ids, ...] | null per type]}
+    }
+
+A cell lists the words whose form of that type is most confusable with this
+word's, closest first; the strings are those words' conjugations.
+
+    python confusability.py [--input FILE] [--output FILE] [--k 5] [--check]
+"""
+
+import argparse
+import heapq
+import json
+import sys
+import time
+
+from conjugation_engine import VERB_FORMS
+
+try:
+    import numpy as np
+except ImportError:  # optional; the pure Python path gives the same output
+    np = None
+
+BASE_FILE = "src/data/dictionaries/base.json"
+OUTPUT_FILE = "src/data/dictionaries/confusable.json"
+TOP_K = 5
+BLOCK = 512  # rows and columns of the matrix scored at once
+
+
+def _score_key(distance, shared, column, max_len, n):
+    """One integer ordering pairs by distance, then longer shared suffix, then column."""
+    return (distance * (max_len + 1) + (max_len - shared)) * n + column
+
+
+def edit_distance(a, b):
+    """(Levenshtein distance, length of the shared suffix) of two strings."""
+    p = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        p += 1
+    s = 0
+    for x, y in zip(reversed(a), reversed(b)):
+        if x != y:
+            break
+        s += 1
+    shared = s
+    # A common prefix or suffix never changes the distance
+    s = min(s, len(a) - p, len(b) - p)
+    a, b = a[p:len(a) - s], b[p:len(b) - s]
+    if not a or not b:
+        return len(a) + len(b), shared
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+        prev = cur
+    return prev[-1], shared
+
+
+def top_k_python(forms, k=TOP_K, block=BLOCK):
+    """For each form, the indices of the k most confusable other forms, closest first."""
+    n = len(forms)
+    max_len = max(map(len, forms), default=0)
+    results = []
+    for r0 in range(0, n, block):
+        for row in range(r0, min(r0 + block, n)):
+            a = forms[row]
+            keys = []
+            for c0 in range(0, n, block):
+                block_keys = []
+                for column in range(c0, min(c0 + block, n)):
+                    b = forms[column]
+                    if b == a:
+                        continue
+                    distance, shared = edit_distance(a, b)
+                    block_keys.append(_score_key(distance, shared, column, max_len, n))
+                keys = heapq.nsmallest(k, keys + block_keys)
+            results.append([key % n for key in keys])
+    return results
+
+
+def _encode(forms, max_len, pad):
+    """(left-aligned codes, right-aligned reversed codes, lengths) as NumPy arrays."""
+    left = np.full((len(forms), max_len), pad, dtype=np.int32)
+    right = np.full((len(forms), max_len), pad, dtype=np.int32)
+    for i, text in enumerate(forms):
+        codes = [ord(ch) for ch in text]
+        left[i, :len(codes)] = codes
+        right[i, :len(codes)] = codes[::-1]
+    lengths = np.fromiter((len(text) for text in forms), dtype=np.int64, count=len(forms))
+    return left, right, lengths
+
+
+def _match_masks(forms, max_len):
+    """
+    (masks, chars) for Myers' algorithm: masks[i, c] has bit p set where
+    forms[i][p] is character c of the forms' alphabet; chars[i, p] is the
+    alphabet index of forms[i][p], or an always-empty column past its end.
+    """
+    alphabet = {ch: n for n, ch in enumerate(sorted({ch for text in forms for ch in text}))}
+    masks = np.zeros((len(forms), len(alphabet) + 1), dtype=np.uint64)
+    chars = np.full((len(forms), max_len), len(alphabet), dtype=np.intp)
+    for i, text in enumerate(forms):
+        for p, ch in enumerate(text):
+            masks[i, alphabet[ch]] |= np.uint64(1 << p)
+        chars[i, :len(text)] = [alphabet[ch] for ch in text]
+    return masks, chars
+
+
+def _block_distances_bits(chars, la, masks, lc):
+    """
+    Levenshtein distances between every row (read as text) and every column
+    (the pattern, at most 64 long), advancing one text character at a time.
+    """
+    one = np.uint64(1)
+    # An empty pattern has no last bit; its distances are set at the end
+    high = (one << (np.maximum(lc, 1).astype(np.uint64) - one))[None, :]
+    pv = np.full((len(chars), len(masks)), np.iinfo(np.uint64).max, dtype=np.uint64)
+    mv = np.zeros_like(pv)
+    score = np.broadcast_to(lc.astype(np.int16)[None, :], pv.shape).copy()
+    for i in range(int(la.max())):
+        eq = masks[:, chars[:, i]].T
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | ~(xh | pv)
+        mh = pv & xh
+        # Rows already past their last character keep their score
+        active = (la > i)[:, None]
+        score += ((ph & high) != 0) & active
+        score -= ((mh & high) != 0) & active
+        ph = (ph << one) | one
+        mh = mh << one
+        pv = mh | ~(xv | ph)
+        mv = ph & xv
+    score[:, lc == 0] = la[:, None]
+    return score
+
+
+def _block_distances(a, la, c, lc):
+    """Levenshtein distances between every row of `a` and every row of `c`, one DP row at a time."""
+    width = int(lc.max())
+    prev = np.broadcast_to(np.arange(width + 1, dtype=np.int16), (len(a), len(c), width + 1)).copy()
+    # Empty rows never finish in the loop below: their distance is the column length
+    out = np.broadcast_to(lc.astype(np.int16)[None, :], (len(a), len(c))).copy()
+    column_index = np.broadcast_to(lc[None, :, None], (len(a), len(c), 1))
+    for i in range(1, int(la.max()) + 1):
+        cur = np.empty_like(prev)
+        cur[:, :, 0] = i
+        char = a[:, i - 1][:, None]
+        for j in range(1, width + 1):
+            substitute = prev[:, :, j - 1] + (char != c[None, :, j - 1])
+            cur[:, :, j] = np.minimum(np.minimum(prev[:, :, j], cur[:, :, j - 1]) + 1, substitute)
+        prev = cur
+        done = la == i
+        if done.any():
+            out[done] = np.take_along_axis(prev[done], column_index[done], axis=2)[:, :, 0]
+    return out
+
+
+def _shared_suffix(rows, cols):
+    """Shared suffix lengths between right-aligned, reversed code arrays."""
+    alive = np.ones((len(rows), len(cols)), dtype=bool)
+    shared = np.zeros(alive.shape, dtype=np.int64)
+    for p in range(rows.shape[1]):
+        alive &= rows[:, None, p] == cols[None, :, p]
+        if not alive.any():
+            break
+        shared += alive
+    return shared
+
+
+def top_k_numpy(forms, k=TOP_K, block=BLOCK):
+    """top_k_python, computed a block of the matrix at a time with NumPy."""
+    n = len(forms)
+    if n == 0:
+        return []
+    max_len = max(map(len, forms))
+    # Different pads on the two sides so padding never counts as a shared suffix
+    codes, rows_right, lengths = _encode(forms, max_len, -1)
+    _, cols_right, _ = _encode(forms, max_len, -2)
+    bits = max_len <= 64
+    if bits:
+        masks, chars = _match_masks(forms, max_len)
+    never = np.iinfo(np.int64).max
+    best = np.full((n, k), never, dtype=np.int64)
+
+    def keep(r0, r1, distance, shared, c0, c1):
+        columns = np.arange(c0, c1, dtype=np.int64)
+        keys = (distance * (max_len + 1) + (max_len - shared)) * n + columns[None, :]
+        # Identical strings (the row itself included) are not distractors
+        keys[distance == 0] = never
+        keys = np.concatenate([best[r0:r1], keys], axis=1)
+        best[r0:r1] = np.partition(keys, k - 1, axis=1)[:, :k]
+
+    for r0 in range(0, n, block):
+        r1 = min(r0 + block, n)
+        for c0 in range(r0, n, block):
+            c1 = min(c0 + block, n)
+            if bits:
+                distance = _block_distances_bits(chars[r0:r1], lengths[r0:r1],
+                                                 masks[c0:c1], lengths[c0:c1])
+            else:
+                distance = _block_distances(codes[r0:r1], lengths[r0:r1],
+                                            codes[c0:c1], lengths[c0:c1])
+            distance = distance.astype(np.int64)
+            shared = _shared_suffix(rows_right[r0:r1], cols_right[c0:c1])
+            keep(r0, r1, distance, shared, c0, c1)
+            if c0 != r0:
+                keep(c0, c1, distance.T, shared.T, r0, r1)
+    best.sort(axis=1)
+    return [[int(key) % n for key in row if key != never] for row in best]
+
+
+def build_table(words, k=TOP_K, version='2.0', use_numpy=True):
+    """Top-k confusable words for every word and each conjugation type it has."""
+    top_k = top_k_numpy if use_numpy and np is not None else top_k_python
+    types = list(VERB_FORMS)
+    ids = [word['id'] for word in words]
+    entries = {word_id: [None] * len(types) for word_id in ids}
+    for t, ctype in enumerate(types):
+        members = [i for i, word in enumerate(words) if ctype in word['conjugations']]
+        forms = [words[i]['conjugations'][ctype] for i in members]
+        for i, neighbours in zip(members, top_k(forms, k)):
+            entries[ids[i]][t] = [members[j] for j in neighbours]
+    return {'version': version, 'k': k, 'types': types, 'ids': ids, 'entries': entries}
+
+
+def lookup(table, words_by_id, word_id, ctype):
+    """Reference lookup: the confusable forms for (word id, ctype), or None."""
+    cell = table['entries'][word_id][table['types'].index(ctype)]
+    if cell is None:
+        return None
+    return [words_by_id[table['ids'][i]]['conjugations'][ctype] for i in cell]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--input', default=BASE_FILE)
+    parser.add_argument('--output', default=OUTPUT_FILE)
+    parser.add_argument('--k', type=int, default=TOP_K, help='forms kept per cell (default: %(default)s)')
+    parser.add_argument('--no-numpy', action='store_true', help='use the pure Python path')
+    parser.add_argument('--check', action='store_true',
+                        help='also build with the other path and require identical output')
+    args = parser.parse_args()
+
+    with open(args.input, 'r', encoding='utf-8') as f:
+        dictionary = json.load(f)
+    words = dictionary['words']
+    use_numpy = not args.no_numpy and np is not None
+
+    start = time.perf_counter()
+    table = build_table(words, args.k, dictionary['version'], use_numpy)
+    elapsed = time.perf_counter() - start
+    forms = sum(len(w['conjugations']) for w in words)
+    print(f"{forms:,} forms of {len(words)} words scored in {elapsed:.2f}s "
+          f"({'NumPy' if use_numpy else 'pure Python'})", file=sys.stderr)
+
+    if args.check:
+        if np is None:
+            print("❌ --check needs NumPy to compare both paths")
+            sys.exit(1)
+        start = time.perf_counter()
+        other = build_table(words, args.k, dictionary['version'], not use_numpy)
+        print(f"Other path took {time.perf_counter() - start:.2f}s", file=sys.stderr)
+        if other != table:
+            print("❌ NumPy and pure Python results differ")
+            sys.exit(1)
+        print("✅ NumPy and pure Python results match")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(table, f, ensure_ascii=False, separators=(',', ':'))
+    print(f"Wrote {args.output}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,347 @@
+"""
+Table-driven conjugation engine shared by the dictionary generators.
+
+Every group is described declaratively: godan verbs by their GODAN_ROWS row
+and te/ta suffixes, the other groups by the ending to strip and a suffix per
+form. Irregular words are override tables rather than branches. The tables
+are compiled once into per-(group, ending) suffix tuples, and
+`conjugate_many` applies them to whole buckets of words at a time.
+"""
+
+VERB_FORMS = (
+    'polite',
+    'negative_plain',
+    'negative_polite',
+    'past_plain',
+    'past_polite',
+    'past_negative_plain',
+    'past_negative_polite',
+    'te_form',
+    'potential',
+    'passive',
+    'causative',
+    'causative_passive',
+    'imperative',
+    'volitional',
+    'conditional_ba',
+    'conditional_tara',
+)
+
+ADJ_FORMS = (
+    'polite',
+    'negative_plain',
+    'negative_polite',
+    'past_plain',
+    'past_polite',
+    'past_negative_plain',
+    'past_negative_polite',
+    'te_form',
+    'conditional_ba',
+    'conditional_tara',
+)
+
+GROUPS = ('godan', 'ichidan', 'suru', 'kuru', 'i-adj', 'na-adj')
+
+# Entry IDs are this prefix plus the dictionary-form romaji
+ID_PREFIX = {'verb': 'v_', 'i-adj': 'ia_', 'na-adj': 'na_'}
+
+# ---------------------------------------------------------------------------
+# Godan verbs
+# ---------------------------------------------------------------------------
+GODAN_ROWS = {
+    'う': {'a':'わ','i':'い','e':'え','o':'お'},
+    'く': {'a':'か','i':'き','e':'け','o':'こ'},
+    'ぐ': {'a':'が','i':'ぎ','e':'げ','o':'ご'},
+    'す': {'a':'さ','i':'し','e':'せ','o':'そ'},
+    'つ': {'a':'た','i':'ち','e':'て','o':'と'},
+    'ぬ': {'a':'な','i':'に','e':'ね','o':'の'},
+    'ぶ': {'a':'ば','i':'び','e':'べ','o':'ぼ'},
+    'む': {'a':'ま','i':'み','e':'め','o':'も'},
+    'る': {'a':'ら','i':'り','e':'れ','o':'ろ'},
+}
+
+# te-form / ta-form suffix by ending
+GODAN_TE_TA = {
+    'う': ('って','った'),
+    'つ': ('って','った'),
+    'る': ('って','った'),
+    'く': ('いて','いた'),
+    'ぐ': ('いで','いだ'),
+    'す': ('して','した'),
+    'ぬ': ('んで','んだ'),
+    'ぶ': ('んで','んだ'),
+    'む': ('んで','んだ'),
+}
+
+# form -> (cell, suffix); cell is a GODAN_ROWS vowel, 'te' or 'ta'
+GODAN_FORMS = {
+    'polite':               ('i', 'ます'),
+    'negative_plain':       ('a', 'ない'),
+    'negative_polite':      ('i', 'ません'),
+    'past_plain':           ('ta', ''),
+    'past_polite':          ('i', 'ました'),
+    'past_negative_plain':  ('a', 'なかった'),
+    'past_negative_polite': ('i', 'ませんでした'),
+    'te_form':              ('te', ''),
+    'potential':            ('e', 'る'),
+    'passive':              ('a', 'れる'),
+    'causative':            ('a', 'せる'),
+    'causative_passive':    ('a', 'せられる'),
+    'imperative':           ('e', ''),
+    'volitional':           ('o', 'う'),
+    'conditional_ba':       ('e', 'ば'),
+    'conditional_tara':     ('ta', 'ら'),
+}
+
+# ---------------------------------------------------------------------------
+# Other groups: (ending stripped to get the stem, {form: suffix})
+# ---------------------------------------------------------------------------
+SUFFIX_RULES = {
+    'ichidan': ('る', {
+        'polite':               'ます',
+        'negative_plain':       'ない',
+        'negative_polite':      'ません',
+        'past_plain':           'た',
+        'past_polite':          'ました',
+        'past_negative_plain':  'なかった',
+        'past_negative_polite': 'ませんでした',
+        'te_form':              'て',
+        'potential':            'られる',
+        'passive':              'られる',
+        'causative':            'させる',
+        'causative_passive':    'させられる',
+        'imperative':           'ろ',
+        'volitional':           'よう',
+        'conditional_ba':       'れば',
+        'conditional_tara':     'たら',
+    }),
+    'suru': ('する', {
+        'polite':               'します',
+        'negative_plain':       'しない',
+        'negative_polite':      'しません',
+        'past_plain':           'した',
+        'past_polite':          'しました',
+        'past_negative_plain':  'しなかった',
+        'past_negative_polite': 'しませんでした',
+        'te_form':              'して',
+        'potential':            'できる',
+        'passive':              'される',
+        'causative':            'させる',
+        'causative_passive':    'させられる',
+        'imperative':           'しろ',
+        'volitional':           'しよう',
+        'conditional_ba':       'すれば',
+        'conditional_tara':     'したら',
+    }),
+    'kuru': ('くる', {
+        'polite':               'きます',
+        'negative_plain':       'こない',
+        'negative_polite':      'きません',
+        'past_plain':           'きた',
+        'past_polite':          'きました',
+        'past_negative_plain':  'こなかった',
+        'past_negative_polite': 'きませんでした',
+        'te_form':              'きて',
+        'potential':            'こられる',
+        'passive':              'こられる',
+        'causative':            'こさせる',
+        'causative_passive':    'こさせられる',
+        'imperative':           'こい',
+        'volitional':           'こよう',
+        'conditional_ba':       'くれば',
+        'conditional_tara':     'きたら',
+    }),
+    'i-adj': ('い', {
+        'negative_plain':       'くない',
+        'negative_polite':      'くないです',
+        'past_plain':           'かった',
+        'past_polite':          'かったです',
+        'past_negative_plain':  'くなかった',
+        'past_negative_polite': 'くなかったです',
+        'te_form':              'くて',
+        'conditional_ba':       'ければ',
+        'conditional_tara':     'かったら',
+    }),
+    'na-adj': ('', {
+        'polite':               'です',
+        'negative_plain':       'じゃない',
+        'negative_polite':      'じゃありません',
+        'past_plain':           'だった',
+        'past_polite':          'でした',
+        'past_negative_plain':  'じゃなかった',
+        'past_negative_polite': 'じゃありませんでした',
+        'te_form':              'で',
+        'conditional_ba':       'であれば',
+        'conditional_tara':     'だったら',
+    }),
+}
+
+# Forms appended to the whole dictionary form instead of the stem
+DICTIONARY_FORM_RULES = {
+    'i-adj': {'polite': 'です'},
+}
+
+# Groups that still conjugate when the ending is missing, using an empty stem
+# (来る read as something other than くる)
+LENIENT_GROUPS = {'kuru'}
+
+# ---------------------------------------------------------------------------
+# Irregular words, keyed by (group, dictionary kana)
+# ---------------------------------------------------------------------------
+# Stem used in place of kana minus its ending
+STEM_OVERRIDES = {
+    ('i-adj', 'いい'): 'よ',
+    ('i-adj', 'かっこいい'): 'かっこよ',
+}
+
+# Suffixes replaced for one word, still applied to its stem
+SUFFIX_OVERRIDES = {}
+
+# Suffixes replaced for every word ending in a kana sequence, still applied
+# to its stem: 行く and its compounds (行って, 連れて行って). Among godan
+# verbs only the 行く/逝く class (JMdict v5k-s) ends in いく or ゆく.
+ENDING_SUFFIX_OVERRIDES = {
+    ('godan', 'いく'): {'te_form': 'って', 'past_plain': 'った', 'conditional_tara': 'ったら'},
+    ('godan', 'ゆく'): {'te_form': 'って', 'past_plain': 'った', 'conditional_tara': 'ったら'},
+}
+
+# Complete forms replaced for one word
+FORM_OVERRIDES = {
+    ('godan', 'ある'): {'negative_plain': 'ない', 'past_negative_plain': 'なかった'},
+    ('i-adj', 'よい'): {'polite': 'いいです'},
+}
+
+# ---------------------------------------------------------------------------
+# Compiled tables
+# ---------------------------------------------------------------------------
+def _compile_tables():
+    """
+    Compile the rules into {(group, ending): (ending, lenient, columns)}, where
+    columns is a tuple of (form, suffix, from_dictionary_form) in output order.
+    Godan tables are keyed by their final kana, all others by ''.
+    """
+    tables = {}
+    for ending, row in GODAN_ROWS.items():
+        te, ta = GODAN_TE_TA[ending]
+        cells = dict(row, te=te, ta=ta)
+        columns = tuple((form, cells[cell] + suffix, False)
+                        for form, (cell, suffix) in GODAN_FORMS.items())
+        tables[('godan', ending)] = (ending, False, columns)
+
+    for group, (ending, suffixes) in SUFFIX_RULES.items():
+        from_dictionary = DICTIONARY_FORM_RULES.get(group, {})
+        order = ADJ_FORMS if group in ('i-adj', 'na-adj') else VERB_FORMS
+        columns = tuple(
+            (form, from_dictionary[form], True) if form in from_dictionary
+            else (form, suffixes[form], False)
+            for form in order
+        )
+        tables[(group, '')] = (ending, group in LENIENT_GROUPS, columns)
+    return tables
+
+def _compile_ending_overrides():
+    """{table key: ((word ending, {form: suffix}), ...)} from ENDING_SUFFIX_OVERRIDES."""
+    by_key = {}
+    for (group, ending), suffixes in ENDING_SUFFIX_OVERRIDES.items():
+        by_key.setdefault(_table_key(ending, group), []).append((ending, suffixes))
+    return {key: tuple(overrides) for key, overrides in by_key.items()}
+
+
+_TABLES = _compile_tables()
+_OVERRIDDEN = set(STEM_OVERRIDES) | set(SUFFIX_OVERRIDES) | set(FORM_OVERRIDES)
+
+
+def _table_key(kana, group):
+    return (group, kana[-1:]) if group == 'godan' else (group, '')
+
+
+_ENDING_OVERRIDES = _compile_ending_overrides()
+
+
+def conjugate_many(pairs):
+    """
+    Conjugate an iterable of (kana, group) pairs. Returns a list aligned with
+    the input holding a {form: kana} dict, or None for words the rules cannot
+    conjugate (unknown group, godan ending outside GODAN_ROWS, ichidan not
+    ending in る, i-adjective not ending in い).
+    """
+    pairs = list(pairs)
+    results = [None] * len(pairs)
+
+    buckets = {}
+    for i, (kana, group) in enumerate(pairs):
+        key = _table_key(kana, group)
+        if key in _TABLES:
+            buckets.setdefault(key, []).append(i)
+
+    for key, indices in buckets.items():
+        ending, lenient, columns = _TABLES[key]
+        cut = len(ending)
+        members, stems, words = [], [], []
+        for i in indices:
+            kana = pairs[i][0]
+            if kana.endswith(ending):
+                stem = kana[:len(kana) - cut]
+            elif lenient:
+                stem = ''
+            else:
+                continue
+            members.append(i)
+            stems.append(STEM_OVERRIDES.get((key[0], kana), stem))
+            words.append(kana)
+
+        forms = [form for form, _, _ in columns]
+        values = [
+            [word + suffix for word in words] if from_dictionary
+            else [stem + suffix for stem in stems]
+            for _, suffix, from_dictionary in columns
+        ]
+        for n, i in enumerate(members):
+            results[i] = dict(zip(forms, [column[n] for column in values]))
+
+        for ending, suffixes in _ENDING_OVERRIDES.get(key, ()):
+            for n, i in enumerate(members):
+                if words[n].endswith(ending):
+                    conj = results[i]
+                    for form, suffix in suffixes.items():
+                        conj[form] = stems[n] + suffix
+
+        for n, i in enumerate(members):
+            override_key = (key[0], words[n])
+            if override_key not in _OVERRIDDEN:
+                continue
+            conj = results[i]
+            for form, suffix in SUFFIX_OVERRIDES.get(override_key, {}).items():
+                conj[form] = stems[n] + suffix
+            conj.update(FORM_OVERRIDES.get(override_key, {}))
+
+    return results
+
+
+def conjugate(kana, group):
+    """Conjugate one word; see conjugate_many."""
+    return conjugate_many([(kana, group)])[0]
+
+
+def compiled_tables():
+    """(group, ending, columns) for every compiled table; see _compile_tables."""
+    return [(group, ending, columns) for (group, _), (ending, _, columns) in _TABLES.items()]
+
+
+def overridden_words():
+    """Every (group, kana) with a stem, suffix or form override."""
+    return frozenset(_OVERRIDDEN)
+
+
+def group_rules(group):
+    """Every table entry that can affect the output of `group`, for fingerprinting."""
+    if group == 'godan':
+        base = (GODAN_ROWS, GODAN_TE_TA, GODAN_FORMS)
+    else:
+        base = (SUFFIX_RULES[group], DICTIONARY_FORM_RULES.get(group), group in LENIENT_GROUPS)
+    overrides = tuple(
+        (key, table[key])
+        for table in (STEM_OVERRIDES, SUFFIX_OVERRIDES, ENDING_SUFFIX_OVERRIDES, FORM_OVERRIDES)
+        for key in table if key[0] == group
+    )
+    return base + (overrides,)
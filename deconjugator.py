@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Rule-based deconjugator: the inverse of conjugation_engine.
+
+Every (form, suffix) column of the engine's compiled tables becomes a path in
+an automaton over reversed suffixes, so a surface form is read once from its
+last character backwards and every rule whose suffix it ends with fires
+along the way; no rule is tried that the string cannot match. Each firing
+rule strips its suffix and restores the group's dictionary ending, giving a
+candidate (dictionary kana, group, form). Suffixes the engine replaces for
+every word with a given ending (行く and its compounds) are rules of their
+own, and the generic rule they replace does not fire for those words.
+Words with irregular overrides are answered from an exact table built by
+conjugating them forward instead, and the generic rules never propose them.
+
+Works on any string, not just dictionary words (食べさせられる → 食べる), and
+returns every reading the rules allow, most specific suffix first.
+
+    python deconjugator.py たべられる いって           # print candidates
+    python deconjugator.py --check                   # recall + throughput over dictionary.json
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from conjugation_engine import (
+    ENDING_SUFFIX_OVERRIDES, compiled_tables, conjugate_many, overridden_words,
+)
+
+DICTIONARY_FILE = "src/data/dictionaries/dictionary.json"
+
+# Groups whose dictionary form may be the ending alone (する, くる)
+EMPTY_STEM_GROUPS = {'suru', 'kuru'}
+
+
+def _compile_automaton():
+    """
+    Return (transitions, accepts): state 0 is the root, transitions[state] maps
+    the next character (reading the suffix backwards) to a state, and
+    accepts[state] lists (cut, ending, group, form, min_stem, shadowed) for the
+    rules whose suffix ends there; a rule does not apply to dictionary forms
+    ending in one of `shadowed`, whose suffix an ending override replaces.
+    """
+    transitions = [{}]
+    accepts = [[]]
+
+    def add(surface, rule):
+        state = 0
+        for ch in reversed(surface):
+            nxt = transitions[state].get(ch)
+            if nxt is None:
+                nxt = len(transitions)
+                transitions[state][ch] = nxt
+                transitions.append({})
+                accepts.append([])
+            state = nxt
+        accepts[state].append((len(surface),) + rule)
+
+    for group, ending, columns in compiled_tables():
+        min_stem = 0 if group in EMPTY_STEM_GROUPS else 1
+        for form, suffix, from_dictionary in columns:
+            shadowed = tuple(word_ending for (override_group, word_ending), suffixes
+                             in ENDING_SUFFIX_OVERRIDES.items()
+                             if override_group == group and word_ending.endswith(ending)
+                             and form in suffixes)
+            # Forms built on the dictionary form keep its ending in front of the suffix
+            add(ending + suffix if from_dictionary else suffix, (ending, group, form, min_stem, shadowed))
+
+    # The stem is the word minus its last kana, so the rest of the ending leads the suffix
+    for (group, word_ending), suffixes in ENDING_SUFFIX_OVERRIDES.items():
+        for form, suffix in suffixes.items():
+            add(word_ending[:-1] + suffix, (word_ending, group, form, 0, ()))
+    return transitions, [tuple(rules) for rules in accepts]
+
+
+def _compile_exceptions():
+    """{surface: ((kana, group, form), ...)} for every word with an override."""
+    words = sorted(_OVERRIDDEN)
+    table = {}
+    for (group, kana), forms in zip(words, conjugate_many((kana, group) for group, kana in words)):
+        for form, surface in (forms or {}).items():
+            table.setdefault(surface, []).append((kana, group, form))
+    return {surface: tuple(found) for surface, found in table.items()}
+
+
+_OVERRIDDEN = overridden_words()
+_TRANSITIONS, _ACCEPTS = _compile_automaton()
+_EXCEPTIONS = _compile_exceptions()
+
+
+def deconjugate(surface):
+    """((dictionary kana, group, form), ...) that conjugate to `surface`."""
+    transitions = _TRANSITIONS
+    accepts = _ACCEPTS
+    length = len(surface)
+    found = []
+    state = 0
+    for i in range(length - 1, -1, -1):
+        state = transitions[state].get(surface[i])
+        if state is None:
+            break
+        for cut, ending, group, form, min_stem, shadowed in accepts[state]:
+            if length - cut < min_stem:
+                continue
+            kana = surface[:length - cut] + ending
+            if (group, kana) not in _OVERRIDDEN and not kana.endswith(shadowed):
+                found.append((kana, group, form))
+    found.reverse()  # longest suffix first
+    exact = _EXCEPTIONS.get(surface)
+    if exact:
+        return exact + tuple(found)
+    return tuple(found)
+
+
+def deconjugate_many(surfaces):
+    """
+    deconjugate over an iterable of strings, returning a list aligned with
+    it. Repeated strings, common in corpora and answer logs, are only
+    resolved once; they share one result tuple, which cannot be mutated.
+    """
+    memo = {}
+    results = []
+    append = results.append
+    for surface in surfaces:
+        found = memo.get(surface)
+        if found is None:
+            found = memo[surface] = deconjugate(surface)
+        append(found)
+    return results
+
+
+def check(words):
+    """
+    Every (kana, group, form) of the dictionary must be recovered from its
+    surface form. Returns (forms checked, [missed (surface, kana, group, form)]).
+    """
+    cases = [(surface, (w['dictionary_form']['kana'], w['group'], form))
+             for w in words for form, surface in w['conjugations'].items()]
+    missed = [(surface,) + expected
+              for (surface, expected), found in zip(cases, deconjugate_many(s for s, _ in cases))
+              if expected not in found]
+    return len(cases), missed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('surfaces', nargs='*')
+    parser.add_argument('--check', action='store_true',
+                        help='recall and throughput over every form in --dictionary')
+    parser.add_argument('--dictionary', default=DICTIONARY_FILE)
+    args = parser.parse_args()
+
+    for surface in args.surfaces:
+        print(surface)
+        for kana, group, form in deconjugate(surface):
+            print(f"  {kana:<12} {group:<8} {form}")
+    if not args.check:
+        return
+
+    with open(args.dictionary, 'r', encoding='utf-8') as f:
+        words = json.load(f)['words']
+    checked, missed = check(words)
+    surfaces = [surface for w in words for surface in w['conjugations'].values()]
+    start = time.perf_counter()
+    results = deconjugate_many(surfaces)
+    elapsed = time.perf_counter() - start
+    candidates = sum(len(r) for r in results)
+    print(f"{checked:,} forms, {candidates / len(results):.1f} candidates each, "
+          f"{len(surfaces) / elapsed:,.0f} strings/s ({len(_TRANSITIONS)} automaton states)",
+          file=sys.stderr)
+    for surface, kana, group, form in missed[:20]:
+        print(f"❌ {surface}: expected {kana} {group} {form}")
+    if missed:
+        print(f"❌ {len(missed)} forms not recovered")
+        sys.exit(1)
+    print("✅ Every dictionary form is recovered")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+Versioned delta patches between dictionary releases.
+
+A release is base.json's words plus the per-language meaning maps, numbered
+1, 2, 3, ... Each time the dictionary is regenerated the new release is
+compared with the previous one and a patch holding only the difference is
+written, keyed by entry id:
+
+    {
+      "format": "katachi-patch/1",
+      "from": 3, "to": 4,
+      "removed": ["v_iku", ...],
+      "added": [[index in the new word list, word], ...],
+      "changed": {"v_taberu": {"set": {"level": "N4"}, "unset": [...],
+                               "conjugations": {"set": {"polite": ...}, "unset": [...]}}},
+      "order": [id, ...],                      # only when surviving words moved
+      "meanings": {"en": {"set": {id: text}, "unset": [id, ...]}, ...},
+      "schema": "2.1"                          # only when base.json's version changed
+    }
+
+versions.json lists every release's content digest, the patches still kept
+(the last MAX_PATCHES) and the latest release in full, so a client at
+version N fetches patches N→N+1→...→latest, or the full release when it is
+further behind or the patches would weigh more.
+
+    python dictionary_patches.py                      # cut a release from src/data/dictionaries
+    python dictionary_patches.py --upgrade OLD.json   # bring an old release up to date
+    python dictionary_patches.py --check              # round-trip check on the current data
+"""
+
+import argparse
+import copy
+import hashlib
+import json
+import os
+import re
+import sys
+
+DICTIONARY_DIR = "src/data/dictionaries"
+PATCH_DIR = "public/dictionaries/patches"
+LANGUAGES = ["en", "zh", "vi", "ne", "my"]
+PATCH_FORMAT = "katachi-patch/1"
+VERSIONS_FORMAT = "katachi-versions/1"
+MAX_PATCHES = 20  # older clients download the full release instead
+# Names _dump_file gives releases and patches; only these are pruned from the patch dir
+PATCH_FILE = re.compile(r"(release-\d+|patch-\d+-\d+)\.[0-9a-f]{12}\.json")
+
+
+# ---------------------------------------------------------------------------
+# Releases
+# ---------------------------------------------------------------------------
+def load_release(dictionary_dir=DICTIONARY_DIR, languages=LANGUAGES):
+    """{'schema', 'words', 'meanings'} from base.json and the meaning maps next to it."""
+    with open(os.path.join(dictionary_dir, 'base.json'), 'r', encoding='utf-8') as f:
+        base = json.load(f)
+    meanings = {}
+    for language in languages:
+        path = os.path.join(dictionary_dir, f"{language}.json")
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                meanings[language] = json.load(f)
+    return {'schema': base['version'], 'words': base['words'], 'meanings': meanings}
+
+
+def release_digest(release):
+    """sha256 of a release's content; key order does not matter, word order does."""
+    content = {key: release[key] for key in ('schema', 'words', 'meanings')}
+    body = json.dumps(content, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+    return hashlib.sha256(body.encode('utf-8')).hexdigest()
+
+
+def _index_by_id(words):
+    by_id = {}
+    for word in words:
+        if word['id'] in by_id:
+            raise ValueError(f"duplicate id {word['id']!r}")
+        by_id[word['id']] = word
+    return by_id
+
+
+# ---------------------------------------------------------------------------
+# Diff and apply
+# ---------------------------------------------------------------------------
+def _diff_fields(old, new):
+    """{'set': {...}, 'unset': [...]} turning dict `old` into `new`, without empty parts."""
+    delta = {}
+    changed = {key: value for key, value in new.items() if key not in old or old[key] != value}
+    removed = [key for key in old if key not in new]
+    if changed:
+        delta['set'] = changed
+    if removed:
+        delta['unset'] = removed
+    return delta
+
+
+def _diff_word(old, new):
+    delta = _diff_fields({k: v for k, v in old.items() if k != 'conjugations'},
+                         {k: v for k, v in new.items() if k != 'conjugations'})
+    conjugations = _diff_fields(old.get('conjugations', {}), new.get('conjugations', {}))
+    if conjugations:
+        delta['conjugations'] = conjugations
+    return delta
+
+
+def diff(old, new, from_version, to_version):
+    """The patch turning release `old` into release `new`."""
+    old_by_id = _index_by_id(old['words'])
+    new_by_id = _index_by_id(new['words'])
+
+    patch = {'format': PATCH_FORMAT, 'from': from_version, 'to': to_version}
+    patch['removed'] = [i for i in old_by_id if i not in new_by_id]
+    patch['added'] = [[index, word] for index, word in enumerate(new['words'])
+                      if word['id'] not in old_by_id]
+    changed = {}
+    for entry_id, word in new_by_id.items():
+        if entry_id in old_by_id and old_by_id[entry_id] != word:
+            delta = _diff_word(old_by_id[entry_id], word)
+            if delta:
+                changed[entry_id] = delta
+    patch['changed'] = changed
+
+    # Added words are inserted at their final index; only a move among the
+    # words both releases share needs the full order
+    kept_old = [i for i in old_by_id if i in new_by_id]
+    kept_new = [i for i in new_by_id if i in old_by_id]
+    if kept_old != kept_new:
+        patch['order'] = list(new_by_id)
+
+    meanings = {}
+    for language in old['meanings'].keys() | new['meanings'].keys():
+        if language not in new['meanings']:
+            meanings[language] = None
+            continue
+        delta = _diff_fields(old['meanings'].get(language, {}), new['meanings'][language])
+        if delta:
+            meanings[language] = delta
+    patch['meanings'] = {language: meanings[language] for language in sorted(meanings)}
+    if old['schema'] != new['schema']:
+        patch['schema'] = new['schema']
+    return patch
+
+
+def _apply_fields(target, delta):
+    for key in delta.get('unset', ()):
+        target.pop(key, None)
+    target.update(delta.get('set', {}))
+
+
+def apply_patch(release, patch):
+    """
+    Reference applier: return the release `patch` turns `release` into.
+    `release` is left untouched.
+    """
+    if patch.get('format') != PATCH_FORMAT:
+        raise ValueError(f"unknown patch format {patch.get('format')!r}")
+    removed = set(patch['removed'])
+    changed = patch['changed']
+
+    words = []
+    for word in release['words']:
+        if word['id'] in removed:
+            continue
+        delta = changed.get(word['id'])
+        if delta:
+            word = copy.deepcopy(word)
+            _apply_fields(word, delta)
+            if 'conjugations' in delta:
+                _apply_fields(word.setdefault('conjugations', {}), delta['conjugations'])
+        words.append(word)
+    for index, word in patch['added']:
+        words.insert(index, word)
+    if 'order' in patch:
+        by_id = _index_by_id(words)
+        words = [by_id[i] for i in patch['order']]
+
+    meanings = {language: dict(values) for language, values in release['meanings'].items()}
+    for language, delta in patch['meanings'].items():
+        if delta is None:
+            meanings.pop(language, None)
+        else:
+            _apply_fields(meanings.setdefault(language, {}), delta)
+
+    return {'schema': patch.get('schema', release['schema']), 'words': words, 'meanings': meanings}
+
+
+# ---------------------------------------------------------------------------
+# Version manifest
+# ---------------------------------------------------------------------------
+def _dump_file(patch_dir, stem, data):
+    """Write compact JSON as <stem>.<hash>.json and return its manifest record."""
+    body = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    digest = hashlib.sha256(body).hexdigest()
+    name = f"{stem}.{digest[:12]}.json"
+    path = os.path.join(patch_dir, name)
+    if not os.path.exists(path):
+        with open(path, 'wb') as f:
+            f.write(body)
+    return {'file': name, 'bytes': len(body), 'sha256': digest}
+
+
+def _load_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_versions(patch_dir=PATCH_DIR):
+    """The version manifest, or None before the first release."""
+    path = os.path.join(patch_dir, 'versions.json')
+    return _load_json(path) if os.path.exists(path) else None
+
+
+def write_release(release, patch_dir=PATCH_DIR, max_patches=MAX_PATCHES):
+    """
+    Record `release` as the next version: diff it against the latest one,
+    check that the patch reproduces it, and update versions.json. Returns
+    (manifest, patch record or None); nothing is written when the content
+    has not changed.
+    """
+    os.makedirs(patch_dir, exist_ok=True)
+    manifest = load_versions(patch_dir)
+    digest = release_digest(release)
+    if manifest and manifest['versions'][str(manifest['latest'])]['sha256'] == digest:
+        return manifest, None
+
+    record = None
+    if manifest is None:
+        version = 1
+        manifest = {'format': VERSIONS_FORMAT, 'latest': None, 'release': None,
+                    'versions': {}, 'patches': []}
+    else:
+        previous = manifest['latest']
+        version = previous + 1
+        old = _load_json(os.path.join(patch_dir, manifest['release']['file']))
+        patch = diff(old, release, previous, version)
+        if release_digest(apply_patch(old, patch)) != digest:
+            raise RuntimeError(f"patch {previous}->{version} does not reproduce the release")
+        record = dict(_dump_file(patch_dir, f"patch-{previous}-{version}", patch),
+                      **{'from': previous, 'to': version})
+        manifest['patches'] = (manifest['patches'] + [record])[-max_patches:]
+
+    manifest['latest'] = version
+    manifest['versions'][str(version)] = {'sha256': digest, 'words': len(release['words'])}
+    manifest['release'] = dict(_dump_file(patch_dir, f"release-{version}", dict(release, version=version)),
+                               version=version)
+
+    live = {manifest['release']['file']} | {r['file'] for r in manifest['patches']}
+    for name in os.listdir(patch_dir):
+        if PATCH_FILE.fullmatch(name) and name not in live:
+            os.remove(os.path.join(patch_dir, name))
+    with open(os.path.join(patch_dir, 'versions.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest, record
+
+
+def plan_upgrade(manifest, version):
+    """
+    Patch records taking `version` to the latest release, in order, or None
+    when the client should download the full release instead.
+    """
+    by_from = {r['from']: r for r in manifest['patches']}
+    chain = []
+    while version != manifest['latest']:
+        record = by_from.get(version)
+        if record is None:
+            return None
+        chain.append(record)
+        version = record['to']
+    if sum(r['bytes'] for r in chain) >= manifest['release']['bytes']:
+        return None
+    return chain
+
+
+def upgrade(release, version, patch_dir=PATCH_DIR):
+    """
+    Bring a release at `version` to the latest one the way a client would,
+    verifying the content digest of every version passed through. Returns
+    (release, patches applied, or None when the full release was used).
+    """
+    manifest = load_versions(patch_dir)
+    chain = plan_upgrade(manifest, version)
+    if chain is None:
+        latest = _load_json(os.path.join(patch_dir, manifest['release']['file']))
+        return {key: latest[key] for key in ('schema', 'words', 'meanings')}, None
+    for record in chain:
+        release = apply_patch(release, _load_json(os.path.join(patch_dir, record['file'])))
+        if release_digest(release) != manifest['versions'][str(record['to'])]['sha256']:
+            raise RuntimeError(f"version {record['to']} does not match its digest after patching")
+    return release, len(chain)
+
+
+# ---------------------------------------------------------------------------
+# Round-trip check
+# ---------------------------------------------------------------------------
+def _mutations(release):
+    """(name, edited copy of `release`) for each kind of change a patch must carry."""
+    words = release['words']
+    first, last = words[0]['id'], words[-1]['id']
+
+    def edited(edit):
+        copied = copy.deepcopy(release)
+        edit(copied)
+        return copied
+
+    def change_fields(r):
+        r['words'][1]['level'] = 'N1'
+        form = next(iter(r['words'][2]['conjugations']))
+        r['words'][2]['conjugations'][form] += 'X'
+        r['words'][3]['conjugations'].pop(form, None)
+        r['words'][3]['conjugations']['new_form'] = 'Y'
+        r['words'][4].pop('word_type', None)
+
+    def add(r):
+        r['words'].insert(5, dict(copy.deepcopy(r['words'][0]), id='v_new_entry'))
+
+    def move(r):
+        r['words'].insert(len(r['words']) // 2, r['words'].pop(0))
+
+    def change_meanings(r):
+        en = r['meanings'].setdefault('en', {})
+        en[first] = 'changed'
+        en.pop(last, None)
+        r['meanings']['xx'] = {first: 'new language'}
+
+    return [
+        ('unchanged', edited(lambda r: None)),
+        ('removed', edited(lambda r: r['words'].pop(len(r['words']) // 3))),
+        ('added', edited(add)),
+        ('appended', edited(lambda r: r['words'].append(dict(copy.deepcopy(r['words'][1]), id='v_tail')))),
+        ('changed fields', edited(change_fields)),
+        ('reordered', edited(move)),
+        ('meanings', edited(change_meanings)),
+        ('dropped language', edited(lambda r: r['meanings'].pop('en', None))),
+        ('schema', edited(lambda r: r.update(schema='9.9'))),
+        ('replaced', {'schema': release['schema'], 'words': list(reversed(words[:50])),
+                      'meanings': {}}),
+    ]
+
+
+def check(release):
+    """Diff the release against edited copies and back; returns [(name, ok, patch bytes)]."""
+    results = []
+    for name, edited in _mutations(release):
+        for label, old, new in ((name, release, edited), (f"{name} (reverse)", edited, release)):
+            patch = diff(old, new, 1, 2)
+            body = json.dumps(patch, ensure_ascii=False, separators=(',', ':'))
+            ok = release_digest(apply_patch(old, json.loads(body))) == release_digest(new)
+            results.append((label, ok, len(body.encode('utf-8'))))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--dictionary-dir', default=DICTIONARY_DIR,
+                        help='base.json and meaning maps of the release (default: %(default)s)')
+    parser.add_argument('--patch-dir', default=PATCH_DIR)
+    parser.add_argument('--upgrade', metavar='RELEASE',
+                        help='apply patches to a release-N.json from the patch dir up to the latest')
+    parser.add_argument('--output', help='where --upgrade writes the result')
+    parser.add_argument('--check', action='store_true',
+                        help='round-trip diff/apply over edited copies of the current data')
+    args = parser.parse_args()
+
+    if args.check:
+        results = check(load_release(args.dictionary_dir))
+        for label, ok, size in results:
+            print(f"{'✅' if ok else '❌'} {label:<28} {size:>9,} bytes")
+        failed = sum(not ok for _, ok, _ in results)
+        print(f"❌ {failed} round trips failed" if failed else f"✅ {len(results)} round trips")
+        sys.exit(1 if failed else 0)
+
+    if args.upgrade:
+        old = _load_json(args.upgrade)
+        release, applied = upgrade(old, old['version'], args.patch_dir)
+        latest = load_versions(args.patch_dir)['latest']
+        how = f"{applied} patches" if applied is not None else "the full release"
+        print(f"Upgraded version {old['version']} to {latest} with {how}", file=sys.stderr)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(dict(release, version=latest), f, ensure_ascii=False, indent=2)
+        return
+
+    release = load_release(args.dictionary_dir)
+    first = load_versions(args.patch_dir) is None
+    manifest, record = write_release(release, args.patch_dir)
+    if first:
+        print(f"Recorded version 1 ({len(release['words'])} words) in {args.patch_dir}", file=sys.stderr)
+    elif record is None:
+        print(f"No changes since version {manifest['latest']}", file=sys.stderr)
+    else:
+        print(f"Version {record['to']}: patch from {record['from']} is {record['bytes']:,} bytes "
+              f"(full release {manifest['release']['bytes']:,})", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Reverse index from every conjugated surface form to the (entry, form) pairs
+that produce it, so a typed answer can be recognized without scanning every
+entry's conjugations.
+
+Keys are sorted and front-coded: each key stores how many leading characters
+it shares with the previous one plus the rest, and every RESTART-th key is
+stored whole so a lookup can binary-search those and decode one block.
+Postings are entry_index * len(forms) + form_index, several per key when the
+form is ambiguous (ichidan potential and passive are both 〜られる):
+
+    {
+      "format": "katachi-form-index/1",
+      "version": "2.0",
+      "ids": ["v_taberu", ...],
+      "forms": ["dictionary", "polite", ...],
+      "restart": 16,
+      "shared": [0, 3, ...], "suffix": ["たべ", "られる", ...],
+      "counts": [1, 2, ...],                 # postings per key
+      "postings": [...]                      # flat, counts apart
+    }
+
+Romaji keys can be added alongside the kana ones, in the same key space.
+kana_to_romaji passes katakana and kanji through unchanged, so a romaji key
+can equal a kana key (アウト spells the same either way); that key then lists
+the postings of both, which is what a lookup of that string should find.
+
+    python form_index.py [--input FILE] [--output FILE] [--romaji] [--report PATH]
+"""
+
+import argparse
+import bisect
+import json
+import os
+import sys
+
+DICTIONARY_FILE = "src/data/dictionaries/dictionary.json"
+FORMAT = "katachi-form-index/1"
+RESTART = 16  # keys per front-coded block
+
+
+def _shared_prefix(a, b):
+    n = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        n += 1
+    return n
+
+
+def surface_forms(words, romaji=None):
+    """{surface form: [(entry index, form), ...]} over dictionary forms and conjugations."""
+    table = {}
+    for n, word in enumerate(words):
+        pairs = [('dictionary', word['dictionary_form']['kana'])]
+        pairs += word['conjugations'].items()
+        for form, text in pairs:
+            keys = [text]
+            if romaji:
+                keys.append(romaji(text))
+            for key in keys:
+                postings = table.setdefault(key, [])
+                if (n, form) not in postings:
+                    postings.append((n, form))
+    return table
+
+
+def encode(dictionary, romaji=None, restart=RESTART):
+    """Build the front-coded index of a {"version", "words"} dictionary."""
+    words = dictionary['words']
+    table = surface_forms(words, romaji)
+    forms = ['dictionary']
+    for word in words:
+        for form in word['conjugations']:
+            if form not in forms:
+                forms.append(form)
+    form_ids = {form: i for i, form in enumerate(forms)}
+
+    shared, suffix, counts, postings = [], [], [], []
+    previous = ''
+    for i, key in enumerate(sorted(table)):
+        n = 0 if i % restart == 0 else _shared_prefix(previous, key)
+        shared.append(n)
+        suffix.append(key[n:])
+        entries = table[key]
+        counts.append(len(entries))
+        postings.extend(entry * len(forms) + form_ids[form] for entry, form in entries)
+        previous = key
+
+    return {
+        'format': FORMAT,
+        'version': dictionary.get('version'),
+        'ids': [w['id'] for w in words],
+        'forms': forms,
+        'restart': restart,
+        'shared': shared,
+        'suffix': suffix,
+        'counts': counts,
+        'postings': postings,
+    }
+
+
+class FormIndex:
+    """Lookups on a decoded index, without expanding it into a dict."""
+
+    def __init__(self, index):
+        if index.get('format') != FORMAT:
+            raise ValueError(f"unknown index format {index.get('format')!r}")
+        self.ids = index['ids']
+        self.forms = index['forms']
+        self.restart = index['restart']
+        self.shared = index['shared']
+        self.suffix = index['suffix']
+        self.postings = index['postings']
+        self.offsets = [0]
+        for count in index['counts']:
+            self.offsets.append(self.offsets[-1] + count)
+        # Keys at restart points are stored whole
+        self.heads = self.suffix[::self.restart]
+
+    def __len__(self):
+        return len(self.suffix)
+
+    def _decode(self, posting):
+        entry, form = divmod(posting, len(self.forms))
+        return self.ids[entry], self.forms[form]
+
+    def lookup(self, text):
+        """[(entry id, form), ...] for a surface form, empty if it is unknown."""
+        block = bisect.bisect_right(self.heads, text) - 1
+        if block < 0:
+            return []
+        start = block * self.restart
+        key = ''
+        for i in range(start, min(start + self.restart, len(self.suffix))):
+            key = key[:self.shared[i]] + self.suffix[i]
+            if key == text:
+                return [self._decode(p) for p in self.postings[self.offsets[i]:self.offsets[i + 1]]]
+            if key > text:
+                break
+        return []
+
+    def items(self):
+        """Yield (surface form, [(entry id, form), ...]) in key order."""
+        key = ''
+        for i, suffix in enumerate(self.suffix):
+            key = key[:self.shared[i]] + suffix
+            yield key, [self._decode(p) for p in self.postings[self.offsets[i]:self.offsets[i + 1]]]
+
+
+def collision_report(index):
+    """
+    Counts of ambiguous keys: within one entry, by the set of forms sharing
+    a surface (e.g. passive+potential), and across different entries.
+    """
+    within = {}
+    across = 0
+    examples = []
+    ambiguous = 0
+    for key, postings in FormIndex(index).items():
+        if len(postings) < 2:
+            continue
+        ambiguous += 1
+        by_entry = {}
+        for entry_id, form in postings:
+            by_entry.setdefault(entry_id, []).append(form)
+        for forms in by_entry.values():
+            if len(forms) > 1:
+                name = '+'.join(sorted(forms))
+                within[name] = within.get(name, 0) + 1
+        if len(by_entry) > 1:
+            across += 1
+            if len(examples) < 10:
+                examples.append({'form': key, 'entries': postings})
+    return {
+        'keys': len(index['suffix']),
+        'postings': len(index['postings']),
+        'ambiguous_keys': ambiguous,
+        'across_entries': across,
+        'within_entry': dict(sorted(within.items(), key=lambda item: -item[1])),
+        'examples': examples,
+    }
+
+
+def write_form_index(input_path, output_path, romaji=None):
+    """Index input_path into output_path; returns (index body bytes, collision report)."""
+    with open(input_path, 'r', encoding='utf-8') as f:
+        dictionary = json.load(f)
+    index = encode(dictionary, romaji)
+    body = json.dumps(index, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    with open(output_path, 'wb') as f:
+        f.write(body)
+    return body, collision_report(index)
+
+
+def print_report(report, file=sys.stderr):
+    print(f"Form index: {report['keys']:,} keys, {report['postings']:,} postings, "
+          f"{report['ambiguous_keys']:,} ambiguous ({report['across_entries']:,} across entries)",
+          file=file)
+    for forms, count in report['within_entry'].items():
+        print(f"  {forms:<40} {count:>6,}", file=file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--input', default=DICTIONARY_FILE)
+    parser.add_argument('--output', help='default: <input>.forms.json')
+    parser.add_argument('--romaji', action='store_true', help='also index romaji spellings')
+    parser.add_argument('--report', help='write the collision report as JSON here')
+    args = parser.parse_args()
+    output = args.output or os.path.splitext(args.input)[0] + '.forms.json'
+
+    romaji = None
+    if args.romaji:
+        from generate_dictionary_jisho import kana_to_romaji
+        romaji = kana_to_romaji
+    body, report = write_form_index(args.input, output, romaji)
+    print_report(report)
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    # Every form of every entry must come back from the written index
+    with open(args.input, 'r', encoding='utf-8') as f:
+        words = json.load(f)['words']
+    index = FormIndex(json.loads(body))
+    missing = 0
+    for word in words:
+        for form, text in [('dictionary', word['dictionary_form']['kana']), *word['conjugations'].items()]:
+            missing += (word['id'], form) not in index.lookup(text)
+    print(f"Wrote {output} ({len(body):,} bytes)")
+    if missing:
+        print(f"❌ {missing} forms not found in the index")
+        sys.exit(1)
+    print("✅ Every form resolves to its entry")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,19 +1,53 @@
 #!/usr/bin/env python3
 """
 Fetches JLPT N5/N4/N3 words from Jisho API and generates dictionary.json
-with full conjugation data for verbs and adjectives.
+with full conjugation data for verbs and adjectives. With --jmdict the words
+are read from a local JMdict dump instead, without network access.
 """
 
+import argparse
+import cProfile
+import gzip
+import hashlib
+import inspect
 import json
+import os
+import pstats
+import random
+import threading
 import time
-import urllib.request
 import urllib.error
 import sys
+import tempfile
+import zlib
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+
+from compact_dictionary import write_compact
+from form_index import print_report, write_form_index
+from http_client import HttpClient, TokenBucket, retry_after, write_atomic
+from conjugation_engine import GROUPS, ID_PREFIX, conjugate_many, group_rules
+from jmdict_source import iter_jmdict
 
 JISHO_API = "https://jisho.org/api/v1/search/words"
+USER_AGENT = 'KatachiApp/1.0'
 LEVELS = ["n5", "n4", "n3"]
 OUTPUT_FILE = "src/data/dictionaries/dictionary.json"
 REQUEST_DELAY = 1.2  # seconds between API calls
+REQUEST_RATE = 1 / REQUEST_DELAY  # shared across all fetch workers
+FETCH_WORKERS = 4
+FETCH_ATTEMPTS = 5
+BACKOFF_BASE = 1.5  # seconds, doubled on every retry
+PAGE_SIZE = 20
+CACHE_DIR = ".cache/jisho"
+CACHE_TTL = 7 * 24 * 3600  # seconds before a cached page is refetched
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+MANIFEST_FILE = ".cache/dictionary-manifest.json"
+MANIFEST_VERSION = 2
+METRICS_FILE = ".cache/dictionary-metrics.json"
+JMDICT_PAGE_SIZE = 500  # JMdict entries conjugated per batch
+BUILD_WORKERS = 1  # processes conjugating pages; 1 builds in-process
 
 # ---------------------------------------------------------------------------
 # Kana → Romaji conversion
@@ -50,449 +84,1184 @@ _ROMAJI_MAP = [
     ('ー',''),
 ]
 
+def _build_romaji_trie(pairs):
+    """Compile (kana, romaji) pairs into nested {char: [romaji or None, children]} nodes."""
+    root = {}
+    for kana, romaji in pairs:
+        node = root
+        for ch in kana[:-1]:
+            node = node.setdefault(ch, [None, {}])[1]
+        node.setdefault(kana[-1], [None, {}])[0] = romaji
+    return root
+
+_ROMAJI_TRIE = _build_romaji_trie(_ROMAJI_MAP)
+_VOWELS = frozenset('aeiou')
+
+def _longest_match(text, i, n):
+    """Return (romaji, end) for the longest map entry starting at text[i], or (None, i)."""
+    node = _ROMAJI_TRIE
+    best, best_end = None, i
+    j = i
+    while j < n:
+        child = node.get(text[j])
+        if child is None:
+            break
+        j += 1
+        if child[0] is not None:
+            best, best_end = child[0], j
+        node = child[1]
+    return best, best_end
+
 def kana_to_romaji(text):
-    result = ''
+    parts = []
     i = 0
-    while i < len(text):
+    n = len(text)
+    while i < n:
         if text[i] == 'っ':
             # Double next consonant
-            if i + 1 < len(text):
-                for kana, romaji in _ROMAJI_MAP:
-                    if text[i+1:].startswith(kana) and romaji and romaji[0] not in 'aeiou':
-                        result += romaji[0]
-                        break
+            romaji, _ = _longest_match(text, i + 1, n)
+            if romaji and romaji[0] not in _VOWELS:
+                parts.append(romaji[0])
             i += 1
             continue
-        matched = False
-        for kana, romaji in _ROMAJI_MAP:
-            if text[i:].startswith(kana):
-                result += romaji
-                i += len(kana)
-                matched = True
-                break
-        if not matched:
-            result += text[i]
+        romaji, end = _longest_match(text, i, n)
+        if romaji is None:
+            parts.append(text[i])
             i += 1
-    return result
+        else:
+            parts.append(romaji)
+            i = end
+    return ''.join(parts)
+
+def kana_to_romaji_many(texts):
+    """Transliterate an iterable of strings, returning a list in the same order."""
+    return list(map(kana_to_romaji, texts))
 
 # ---------------------------------------------------------------------------
-# Godan verb helpers
+# POS classification
 # ---------------------------------------------------------------------------
-GODAN_ROWS = {
-    'う': {'a':'わ','i':'い','e':'え','o':'お'},
-    'く': {'a':'か','i':'き','e':'け','o':'こ'},
-    'ぐ': {'a':'が','i':'ぎ','e':'げ','o':'ご'},
-    'す': {'a':'さ','i':'し','e':'せ','o':'そ'},
-    'つ': {'a':'た','i':'ち','e':'て','o':'と'},
-    'ぬ': {'a':'な','i':'に','e':'ね','o':'の'},
-    'ぶ': {'a':'ば','i':'び','e':'べ','o':'ぼ'},
-    'む': {'a':'ま','i':'み','e':'め','o':'も'},
-    'る': {'a':'ら','i':'り','e':'れ','o':'ろ'},
-}
+# POS flags recorded on an EntryRecord
+POS_GODAN = 1 << 0
+POS_ICHIDAN = 1 << 1
+POS_SURU = 1 << 2
+POS_KURU = 1 << 3
+POS_I_ADJ = 1 << 4
+POS_NA_ADJ = 1 << 5
 
-# te-form / ta-form suffix by ending
-GODAN_TE_TA = {
-    'う': ('って','った'),
-    'つ': ('って','った'),
-    'る': ('って','った'),
-    'く': ('いて','いた'),
-    'ぐ': ('いで','いだ'),
-    'す': ('して','した'),
-    'ぬ': ('んで','んだ'),
-    'ぶ': ('んで','んだ'),
-    'む': ('んで','んだ'),
-}
+# Verb POS prefixes; the first one a payload lists decides its group
+_VERB_POS = (('Godan verb', POS_GODAN, 'godan'),
+             ('Ichidan verb', POS_ICHIDAN, 'ichidan'),
+             ('Suru verb', POS_SURU, 'suru'))
+_WORD_TYPES = {'godan': 'verb', 'ichidan': 'verb', 'suru': 'verb', 'kuru': 'verb',
+               'i-adj': 'i-adj', 'na-adj': 'na-adj'}
+_TAG_FLAGS = {}  # POS string -> (flags, verb group or None); Jisho uses a few dozen strings
 
-def conjugate_godan(stem, ending, kana):
-    """Conjugate a godan verb. stem = kana minus last char, ending = last char."""
-    rows = GODAN_ROWS[ending]
-    te_suf, ta_suf = GODAN_TE_TA[ending]
-
-    # 行く exception
-    is_iku = kana in ('いく', 'ゆく')
-    if is_iku:
-        te_suf, ta_suf = 'って', 'った'
-
-    past_plain = stem + ta_suf
-
-    conj = {
-        'polite':               stem + rows['i'] + 'ます',
-        'negative_plain':       stem + rows['a'] + 'ない',
-        'negative_polite':      stem + rows['i'] + 'ません',
-        'past_plain':           past_plain,
-        'past_polite':          stem + rows['i'] + 'ました',
-        'past_negative_plain':  stem + rows['a'] + 'なかった',
-        'past_negative_polite': stem + rows['i'] + 'ませんでした',
-        'te_form':              stem + te_suf,
-        'potential':            stem + rows['e'] + 'る',
-        'passive':              stem + rows['a'] + 'れる',
-        'causative':            stem + rows['a'] + 'せる',
-        'causative_passive':    stem + rows['a'] + 'せられる',
-        'imperative':           stem + rows['e'],
-        'volitional':           stem + rows['o'] + 'う',
-        'conditional_ba':       stem + rows['e'] + 'ば',
-        'conditional_tara':     past_plain + 'ら',
-    }
+def _tag_flags(tag):
+    cached = _TAG_FLAGS.get(tag)
+    if cached is None:
+        flags, verb_group = 0, None
+        for prefix, flag, group in _VERB_POS:
+            if tag.startswith(prefix):
+                flags, verb_group = flag, group
+                break
+        if 'Kuru verb' in tag:
+            flags |= POS_KURU
+        if 'I-adjective' in tag:
+            flags |= POS_I_ADJ
+        if 'Na-adjective' in tag:
+            flags |= POS_NA_ADJ
+        cached = _TAG_FLAGS[tag] = (flags, verb_group)
+    return cached
 
-    # ある exception: plain negative → ない
-    if kana == 'ある':
-        conj['negative_plain'] = 'ない'
-        conj['past_negative_plain'] = 'なかった'
-
-    return conj
-
-def conjugate_ichidan(stem):
-    """Conjugate an ichidan verb. stem = kana minus る."""
-    past_plain = stem + 'た'
-    return {
-        'polite':               stem + 'ます',
-        'negative_plain':       stem + 'ない',
-        'negative_polite':      stem + 'ません',
-        'past_plain':           past_plain,
-        'past_polite':          stem + 'ました',
-        'past_negative_plain':  stem + 'なかった',
-        'past_negative_polite': stem + 'ませんでした',
-        'te_form':              stem + 'て',
-        'potential':            stem + 'られる',
-        'passive':              stem + 'られる',
-        'causative':            stem + 'させる',
-        'causative_passive':    stem + 'させられる',
-        'imperative':           stem + 'ろ',
-        'volitional':           stem + 'よう',
-        'conditional_ba':       stem + 'れば',
-        'conditional_tara':     past_plain + 'ら',
-    }
+class EntryRecord:
+    """
+    One source entry, normalized once: everything later stages read, so the
+    raw nested payload is walked a single time. `kana`/`kanji` already carry
+    する for suru verbs; `group` is None when the entry does not conjugate.
+    """
+    __slots__ = ('kana', 'kanji', 'pos', 'group', 'word_type', 'meaning', 'dedup_key')
 
-def conjugate_suru(prefix):
-    """Conjugate a suru verb. prefix = noun part (empty string for する itself)."""
-    return {
-        'polite':               prefix + 'します',
-        'negative_plain':       prefix + 'しない',
-        'negative_polite':      prefix + 'しません',
-        'past_plain':           prefix + 'した',
-        'past_polite':          prefix + 'しました',
-        'past_negative_plain':  prefix + 'しなかった',
-        'past_negative_polite': prefix + 'しませんでした',
-        'te_form':              prefix + 'して',
-        'potential':            prefix + 'できる',
-        'passive':              prefix + 'される',
-        'causative':            prefix + 'させる',
-        'causative_passive':    prefix + 'させられる',
-        'imperative':           prefix + 'しろ',
-        'volitional':           prefix + 'しよう',
-        'conditional_ba':       prefix + 'すれば',
-        'conditional_tara':     prefix + 'したら',
-    }
+    def __init__(self, kana, kanji, pos, group, meaning, dedup_key):
+        self.kana = kana
+        self.kanji = kanji
+        self.pos = pos
+        self.group = group
+        self.word_type = _WORD_TYPES.get(group)
+        self.meaning = meaning
+        self.dedup_key = dedup_key
 
-def conjugate_kuru(prefix=''):
-    """Conjugate 来る. prefix = kanji/kana before くる if compound (usually empty)."""
-    return {
-        'polite':               prefix + 'きます',
-        'negative_plain':       prefix + 'こない',
-        'negative_polite':      prefix + 'きません',
-        'past_plain':           prefix + 'きた',
-        'past_polite':          prefix + 'きました',
-        'past_negative_plain':  prefix + 'こなかった',
-        'past_negative_polite': prefix + 'きませんでした',
-        'te_form':              prefix + 'きて',
-        'potential':            prefix + 'こられる',
-        'passive':              prefix + 'こられる',
-        'causative':            prefix + 'こさせる',
-        'causative_passive':    prefix + 'こさせられる',
-        'imperative':           prefix + 'こい',
-        'volitional':           prefix + 'こよう',
-        'conditional_ba':       prefix + 'くれば',
-        'conditional_tara':     prefix + 'きたら',
-    }
+    @property
+    def buildable(self):
+        return self.group is not None and bool(self.kana)
 
-def conjugate_i_adj(kana):
-    """Conjugate an i-adjective. kana includes the trailing い."""
-    # Special case: いい / よい
-    if kana in ('いい', 'よい'):
-        return {
-            'polite':               'いいです',
-            'negative_plain':       'よくない',
-            'negative_polite':      'よくないです',
-            'past_plain':           'よかった',
-            'past_polite':          'よかったです',
-            'past_negative_plain':  'よくなかった',
-            'past_negative_polite': 'よくなかったです',
-            'te_form':              'よくて',
-            'conditional_ba':       'よければ',
-            'conditional_tara':     'よかったら',
-        }
-
-    # Special case: かっこいい
-    if kana == 'かっこいい':
-        stem = 'かっこよ'
-        return {
-            'polite':               kana + 'です',
-            'negative_plain':       stem + 'くない',
-            'negative_polite':      stem + 'くないです',
-            'past_plain':           stem + 'かった',
-            'past_polite':          stem + 'かったです',
-            'past_negative_plain':  stem + 'くなかった',
-            'past_negative_polite': stem + 'くなかったです',
-            'te_form':              stem + 'くて',
-            'conditional_ba':       stem + 'ければ',
-            'conditional_tara':     stem + 'かったら',
-        }
-
-    stem = kana[:-1]  # Remove い
-    return {
-        'polite':               kana + 'です',
-        'negative_plain':       stem + 'くない',
-        'negative_polite':      stem + 'くないです',
-        'past_plain':           stem + 'かった',
-        'past_polite':          stem + 'かったです',
-        'past_negative_plain':  stem + 'くなかった',
-        'past_negative_polite': stem + 'くなかったです',
-        'te_form':              stem + 'くて',
-        'conditional_ba':       stem + 'ければ',
-        'conditional_tara':     stem + 'かったら',
-    }
+def normalize_entry(entry):
+    """Walk a raw Jisho result once and return its EntryRecord."""
+    japanese = entry.get('japanese', [{}])[0]
+    kana = japanese.get('reading', '')
+    word = japanese.get('word', kana)
 
-def conjugate_na_adj(kana):
-    """Conjugate a na-adjective. kana is the stem (without な)."""
-    return {
-        'polite':               kana + 'です',
-        'negative_plain':       kana + 'じゃない',
-        'negative_polite':      kana + 'じゃありません',
-        'past_plain':           kana + 'だった',
-        'past_polite':          kana + 'でした',
-        'past_negative_plain':  kana + 'じゃなかった',
-        'past_negative_polite': kana + 'じゃありませんでした',
-        'te_form':              kana + 'で',
-        'conditional_ba':       kana + 'であれば',
-        'conditional_tara':     kana + 'だったら',
-    }
+    pos = 0
+    verb_group = None
+    meanings = []
+    for sense in entry.get('senses', []):
+        for tag in sense.get('parts_of_speech', []):
+            flags, group = _tag_flags(tag)
+            pos |= flags
+            verb_group = verb_group or group
+        # English meaning from the first sense that has one
+        if not meanings:
+            meanings.extend(sense.get('english_definitions', [])[:2])
+    return _make_record(kana, word, pos, verb_group, meanings)
+
+# JMdict POS codes, in the (flags, verb group) shape _tag_flags returns. Codes
+# the engine cannot conjugate (v5aru, v5u-s, v5uru, vs-s, ...) are left out;
+# v5k-s (行く and its compounds) gets its って forms from the engine's
+# ENDING_SUFFIX_OVERRIDES.
+JMDICT_POS = {
+    'v1': (POS_ICHIDAN, 'ichidan'), 'v1-s': (POS_ICHIDAN, 'ichidan'),
+    'vs': (POS_SURU, 'suru'), 'vs-i': (POS_SURU, 'suru'),
+    'vk': (POS_KURU, None),
+    'adj-i': (POS_I_ADJ, None), 'adj-ix': (POS_I_ADJ, None),
+    'adj-na': (POS_NA_ADJ, None),
+}
+JMDICT_POS.update({code: (POS_GODAN, 'godan') for code in (
+    'v5b', 'v5g', 'v5k', 'v5k-s', 'v5m', 'v5n', 'v5r', 'v5r-i', 'v5s', 'v5t', 'v5u')})
+
+def normalize_jmdict(entry):
+    """EntryRecord for a jmdict_source.JMdictEntry."""
+    pos = 0
+    verb_group = None
+    for code in entry.pos:
+        flags, group = JMDICT_POS.get(code, (0, None))
+        pos |= flags
+        verb_group = verb_group or group
+    meanings = next((glosses[:2] for glosses in entry.glosses if glosses), [])
+    return _make_record(entry.kana, entry.kanji or entry.kana, pos, verb_group, meanings)
+
+def _make_record(kana, word, pos, verb_group, meanings):
+    # Check for 来る specifically
+    if word == '来る' or (kana == 'くる' and pos & POS_KURU):
+        group = 'kuru'
+    elif verb_group:
+        group = verb_group
+    elif pos & POS_I_ADJ:
+        group = 'i-adj'
+    elif pos & POS_NA_ADJ:
+        group = 'na-adj'
+    else:
+        group = None
+
+    # Deduplicate by kana; suru verbs by their する form
+    dedup_key = kana or word
+    if group == 'suru':
+        dedup_key = kana if kana.endswith('する') else kana + 'する'
+        if kana:
+            kana = dedup_key
+            if not word.endswith('する'):
+                word = word + 'する'
+
+    return EntryRecord(kana, word, pos, group, '; '.join(meanings[:3]), dedup_key)
 
-# ---------------------------------------------------------------------------
-# POS classification
-# ---------------------------------------------------------------------------
 def classify_entry(entry):
     """
     Returns (group, word_type) or None if not a conjugatable word.
     group: 'godan'|'ichidan'|'suru'|'kuru'|'i-adj'|'na-adj'
     word_type: 'verb'|'i-adj'|'na-adj'
     """
-    japanese = entry.get('japanese', [{}])[0]
-    kana = japanese.get('reading', '')
-    word = japanese.get('word', kana)
+    record = normalize_entry(entry)
+    return (record.group, record.word_type) if record.group else None
 
-    # Collect all POS strings across senses
-    all_pos = []
-    for sense in entry.get('senses', []):
-        all_pos.extend(sense.get('parts_of_speech', []))
+# ---------------------------------------------------------------------------
+# Instrumentation
+# ---------------------------------------------------------------------------
+class Metrics:
+    """
+    Wall and CPU time per pipeline stage plus event counters. CPU time is
+    process time, so a stage that waits on fetch workers is charged for
+    their work as well. Safe to update from worker threads.
+    """
 
-    # Check for 来る specifically
-    if word == '来る' or (kana == 'くる' and any('Kuru verb' in p for p in all_pos)):
-        return ('kuru', 'verb')
+    def __init__(self):
+        self.stages = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
 
-    for pos in all_pos:
-        if pos.startswith('Godan verb'):
-            return ('godan', 'verb')
-        if pos.startswith('Ichidan verb'):
-            return ('ichidan', 'verb')
-        if pos.startswith('Suru verb'):
-            return ('suru', 'verb')
+    @contextmanager
+    def stage(self, name):
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - wall, time.process_time() - cpu)
 
-    for pos in all_pos:
-        if 'I-adjective' in pos:
-            return ('i-adj', 'i-adj')
+    def add_time(self, name, wall, cpu):
+        with self._lock:
+            stage = self.stages.setdefault(name, {'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'calls': 0})
+            stage['wall_seconds'] += wall
+            stage['cpu_seconds'] += cpu
+            stage['calls'] += 1
 
-    for pos in all_pos:
-        if 'Na-adjective' in pos:
-            return ('na-adj', 'na-adj')
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def timed(self, iterable, name):
+        """Yield from `iterable`, charging the time spent waiting for each item to `name`."""
+        it = iter(iterable)
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(it)
+                except StopIteration:
+                    return
+            yield item
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'wall_seconds': round(time.perf_counter() - self._wall, 6),
+                'cpu_seconds': round(time.process_time() - self._cpu, 6),
+                'stages': {name: {k: round(v, 6) for k, v in stage.items()}
+                           for name, stage in self.stages.items()},
+                'counters': dict(sorted(self.counters.items())),
+            }
+
+    def write(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        write_atomic(path, json.dumps(self.to_dict(), indent=2).encode('utf-8'))
+
+    def summary(self):
+        data = self.to_dict()
+        lines = [f"{'Stage':<10} | {'Wall s':>8} | {'CPU s':>8} | {'Calls':>7}", '-' * 42]
+        for name, stage in data['stages'].items():
+            lines.append(f"{name:<10} | {stage['wall_seconds']:>8.3f} | {stage['cpu_seconds']:>8.3f} | "
+                         f"{stage['calls']:>7}")
+        lines.append(f"{'total':<10} | {data['wall_seconds']:>8.3f} | {data['cpu_seconds']:>8.3f} |")
+        lines.append(', '.join(f"{k} {v}" for k, v in data['counters'].items()))
+        return '\n'.join(lines)
+
+# ---------------------------------------------------------------------------
+# Jisho response cache
+# ---------------------------------------------------------------------------
+class PageCache:
+    """
+    Content-addressed on-disk cache of raw Jisho pages.
+
+    Payloads live in objects/<sha256>.json; index.json maps "level:page" to
+    the payload hash and the time it was stored. Identical pages share one
+    object, entries older than `ttl` are refetched, and the oldest entries
+    are evicted once the stored objects exceed `max_bytes`.
+    """
+
+    def __init__(self, root=CACHE_DIR, ttl=CACHE_TTL, max_bytes=CACHE_MAX_BYTES):
+        self.root = root
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.objects_dir = os.path.join(root, 'objects')
+        self.index_path = os.path.join(root, 'index.json')
+        self.index = {}
+        self._lock = threading.Lock()
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self.index = json.load(f)
+
+    @staticmethod
+    def _key(level, page):
+        return f"{level}:{page}"
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, f"{digest}.json")
+
+    def get(self, level, page, allow_stale=False):
+        """Return the cached payload for (level, page), or None on a miss."""
+        with self._lock:
+            record = self.index.get(self._key(level, page))
+        if not record:
+            return None
+        if not allow_stale and time.time() - record['stored_at'] > self.ttl:
+            return None
+        try:
+            with open(self._object_path(record['hash']), 'rb') as f:
+                body = f.read()
+        except FileNotFoundError:
+            return None
+        if hashlib.sha256(body).hexdigest() != record['hash']:
+            print(f"  Cache object for {level} page {page} is corrupt, ignoring", file=sys.stderr)
+            return None
+        return json.loads(body)
+
+    def put(self, level, page, data):
+        """Store a payload for (level, page) and enforce the size limit."""
+        body = json.dumps(data, ensure_ascii=False, sort_keys=True,
+                          separators=(',', ':')).encode('utf-8')
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._object_path(digest)
+        with self._lock:
+            if not os.path.exists(path):
+                os.makedirs(self.objects_dir, exist_ok=True)
+                write_atomic(path, body)
+            self.index[self._key(level, page)] = {
+                'hash': digest,
+                'size': len(body),
+                'stored_at': time.time(),
+            }
+            self._evict()
+            self._save()
+
+    def _evict(self):
+        """Drop the oldest entries until the referenced objects fit in max_bytes."""
+        sizes = {r['hash']: r['size'] for r in self.index.values()}
+        total = sum(sizes.values())
+        by_age = sorted(self.index.items(), key=lambda item: item[1]['stored_at'])
+        for key, record in by_age:
+            if total <= self.max_bytes:
+                break
+            del self.index[key]
+            if all(r['hash'] != record['hash'] for r in self.index.values()):
+                total -= sizes.pop(record['hash'])
+
+        # Remove objects no index entry points at any more
+        if os.path.isdir(self.objects_dir):
+            live = {r['hash'] for r in self.index.values()}
+            for name in os.listdir(self.objects_dir):
+                if name.endswith('.json') and name[:-5] not in live:
+                    os.remove(os.path.join(self.objects_dir, name))
+
+    def _save(self):
+        os.makedirs(self.root, exist_ok=True)
+        body = json.dumps(self.index, indent=2, sort_keys=True).encode('utf-8')
+        write_atomic(self.index_path, body)
 
-    return None
 
 # ---------------------------------------------------------------------------
 # Jisho API fetching
 # ---------------------------------------------------------------------------
-def fetch_page(level, page):
-    """Fetch a single page of results from Jisho API."""
-    url = f"{JISHO_API}?keyword=%23jlpt-{level}&page={page}"
-    for attempt in range(3):
+class PageUnavailable(Exception):
+    """A page could not be fetched or, when replaying, is not in the cache."""
+
+def fetch_page(level, page, api_url=JISHO_API, limiter=None, metrics=None, client=None):
+    """
+    Fetch a single page of results from Jisho API. 429 and 5xx responses are
+    retried after Retry-After (or exponential backoff with jitter), and the
+    delay is applied to the shared limiter so other workers back off too.
+    Pass a shared HttpClient to reuse its keep-alive connections.
+    """
+    if client is None:
+        client = HttpClient(headers={'User-Agent': USER_AGENT})
+    url = f"{api_url}?keyword=%23jlpt-{level}&page={page}"
+    for attempt in range(FETCH_ATTEMPTS):
+        if limiter is not None:
+            limiter.acquire()
+        delay = BACKOFF_BASE * 2 ** attempt * random.uniform(0.75, 1.25)
+        if metrics is not None:
+            metrics.count('requests')
+            if attempt:
+                metrics.count('retries')
         try:
-            req = urllib.request.Request(url, headers={'User-Agent': 'KatachiApp/1.0'})
-            with urllib.request.urlopen(req, timeout=15) as resp:
-                return json.loads(resp.read().decode('utf-8'))
-        except (urllib.error.URLError, TimeoutError) as e:
-            print(f"  Retry {attempt+1}/3 for page {page}: {e}", file=sys.stderr)
-            time.sleep(3)
-    print(f"  FAILED to fetch page {page} after 3 attempts", file=sys.stderr)
+            return client.get_json(url)
+        except urllib.error.HTTPError as e:
+            if e.code != 429 and e.code < 500:
+                print(f"  {level} page {page}: HTTP {e.code}, giving up", file=sys.stderr)
+                return None
+            requested = retry_after(e)
+            if requested is not None:
+                delay = requested
+            if limiter is not None:
+                limiter.pause(delay)
+            print(f"  Retry {attempt+1}/{FETCH_ATTEMPTS} for {level} page {page}: "
+                  f"HTTP {e.code}, waiting {delay:.1f}s", file=sys.stderr)
+        except (urllib.error.URLError, TimeoutError, gzip.BadGzipFile, OSError, EOFError,
+                zlib.error, ValueError) as e:
+            # A truncated or corrupt body fails in gzip or json.loads, after the
+            # transport succeeded; it is as transient as a dropped connection
+            print(f"  Retry {attempt+1}/{FETCH_ATTEMPTS} for {level} page {page}: {e}", file=sys.stderr)
+        time.sleep(delay)
+    print(f"  FAILED to fetch {level} page {page} after {FETCH_ATTEMPTS} attempts", file=sys.stderr)
+    if metrics is not None:
+        metrics.count('failed_pages')
     return None
 
-def fetch_level(level):
-    """Fetch all words for a JLPT level."""
-    words = []
-    page = 1
-    while True:
-        print(f"  Fetching {level} page {page}...", file=sys.stderr)
-        data = fetch_page(level, page)
-        if not data or not data.get('data'):
-            break
-        words.extend(data['data'])
-        if len(data['data']) < 20:
-            break
-        page += 1
-        time.sleep(REQUEST_DELAY)
+def load_page(level, page, cache=None, replay=False, api_url=JISHO_API, limiter=None,
+              metrics=None, client=None):
+    """
+    Return the payload for a page, consulting the cache first.
+    In replay mode the network is never touched and stale entries are served.
+    Raises PageUnavailable for a replay miss or a page that failed to fetch.
+    """
+    print(f"  Fetching {level} page {page}...", file=sys.stderr)
+    if cache is not None:
+        data = cache.get(level, page, allow_stale=replay)
+        if data is not None:
+            if metrics is not None:
+                metrics.count('cache_hits')
+            return data
+    if replay:
+        raise PageUnavailable(f"{level} page {page} is not cached")
+    data = fetch_page(level, page, api_url, limiter, metrics, client)
+    if data is None:
+        raise PageUnavailable(f"{level} page {page} could not be fetched")
+    if cache is not None:
+        cache.put(level, page, data)
+    return data
+
+def iter_pages(levels, cache=None, replay=False, api_url=JISHO_API,
+               workers=FETCH_WORKERS, rate=REQUEST_RATE, max_pending=None, metrics=None,
+               client=None):
+    """
+    Yield (level, words) for every page of several JLPT levels, fetched concurrently.
+
+    Pages are handed to a thread pool lowest-page-first across levels, with
+    every network request drawing from one token bucket. A level ends at its
+    first empty or short page; pages speculatively fetched past that point
+    are dropped. A page that could not be loaded raises PageUnavailable
+    once the stream reaches it, so a gap never passes for the end of a
+    level (one past the end is dropped like any other). Pages are yielded level by level in page order, so the
+    stream does not depend on completion order. At most `max_pending` pages
+    are buffered or in flight at once (the page the stream is waiting for is
+    always allowed), which keeps memory flat however many pages there are.
+    Requests share `client`'s keep-alive connections (one pool per call if
+    none is given).
+    """
+    if max_pending is None:
+        max_pending = 4 * workers
+    if client is None:
+        client = HttpClient(max_idle=workers, headers={'User-Agent': USER_AGENT})
+    limiter = TokenBucket(rate)
+    next_page = {level: 1 for level in levels}
+    last_page = {}  # level -> last page holding data, once known
+    buffered = {}
+    in_flight = {}
+    emit_index, emit_page = 0, 1
+
+    def submit(pool, level, page):
+        future = pool.submit(load_page, level, page, cache, replay, api_url, limiter,
+                             metrics, client)
+        in_flight[future] = (level, page)
+
+    def submit_more(pool):
+        while len(in_flight) < workers:
+            open_levels = [level for level in levels
+                           if next_page[level] <= last_page.get(level, float('inf'))]
+            if not open_levels:
+                return
+            level = min(open_levels, key=lambda lv: (next_page[lv], levels.index(lv)))
+            if len(buffered) + len(in_flight) >= max_pending:
+                # Only the page the stream is blocked on may still go out
+                level = levels[emit_index] if emit_index < len(levels) else None
+                if level is None or next_page[level] != emit_page:
+                    return
+            page = next_page[level]
+            next_page[level] += 1
+            submit(pool, level, page)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        submit_more(pool)
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                level, page = in_flight.pop(future)
+                if page > last_page.get(level, float('inf')):
+                    continue
+                try:
+                    words = future.result().get('data')
+                except PageUnavailable as e:
+                    buffered[(level, page)] = e
+                    continue
+                buffered[(level, page)] = words
+                if not words:
+                    end = page - 1
+                elif len(words) < PAGE_SIZE:
+                    end = page
+                else:
+                    continue
+                last_page[level] = min(last_page.get(level, end), end)
+                for key in [k for k in buffered if k[0] == level and k[1] > end]:
+                    del buffered[key]
+
+            while emit_index < len(levels):
+                level = levels[emit_index]
+                if emit_page > last_page.get(level, float('inf')):
+                    emit_index, emit_page = emit_index + 1, 1
+                    continue
+                if (level, emit_page) not in buffered:
+                    break
+                words = buffered.pop((level, emit_page))
+                if isinstance(words, PageUnavailable):
+                    raise words
+                emit_page += 1
+                if metrics is not None:
+                    metrics.count('pages')
+                yield level, words
+            submit_more(pool)
+
+def fetch_levels(levels, cache=None, replay=False, api_url=JISHO_API,
+                 workers=FETCH_WORKERS, rate=REQUEST_RATE):
+    """Fetch all words for several JLPT levels concurrently, as {level: [raw, ...]}."""
+    words = {level: [] for level in levels}
+    for level, page_words in iter_pages(levels, cache, replay, api_url, workers, rate):
+        words[level].extend(page_words)
     return words
 
+def fetch_level(level, cache=None, replay=False, api_url=JISHO_API):
+    """Fetch all words for a JLPT level."""
+    return fetch_levels([level], cache, replay, api_url, workers=1)[level]
+
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
-def build_entry(raw, level_str, used_ids):
-    """Build a dictionary entry from a raw Jisho result. Returns None if not conjugatable."""
-    classification = classify_entry(raw)
-    if not classification:
-        return None
+def prepare_entry(raw):
+    """Normalize a raw Jisho result into an EntryRecord, or None if it is not conjugatable."""
+    record = normalize_entry(raw)
+    return record if record.buildable else None
 
-    group, word_type = classification
-    japanese = raw.get('japanese', [{}])[0]
-    kana = japanese.get('reading', '')
-    kanji = japanese.get('word', kana)
+def entry_body(record, conjugations, level_str):
+    """
+    Everything in an entry except its ID, plus the base ID it will be
+    allocated from. Depends only on the record, so it can be built anywhere.
+    """
+    romaji = kana_to_romaji(record.kana)
+    base_id = ID_PREFIX.get(record.word_type, 'na_') + romaji
+    return base_id, {
+        'level': level_str,
+        'group': record.group,
+        'word_type': record.word_type,
+        'dictionary_form': {
+            'kanji': record.kanji,
+            'kana': record.kana,
+            'romaji': romaji,
+        },
+        'meaning': record.meaning,
+        'conjugations': conjugations,
+    }
 
-    if not kana:
+def allocate_id(base_id, used_ids, entry_id=None):
+    """
+    Claim `entry_id` (kept from a previous build) or the first free one of
+    base_id, base_id_2, base_id_3, ... in `used_ids`.
+    """
+    if entry_id is None:
+        entry_id = base_id
+        counter = 2
+        while entry_id in used_ids:
+            entry_id = f"{base_id}_{counter}"
+            counter += 1
+    used_ids.add(entry_id)
+    return entry_id
+
+def finish_entry(record, conjugations, level_str, used_ids, entry_id=None):
+    """
+    Assemble an entry from an EntryRecord and its conjugations,
+    allocating an ID unless `entry_id` keeps one from a previous build.
+    """
+    base_id, body = entry_body(record, conjugations, level_str)
+    return {'id': allocate_id(base_id, used_ids, entry_id), **body}
+
+def build_entry(raw, level_str, used_ids, entry_id=None):
+    """
+    Build a dictionary entry from a raw Jisho result. Returns None if not conjugatable.
+    Pass `entry_id` to keep an ID assigned by a previous build.
+    """
+    record = prepare_entry(raw)
+    if not record:
         return None
+    conjugations = conjugate_many([(record.kana, record.group)])[0]
+    if conjugations is None:
+        return None
+    return finish_entry(record, conjugations, level_str, used_ids, entry_id)
 
-    # Get English meaning from first sense
-    meanings = []
-    for sense in raw.get('senses', []):
-        eng = sense.get('english_definitions', [])
-        if eng:
-            meanings.extend(eng[:2])
-        if meanings:
-            break
-    meaning = '; '.join(meanings[:3]) if meanings else ''
 
-    # For suru verbs, append する
-    if group == 'suru':
-        if not kana.endswith('する'):
-            kana = kana + 'する'
-        if not kanji.endswith('する'):
-            kanji = kanji + 'する'
+# ---------------------------------------------------------------------------
+# Incremental builds
+# ---------------------------------------------------------------------------
+# Everything that decides the output for one group. Changing a table or
+# function here only invalidates entries of the groups that list it.
+COMMON_RULES = (normalize_entry, normalize_jmdict, _make_record, EntryRecord, _tag_flags,
+                _VERB_POS, JMDICT_POS, entry_body, allocate_id, ID_PREFIX, conjugate_many,
+                kana_to_romaji, _longest_match, _ROMAJI_MAP)
+GROUP_RULES = {group: group_rules(group) for group in GROUPS}
 
-    # Compute conjugations
-    try:
-        if group == 'godan':
-            stem = kana[:-1]
-            ending = kana[-1]
-            if ending not in GODAN_ROWS:
-                return None
-            conjugations = conjugate_godan(stem, ending, kana)
-        elif group == 'ichidan':
-            if not kana.endswith('る'):
-                return None
-            stem = kana[:-1]
-            conjugations = conjugate_ichidan(stem)
-        elif group == 'suru':
-            prefix = kana[:-2]  # Remove する
-            conjugations = conjugate_suru(prefix)
-        elif group == 'kuru':
-            prefix = kana[:-2] if kana.endswith('くる') and len(kana) > 2 else ''
-            conjugations = conjugate_kuru(prefix)
-        elif group == 'i-adj':
-            if not kana.endswith('い'):
-                return None
-            conjugations = conjugate_i_adj(kana)
-        elif group == 'na-adj':
-            conjugations = conjugate_na_adj(kana)
-        else:
+def _fingerprint(parts):
+    h = hashlib.sha256()
+    for part in parts:
+        text = inspect.getsource(part) if callable(part) else repr(part)
+        h.update(text.encode('utf-8'))
+        h.update(b'\0')
+    return h.hexdigest()
+
+def rule_versions():
+    """Hash of the conjugation rules each group depends on."""
+    return {group: _fingerprint(COMMON_RULES + rules) for group, rules in GROUP_RULES.items()}
+
+def input_hash(raw, level_str):
+    """Hash of everything build_entry reads for one entry."""
+    body = json.dumps([level_str, raw], ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(body.encode('utf-8')).hexdigest()
+
+def record_hash(record, level_str):
+    """Hash of an EntryRecord, for sources that have no raw payload to hash."""
+    body = json.dumps([level_str, record.kana, record.kanji, record.pos, record.group, record.meaning],
+                      ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(body.encode('utf-8')).hexdigest()
+
+class PreviousBuild:
+    """
+    Manifest and output of the last build. Reused entries are read back one
+    at a time from their recorded byte range instead of loading the file.
+    """
+
+    def __init__(self, output_path, manifest):
+        self.manifest = manifest
+        self.entries = manifest['entries']
+        self.output_sha256 = manifest['output_sha256']
+        self._file = open(output_path, 'rb')
+
+    @classmethod
+    def open(cls, output_path, manifest_path):
+        """Return the previous build, or None when the manifest is missing or stale."""
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            digest = _file_sha256(output_path)
+        except FileNotFoundError:
             return None
-    except Exception as e:
-        print(f"  Conjugation error for {kanji} ({kana}): {e}", file=sys.stderr)
-        return None
+        if digest != manifest.get('output_sha256') or manifest.get('version') != MANIFEST_VERSION:
+            print("  Output changed since the manifest was written, rebuilding everything", file=sys.stderr)
+            return None
+        return cls(output_path, manifest)
 
-    # Build ID
-    romaji = kana_to_romaji(kana)
-    if word_type == 'verb':
-        base_id = f"v_{romaji}"
-    elif word_type == 'i-adj':
-        base_id = f"ia_{romaji}"
-    else:
-        base_id = f"na_{romaji}"
+    def load(self, record):
+        self._file.seek(record['offset'])
+        return json.loads(self._file.read(record['length']))
 
-    entry_id = base_id
-    counter = 2
-    while entry_id in used_ids:
-        entry_id = f"{base_id}_{counter}"
-        counter += 1
-    used_ids.add(entry_id)
+    def close(self):
+        self._file.close()
 
-    return {
-        'id': entry_id,
-        'level': level_str,
-        'group': group,
-        'word_type': word_type,
-        'dictionary_form': {
-            'kanji': kanji,
-            'kana': kana,
-            'romaji': romaji,
-        },
-        'meaning': meaning,
-        'conjugations': conjugations,
+
+def _file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def write_manifest(path, output_sha256, records):
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'output_sha256': output_sha256,
+        'rules': rule_versions(),
+        'entries': records,
     }
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    write_atomic(path, json.dumps(manifest, ensure_ascii=False, indent=2, sort_keys=True).encode('utf-8'))
+
+# ---------------------------------------------------------------------------
+# Streaming pipeline
+# ---------------------------------------------------------------------------
+def normalize_pages(pages, metrics):
+    """Jisho (level, raw words) pages -> (levels, records, input hashes) pages."""
+    for level, raw_words in pages:
+        level_str = level.upper()  # "N5", "N4", "N3"
+        metrics.count('raw_entries', len(raw_words))
+        with metrics.stage('classify'):
+            sources = [normalize_entry(raw) for raw in raw_words]
+        with metrics.stage('hash'):
+            hashes = [input_hash(raw, level_str) for raw in raw_words]
+        yield [level_str] * len(sources), sources, hashes
+
+def load_level_map(path):
+    """{dictionary-form kana: level} from a dictionary.json, or a plain {kana: level} JSON map."""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if 'words' in data:
+        return {w['dictionary_form']['kana']: w['level'] for w in data['words']}
+    return data
+
+def jmdict_pages(path, level_map, default_level=None, metrics=None, page_size=JMDICT_PAGE_SIZE):
+    """
+    (levels, records, input hashes) pages from a local JMdict dump. JMdict has
+    no JLPT levels, so each entry takes its level from `level_map` (keyed by
+    dictionary-form kana) or `default_level`; entries with neither are skipped.
+    Entries come out in JMdict order.
+    """
+    if metrics is None:
+        metrics = Metrics()
+    entries = metrics.timed(iter_jmdict(path), 'fetch')
+    while True:
+        batch = [entry for _, entry in zip(range(page_size), entries)]
+        if not batch:
+            return
+        metrics.count('raw_entries', len(batch))
+        with metrics.stage('classify'):
+            sources = [normalize_jmdict(entry) for entry in batch]
+        with metrics.stage('classify'):
+            levels, kept = [], []
+            for source in sources:
+                level_str = level_map.get(source.dedup_key, default_level)
+                if level_str is None:
+                    continue
+                levels.append(level_str)
+                kept.append(source)
+        with metrics.stage('hash'):
+            hashes = [record_hash(source, level_str) for source, level_str in zip(kept, levels)]
+        metrics.count('skipped_level', len(sources) - len(kept))
+        yield levels, kept, hashes
+
+def iter_entries(pages, previous=None, metrics=None, build_workers=BUILD_WORKERS):
+    """
+    Turn a stream of (level, raw words) pages into (dedup_key, record, entry)
+    as each page arrives. See iter_records.
+    """
+    if metrics is None:
+        metrics = Metrics()
+    return iter_records(normalize_pages(pages, metrics), previous, metrics, build_workers)
 
+def build_shard(levels, sources, wanted):
+    """
+    Conjugate and serialize the entries of one page flagged in `wanted`.
+    Returns, aligned with `sources`, (base_id, body, body JSON) for each
+    entry built and None for the rest. Only depends on its arguments, so
+    pages can be built in any process and in any order; dedup and IDs,
+    which depend on every earlier page, are settled by iter_records.
+    """
+    todo = [i for i, want in enumerate(wanted) if want]
+    built = [None] * len(sources)
+    for i, conjugations in zip(todo, conjugate_many((sources[i].kana, sources[i].group) for i in todo)):
+        if conjugations is not None:
+            base_id, body = entry_body(sources[i], conjugations, levels[i])
+            built[i] = base_id, body, json.dumps(body, ensure_ascii=False, indent=2)
+    return built
 
-def main():
-    all_entries = []
+def _with_id(entry_id, body_text):
+    """The JSON of {'id': entry_id, **body}, given the JSON of body."""
+    return '{\n  "id": ' + json.dumps(entry_id, ensure_ascii=False) + ',' + body_text[1:]
+
+def _built_pages(shards, workers, metrics):
+    """
+    Yield (shard, build_shard result) in input order. With several workers,
+    up to two pages per worker are built ahead in a process pool.
+    """
+    if workers <= 1:
+        for shard in shards:
+            levels, sources, _, wanted = shard
+            with metrics.stage('build'):
+                built = build_shard(levels, sources, wanted)
+            yield shard, built
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for shard in shards:
+            levels, sources, _, wanted = shard
+            pending.append((shard, pool.submit(build_shard, levels, sources, wanted)))
+            if len(pending) < 2 * workers:
+                continue
+            shard, future = pending.popleft()
+            with metrics.stage('build'):
+                built = future.result()
+            yield shard, built
+        while pending:
+            shard, future = pending.popleft()
+            with metrics.stage('build'):
+                built = future.result()
+            yield shard, built
+
+def iter_records(pages, previous=None, metrics=None, build_workers=BUILD_WORKERS):
+    """
+    Turn a stream of (levels, EntryRecords, input hashes) pages into
+    (dedup_key, record, entry), deduplicating and allocating IDs on the fly.
+    Each page is conjugated in one batch, in `build_workers` processes when
+    more than one; pages are merged back in input order, so the output does
+    not depend on the worker count. Entries whose input and rules are
+    unchanged since `previous` are read back instead of rebuilt. `record`
+    carries the entry's serialized JSON as 'text' when it was built here.
+    Stage times and counters go to `metrics`.
+    """
+    if metrics is None:
+        metrics = Metrics()
+    known = previous.entries if previous else {}
+    rules = rule_versions()
     used_ids = set()
     seen_kana = set()  # Deduplicate by kana
+    # Keep every previously issued ID reserved so new words never take one over
+    used_ids.update(record['id'] for record in known.values())
 
-    for level in LEVELS:
-        level_str = level.upper()  # "N5", "N4", "N3"
-        print(f"\n=== Fetching {level_str} ===", file=sys.stderr)
-        raw_words = fetch_level(level)
-        print(f"  Got {len(raw_words)} raw entries", file=sys.stderr)
-
-        level_count = 0
-        for raw in raw_words:
-            japanese = raw.get('japanese', [{}])[0]
-            kana = japanese.get('reading', '')
-            kanji = japanese.get('word', kana)
-
-            # Deduplicate
-            dedup_key = kana or kanji
-            # For suru verbs, check the する form
-            classification = classify_entry(raw)
-            if classification and classification[0] == 'suru':
-                dedup_key = kana + 'する' if not kana.endswith('する') else kana
+    def shards():
+        for levels, sources, hashes in pages:
+            with metrics.stage('dedup'):
+                keyed = []
+                for source, source_hash in zip(sources, hashes):
+                    record = known.get(source.dedup_key)
+                    reuse = bool(record and record['input'] == source_hash
+                                 and record['rules'] == rules.get(record['group']))
+                    keyed.append((source_hash, record, reuse))
+            wanted = [source.buildable and not reuse for source, (*_, reuse) in zip(sources, keyed)]
+            metrics.count('skipped_pos', sum(1 for source in sources if source.group is None))
+            yield levels, sources, keyed, wanted
 
+    for (levels, sources, keyed, wanted), built in _built_pages(shards(), build_workers, metrics):
+        for level_str, source, (source_hash, record, reuse), want, result in zip(
+                levels, sources, keyed, wanted, built):
+            dedup_key = source.dedup_key
             if dedup_key in seen_kana:
+                metrics.count('dedup_hits')
                 continue
 
-            entry = build_entry(raw, level_str, used_ids)
+            with metrics.stage('build'):
+                entry = text = None
+                if reuse:
+                    entry = previous.load(record)
+                elif result:
+                    base_id, body, body_text = result
+                    entry_id = allocate_id(base_id, used_ids, record['id'] if record else None)
+                    entry = {'id': entry_id, **body}
+                    text = _with_id(entry_id, body_text)
             if entry:
                 seen_kana.add(dedup_key)
-                all_entries.append(entry)
-                level_count += 1
+                metrics.count('entries')
+                if entry['id'] != ID_PREFIX[entry['word_type']] + entry['dictionary_form']['romaji']:
+                    metrics.count('id_collisions')
+                yield dedup_key, {
+                    'id': entry['id'],
+                    'group': entry['group'],
+                    'input': source_hash,
+                    'rules': rules[entry['group']],
+                    'reused': reuse,
+                    'text': text,
+                }, entry
+            elif want:
+                metrics.count('unconjugatable')
 
-        print(f"  Added {level_count} conjugatable entries for {level_str}", file=sys.stderr)
 
-    # Write output
-    output = {
-        'version': '2.0',
-        'words': all_entries,
-    }
+class DictionaryWriter:
+    """
+    Streams {"version", "words": [...]} to a temporary file with the same
+    layout json.dump(..., indent=2) produces, one entry at a time, and hashes
+    the bytes as they go out. `commit` moves the file into place.
+    """
+
+    def __init__(self, path, version='2.0'):
+        self.path = path
+        self.tmp_path = f"{path}.tmp"
+        self.count = 0
+        self.offset = 0
+        self._hash = hashlib.sha256()
+        self._file = open(self.tmp_path, 'wb')
+        self._emit('{\n  "version": ' + json.dumps(version) + ',\n  "words": [')
+
+    def _emit(self, text):
+        body = text.encode('utf-8')
+        self._file.write(body)
+        self._hash.update(body)
+        self.offset += len(body)
+
+    def write(self, entry, text=None):
+        """
+        Append one entry, or `text` when it is already the entry's
+        json.dumps(..., indent=2); returns its (offset, length) in bytes.
+        """
+        self._emit(',\n' if self.count else '\n')
+        if text is None:
+            text = json.dumps(entry, ensure_ascii=False, indent=2)
+        text = text.replace('\n', '\n    ')
+        start = self.offset
+        self._emit('    ' + text)
+        self.count += 1
+        return start, self.offset - start
+
+    def finish(self):
+        """Close the array and return the sha256 of the whole file."""
+        self._emit('\n  ]\n}' if self.count else ']\n}')
+        self._file.close()
+        return self._hash.hexdigest()
 
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        json.dump(output, f, ensure_ascii=False, indent=2)
+    def commit(self):
+        os.replace(self.tmp_path, self.path)
 
-    print(f"\nTotal entries: {len(all_entries)}", file=sys.stderr)
-    print(f"Written to {OUTPUT_FILE}", file=sys.stderr)
+    def discard(self):
+        if not self._file.closed:
+            self._file.close()
+        os.remove(self.tmp_path)
+
+
+# ---------------------------------------------------------------------------
+# Self-check
+# ---------------------------------------------------------------------------
+_CHECK_KANA = 'あいうえおかきくけこさしすせそたちつてと'
+_CHECK_JMDICT = """<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE JMdict [
+<!ENTITY v5k "Godan verb with 'ku' ending">
+<!ENTITY v5k-s "Godan verb - Iku/Yuku special class">
+]>
+<JMdict>
+<entry><ent_seq>1</ent_seq><k_ele><keb>行く</keb></k_ele><r_ele><reb>いく</reb></r_ele>
+<sense><pos>&v5k-s;</pos><gloss>to go</gloss></sense></entry>
+<entry><ent_seq>2</ent_seq><k_ele><keb>連れて行く</keb></k_ele><r_ele><reb>つれていく</reb></r_ele>
+<sense><pos>&v5k-s;</pos><gloss>to take (someone) along</gloss></sense></entry>
+<entry><ent_seq>3</ent_seq><k_ele><keb>書く</keb></k_ele><r_ele><reb>かく</reb></r_ele>
+<sense><pos>&v5k;</pos><gloss>to write</gloss></sense></entry>
+</JMdict>
+"""
+# Forms the JMdict fixture must produce, by dictionary kana
+_CHECK_JMDICT_FORMS = {
+    'いく': {'te_form': 'いって', 'past_plain': 'いった', 'conditional_tara': 'いったら'},
+    'つれていく': {'te_form': 'つれていって', 'past_plain': 'つれていった',
+                 'conditional_tara': 'つれていったら', 'negative_plain': 'つれていかない'},
+    'かく': {'te_form': 'かいて', 'past_plain': 'かいた'},
+}
 
-    # Summary by type
+def _check_page(level, page, count):
+    """A Jisho-shaped page of `count` godan verbs unique to (level, page)."""
+    head = _CHECK_KANA[LEVELS.index(level)] + _CHECK_KANA[page]
+    return {'data': [{
+        'japanese': [{'word': head + _CHECK_KANA[i] + 'く', 'reading': head + _CHECK_KANA[i] + 'く'}],
+        'senses': [{'parts_of_speech': ['Godan verb with ku ending'], 'english_definitions': ['check']}],
+    } for i in range(count)]}
+
+def _check_build(root, argv):
+    """Run main() quietly on `argv`; returns its exit status."""
+    stderr, sys.stderr = sys.stderr, open(os.devnull, 'w', encoding='utf-8')
+    try:
+        main(argv + ['--output', os.path.join(root, 'dictionary.json'),
+                     '--manifest', os.path.join(root, 'manifest.json'),
+                     '--metrics', os.path.join(root, 'metrics.json')])
+        return 0
+    except SystemExit as e:
+        return e.code
+    finally:
+        sys.stderr.close()
+        sys.stderr = stderr
+
+def check():
+    """
+    Replay a synthetic page cache, then again with a page missing from the
+    middle of a level, and build a small JMdict fixture (v5k-s compounds
+    included). Returns a list of problems.
+    """
+    problems = []
+    pages = {('n5', 1): 20, ('n5', 2): 20, ('n5', 3): 5, ('n4', 1): 20, ('n4', 2): 0, ('n3', 1): 0}
+    with tempfile.TemporaryDirectory() as root:
+        cache = PageCache(os.path.join(root, 'cache'))
+        for (level, page), count in pages.items():
+            cache.put(level, page, _check_page(level, page, count))
+        argv = ['--replay', '--cache-dir', cache.root, '--workers', '2']
+
+        status = _check_build(root, argv)
+        output = os.path.join(root, 'dictionary.json')
+        words = 0
+        if os.path.exists(output):
+            with open(output, 'r', encoding='utf-8') as f:
+                words = len(json.load(f)['words'])
+        if status or words != sum(pages.values()):
+            problems.append(f"full replay exited {status} with {words} of {sum(pages.values())} words")
+
+        with open(output, 'rb') as f:
+            before = f.read()
+        del cache.index['n5:2']
+        cache._save()
+        status = _check_build(root, argv)
+        with open(output, 'rb') as f:
+            after = f.read()
+        if not status:
+            problems.append("replay with n5 page 2 missing exited 0")
+        if after != before:
+            problems.append("replay with n5 page 2 missing rewrote the output")
+
+        fixture = os.path.join(root, 'jmdict.xml')
+        with open(fixture, 'w', encoding='utf-8') as f:
+            f.write(_CHECK_JMDICT)
+        status = _check_build(root, ['--jmdict', fixture, '--jmdict-default-level', 'N5',
+                                     '--jmdict-levels', os.path.join(root, 'no-levels.json')])
+        with open(output, 'r', encoding='utf-8') as f:
+            built = {w['dictionary_form']['kana']: w['conjugations'] for w in json.load(f)['words']}
+        if status:
+            problems.append(f"JMdict fixture build exited {status}")
+        for kana, forms in _CHECK_JMDICT_FORMS.items():
+            for form, expected in forms.items():
+                actual = built.get(kana, {}).get(form)
+                if actual != expected:
+                    problems.append(f"JMdict {kana} {form}: {actual}, expected {expected}")
+    return problems
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--output', default=OUTPUT_FILE)
+    parser.add_argument('--compact', metavar='PATH',
+                        help='also write the stem + suffix-id encoding (see compact_dictionary.py)')
+    parser.add_argument('--form-index', metavar='PATH',
+                        help='also write the reverse surface-form index (see form_index.py)')
+    parser.add_argument('--form-index-romaji', action='store_true',
+                        help='include romaji spellings in --form-index')
+    parser.add_argument('--incremental', action='store_true',
+                        help='only rebuild entries whose input or conjugation rules changed')
+    parser.add_argument('--manifest', default=MANIFEST_FILE,
+                        help='per-entry input/rule hashes from the last build (default: %(default)s)')
+    parser.add_argument('--replay', action='store_true',
+                        help='rebuild entirely from cached pages without network access')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='always hit the Jisho API and do not write the cache')
+    parser.add_argument('--fetch-only', action='store_true',
+                        help='only bring the page cache up to date; build nothing')
+    parser.add_argument('--jmdict', metavar='PATH',
+                        help='build offline from a JMdict/JMdict_e XML dump (optionally gzipped)')
+    parser.add_argument('--jmdict-levels', metavar='PATH', default=OUTPUT_FILE,
+                        help='JLPT levels for JMdict entries: a dictionary.json or {kana: level} '
+                             'map (default: %(default)s)')
+    parser.add_argument('--jmdict-default-level', metavar='LEVEL',
+                        help='level for JMdict entries missing from --jmdict-levels '
+                             '(default: skip them)')
+    parser.add_argument('--api-url', default=JISHO_API,
+                        help='search endpoint, e.g. a local jisho_stub_server.py')
+    parser.add_argument('--workers', type=int, default=FETCH_WORKERS,
+                        help='concurrent page fetches (default: %(default)s)')
+    parser.add_argument('--build-workers', type=int, default=BUILD_WORKERS,
+                        help='processes conjugating pages; the output is identical for any '
+                             'count (default: %(default)s)')
+    parser.add_argument('--rate', type=float, default=REQUEST_RATE,
+                        help='max API requests per second across all workers (default: %(default).2f)')
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    parser.add_argument('--cache-ttl', type=float, default=CACHE_TTL,
+                        help='seconds before a cached page is refetched (default: %(default)s)')
+    parser.add_argument('--cache-max-bytes', type=int, default=CACHE_MAX_BYTES,
+                        help='evict oldest pages beyond this size (default: %(default)s)')
+    parser.add_argument('--metrics', default=METRICS_FILE,
+                        help='per-stage timings and counters as JSON (default: %(default)s)')
+    parser.add_argument('--profile', metavar='PATH',
+                        help='run under cProfile and write pstats data to PATH '
+                             '(fetch worker threads are not profiled)')
+    parser.add_argument('--check', action='store_true',
+                        help='replay a synthetic page cache, with and without a missing page, '
+                             'build a JMdict fixture and check the output')
+    args = parser.parse_args(argv)
+    if args.replay and args.no_cache:
+        parser.error('--replay needs the cache')
+    if args.fetch_only and (args.no_cache or args.jmdict):
+        parser.error('--fetch-only fills the Jisho page cache')
+    return args
+
+
+def build(args, metrics):
+    client = HttpClient(max_idle=args.workers, headers={'User-Agent': USER_AGENT})
+    cache = None
+    if not args.no_cache:
+        cache = PageCache(args.cache_dir, args.cache_ttl, args.cache_max_bytes)
+    if args.fetch_only:
+        print(f"\n=== Fetching {', '.join(LEVELS).upper()} ===", file=sys.stderr)
+        try:
+            for _ in iter_pages(LEVELS, cache, args.replay, args.api_url, args.workers, args.rate,
+                                metrics=metrics, client=client):
+                pass
+        except PageUnavailable as e:
+            print(f"\n❌ {e}; the cache is incomplete", file=sys.stderr)
+            sys.exit(1)
+        finally:
+            client.close()
+        print(f"{metrics.counters.get('pages', 0)} pages cached in {args.cache_dir}", file=sys.stderr)
+        return
+    previous = PreviousBuild.open(args.output, args.manifest) if args.incremental else None
+
+    if args.jmdict:
+        print(f"\n=== Reading {args.jmdict} ===", file=sys.stderr)
+        level_map = load_level_map(args.jmdict_levels) if os.path.exists(args.jmdict_levels) else {}
+        entries = iter_records(jmdict_pages(args.jmdict, level_map, args.jmdict_default_level, metrics),
+                               previous, metrics, args.build_workers)
+    else:
+        print(f"\n=== Fetching {', '.join(LEVELS).upper()} ===", file=sys.stderr)
+        pages = iter_pages(LEVELS, cache, args.replay, args.api_url, args.workers, args.rate,
+                           metrics=metrics, client=client)
+        entries = iter_entries(metrics.timed(pages, 'fetch'), previous, metrics, args.build_workers)
+
+    records = {}
+    reused = 0
     by_type = {}
     by_level = {}
-    for e in all_entries:
-        by_type[e['word_type']] = by_type.get(e['word_type'], 0) + 1
-        by_level[e['level']] = by_level.get(e['level'], 0) + 1
+    writer = DictionaryWriter(args.output)
+    try:
+        for dedup_key, record, entry in entries:
+            with metrics.stage('serialize'):
+                offset, length = writer.write(entry, record.pop('text'))
+            reused += record.pop('reused')
+            records[dedup_key] = dict(record, offset=offset, length=length)
+            by_type[entry['word_type']] = by_type.get(entry['word_type'], 0) + 1
+            by_level[entry['level']] = by_level.get(entry['level'], 0) + 1
+        with metrics.stage('serialize'):
+            output_sha256 = writer.finish()
+    except PageUnavailable as e:
+        writer.discard()
+        print(f"\n❌ {e}; leaving {args.output} untouched", file=sys.stderr)
+        sys.exit(1)
+    except BaseException:
+        writer.discard()
+        raise
+    finally:
+        if previous:
+            previous.close()
+        client.close()
+    metrics.count('reused', reused)
+    for name, value in client.stats.items():
+        if value:
+            metrics.count(f"http_{name}", value)
+
+    total = writer.count
+    if not total:
+        writer.discard()
+        print("\nNo entries built, leaving output untouched", file=sys.stderr)
+        sys.exit(1)
+
+    with metrics.stage('serialize'):
+        if previous and previous.output_sha256 == output_sha256:
+            writer.discard()
+            print(f"\nNo changes, {args.output} left as is", file=sys.stderr)
+        else:
+            writer.commit()
+            print(f"\nWritten to {args.output}", file=sys.stderr)
+        write_manifest(args.manifest, output_sha256, records)
+        if args.compact:
+            original, body = write_compact(args.output, args.compact)
+            print(f"Compact encoding: {len(body):,} bytes (vs {len(original):,}) in {args.compact}",
+                  file=sys.stderr)
+        if args.form_index:
+            body, report = write_form_index(args.output, args.form_index,
+                                            kana_to_romaji if args.form_index_romaji else None)
+            print_report(report)
+            print(f"Form index: {len(body):,} bytes in {args.form_index}", file=sys.stderr)
+
+    print(f"Total entries: {total}", file=sys.stderr)
+    if args.incremental:
+        print(f"Reused {reused}, rebuilt {total - reused}", file=sys.stderr)
 
     print(f"\nBy word type: {by_type}", file=sys.stderr)
     print(f"By level: {by_level}", file=sys.stderr)
 
 
+def main(argv=None):
+    args = parse_args(argv)
+    if args.check:
+        problems = check()
+        for problem in problems:
+            print(f"❌ {problem}")
+        if problems:
+            sys.exit(1)
+        print("✅ Replay refuses to skip a missing page and the JMdict fixture conjugates")
+        return
+    metrics = Metrics()
+    profiler = cProfile.Profile() if args.profile else None
+    try:
+        if profiler:
+            profiler.runcall(build, args, metrics)
+        else:
+            build(args, metrics)
+    finally:
+        if profiler:
+            profiler.dump_stats(args.profile)
+            print(f"\nProfile written to {args.profile}; top functions by cumulative time:",
+                  file=sys.stderr)
+            pstats.Stats(profiler, stream=sys.stderr).sort_stats('cumulative').print_stats(15)
+        metrics.write(args.metrics)
+        print(f"\n{metrics.summary()}\nMetrics written to {args.metrics}", file=sys.stderr)
+
+
 if __name__ == '__main__':
     main()
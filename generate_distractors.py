@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Precomputes the distractor candidates generateDistractors (src/lib/distractorEngine.ts)
+would consider for every (word id, conjugation type), so the client can look
+them up instead of recomputing them per question.
+
+The candidate list is the engine's deterministic pool, before it shuffles and
+keeps three. The Godan/Ichidan "ru-trap" fakes come from conjugation_engine by
+conjugating the word as the wrong group on purpose.
+
+Only the rule-made candidates are stored. The fallback that tops the pool up
+with the word's other conjugations is rebuilt at lookup time from the word
+itself, since storing it would mostly repeat base.json.
+
+Output (compact JSON):
+
+    {
+      "version": "2.0",
+      "types": ["polite", ...],        # type indices of every row
+      "pieces": [[1, "ります"], ...],   # [drop, suffix], interned
+      "entries": {id: {type index: [piece index, ...]}}
+    }
+
+Every rule-made form is the word's dictionary kana with its last `drop`
+characters replaced by `suffix` (たべる → たべ + ります), so a few dozen pieces
+spell all of them. A row lists only the types with rule-made candidates;
+every word of the dictionary has a row, empty or not. src/lib/distractorTable.test.ts checks
+the table against the TS engine.
+"""
+
+import argparse
+import json
+import sys
+
+from conjugation_engine import VERB_FORMS, conjugate_many
+
+BASE_FILE = "src/data/dictionaries/base.json"
+OUTPUT_FILE = "src/data/dictionaries/distractors.json"
+
+# Forms the wrong-group trap is offered for, mirroring applyIchidanRule /
+# applyGodanRule in the TS engine: (actual group, conjugated as) -> forms
+RU_TRAP_FORMS = {
+    ('godan', 'ichidan'): ('polite', 'negative_plain', 'te_form', 'past_plain', 'volitional'),
+    ('ichidan', 'godan'): ('polite', 'negative_plain', 'te_form'),
+}
+TE_SWAPS = ('って', 'んで', 'いて', 'いで', 'して')
+NAIVE_ENDINGS = {'polite': 'ます', 'negative_plain': 'ない', 'past_plain': 'た', 'te_form': 'て'}
+ADJ_SWAPS = {
+    'i-adj': {'negative_plain': 'じゃない', 'past_plain': 'だった'},
+    'na-adj': {'negative_plain': 'くない', 'past_plain': 'かった'},
+}
+FALLBACK_LIMIT = 10
+
+
+def wrong_group(word):
+    """The group a learner might wrongly conjugate `word` as, or None."""
+    kana = word['dictionary_form']['kana']
+    if word['group'] == 'godan' and kana.endswith('る'):
+        return 'ichidan'
+    if word['group'] == 'ichidan':
+        return 'godan'
+    return None
+
+
+def wrong_group_forms(words):
+    """Each word conjugated as its wrong group in one batch (None where there is none)."""
+    confused = [wrong_group(word) for word in words]
+    results = iter(conjugate_many((w['dictionary_form']['kana'], g)
+                                  for w, g in zip(words, confused) if g))
+    return [next(results) if g else None for g in confused]
+
+
+def rule_candidates(word, ctype, fake_forms=None):
+    """
+    Forms rules A-E offer for one question, in the order the TS engine adds
+    them (the correct answer included if a rule happens to produce it).
+    `fake_forms` is the word conjugated as its wrong group.
+    """
+    correct = word['conjugations'][ctype]
+    kana = word['dictionary_form']['kana']
+    group = word['group']
+    pool = {}
+
+    # Rule A: Verb Group Confusion (Godan vs Ichidan)
+    confused = wrong_group(word)
+    if confused and fake_forms and ctype in RU_TRAP_FORMS[(group, confused)]:
+        fake = fake_forms[ctype]
+        if fake != correct:
+            pool[fake] = None
+
+    # Rule B: Te-Form Sound Swaps
+    if ctype == 'te_form' and group == 'godan':
+        for swap in TE_SWAPS:
+            fake = kana[:-1] + swap
+            if fake != correct:
+                pool[fake] = None
+
+    # Rule C: Adjective Identity Crisis
+    ending = ADJ_SWAPS.get(group, {}).get(ctype)
+    if ending:
+        pool[kana + ending] = None
+
+    # Rule D: Naive Concatenation (Dictionary + Ending)
+    if ctype in NAIVE_ENDINGS:
+        pool[kana + NAIVE_ENDINGS[ctype]] = None
+
+    # Rule E: Regularizing Exceptions
+    if kana == 'いく' and ctype == 'te_form':
+        pool['いいて'] = None
+
+    return list(pool)
+
+
+def with_fallback(word, ctype, rules):
+    """The full candidate pool: `rules`, topped up with the word's other conjugations."""
+    correct = word['conjugations'][ctype]
+    pool = dict.fromkeys(rules)
+    for value in word['conjugations'].values():
+        if len(pool) >= FALLBACK_LIMIT:
+            break
+        if value != correct:
+            pool[value] = None
+
+    return [value for value in pool if value != correct]
+
+
+def distractor_candidates(word, ctype, fake_forms=None):
+    """Deterministic candidate pool for one question, as distractorCandidates builds it."""
+    return with_fallback(word, ctype, rule_candidates(word, ctype, fake_forms))
+
+
+def _piece(kana, value):
+    """(drop, suffix) with the fewest characters dropped that turn `kana` into `value`."""
+    drop = next(d for d in range(len(kana) + 1) if value.startswith(kana[:len(kana) - d]))
+    return drop, value[len(kana) - drop:]
+
+
+def build_table(words, version='2.0'):
+    """Build the side table of rule-made candidates for every word and conjugation it has."""
+    types = list(VERB_FORMS)
+    pieces, piece_code = [], {}
+    entries = {}
+    for word, fake_forms in zip(words, wrong_group_forms(words)):
+        row = {}
+        for t, ctype in enumerate(types):
+            if ctype not in word['conjugations']:
+                continue
+            cell = []
+            for value in rule_candidates(word, ctype, fake_forms):
+                piece = _piece(word['dictionary_form']['kana'], value)
+                if piece not in piece_code:
+                    piece_code[piece] = len(pieces)
+                    pieces.append(piece)
+                cell.append(piece_code[piece])
+            if cell:
+                row[str(t)] = cell
+        entries[word['id']] = row
+
+    return {'version': version, 'types': types, 'pieces': [list(p) for p in pieces], 'entries': entries}
+
+
+def lookup(table, word, ctype):
+    """Reference lookup: the candidate strings for (word, ctype), or None for unknown words."""
+    row = table['entries'].get(word['id'])
+    if row is None:
+        return None
+    kana = word['dictionary_form']['kana']
+    cell = row.get(str(table['types'].index(ctype)), [])
+    return with_fallback(word, ctype, [kana[:len(kana) - drop] + suffix
+                                       for drop, suffix in (table['pieces'][code] for code in cell)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--input', default=BASE_FILE)
+    parser.add_argument('--output', default=OUTPUT_FILE)
+    args = parser.parse_args()
+
+    with open(args.input, 'r', encoding='utf-8') as f:
+        dictionary = json.load(f)
+    words = dictionary['words']
+    table = build_table(words, dictionary['version'])
+
+    # The encoded table must decode back to the pools it was built from
+    for word, forms in zip(words, wrong_group_forms(words)):
+        for ctype in word['conjugations']:
+            if lookup(table, word, ctype) != distractor_candidates(word, ctype, forms):
+                print(f"❌ {word['id']} {ctype} does not round-trip", file=sys.stderr)
+                sys.exit(1)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(table, f, ensure_ascii=False, separators=(',', ':'))
+
+    cells = sum(len(row) for row in table['entries'].values())
+    print(f"Wrote {args.output}: {len(words)} words, {cells} (word, type) cells with rule candidates, "
+          f"{len(table['pieces'])} pieces", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Precomputes kanji surface forms and furigana for every conjugation, so the
+client can render 帰って with 帰 over かえ without aligning strings at runtime.
+
+Each entry's kanji spelling is aligned with its kana once: kana runs must
+match literally (katakana and hiragana compare equal) and each kanji run
+takes the reading between them. The trailing hiragana is okurigana; what
+precedes it is the head (帰 in 帰る, 勉強 in 勉強する, 取り消 in 取り消す).
+A conjugated form that starts with the head's reading is the head followed
+by the rest of the form. Forms that change the reading of the head's last
+kanji (来る → 来ます, 来ない) take it from IRREGULAR_READINGS; forms the head
+cannot spell (ある → ない) have no kanji surface and are shown in kana.
+
+Output (compact JSON), with entries that have no kanji left out:
+
+    {
+      "version": "2.0",
+      "types": ["dictionary", "polite", ...],   # column order of every row
+      "entries": {id: [head, [[start, end, reading], ...], [cell per type]]}
+    }
+
+The spans are ruby offsets into head. A cell is null (no kanji surface),
+n (surface = head + form[n:]), or [n, reading] when the last span reads
+differently in that form. src/lib/furigana.test.ts checks the table against
+the dictionary.
+"""
+
+import argparse
+import itertools
+import json
+import re
+import sys
+
+from conjugation_engine import VERB_FORMS
+
+BASE_FILE = "src/data/dictionaries/base.json"
+OUTPUT_FILE = "src/data/dictionaries/furigana.json"
+TYPES = ('dictionary',) + VERB_FORMS
+
+# Kanji whose reading changes with the form, beyond the dictionary reading:
+# 来る (くる → きます, こない) and よい (→ いいです)
+IRREGULAR_READINGS = {
+    '来': ('き', 'こ'),
+    '良': ('い',),
+}
+
+
+def _script(ch):
+    if 'ぁ' <= ch <= 'ゟ':
+        return 'hiragana'
+    if '゠' <= ch <= 'ヿ':
+        return 'katakana'
+    return 'kanji'
+
+
+def to_hiragana(text):
+    return ''.join(chr(ord(ch) - 0x60) if 'ァ' <= ch <= 'ヶ' else ch for ch in text)
+
+
+def align(kanji, kana):
+    """
+    [(text, reading | None), ...] spelling `kanji` with a reading for each
+    kanji run, or None when the kana cannot be split across it.
+    """
+    runs = [(script, ''.join(chars)) for script, chars in itertools.groupby(kanji, _script)]
+    pattern = ''.join('(.+?)' if script == 'kanji' else re.escape(to_hiragana(text))
+                      for script, text in runs)
+    match = re.fullmatch(pattern, to_hiragana(kana))
+    if match is None:
+        return None
+    readings = iter(match.groups())
+    return [(text, next(readings) if script == 'kanji' else None) for script, text in runs]
+
+
+def entry_row(word):
+    """[head, spans, cells] for one word, or None when it has nothing to put furigana on."""
+    form = word['dictionary_form']
+    segments = align(form['kanji'] or '', form['kana'])
+    if not segments or all(reading is None for _, reading in segments):
+        return None
+    if segments[-1][1] is None and _script(segments[-1][0][-1]) == 'hiragana':
+        segments = segments[:-1]  # okurigana
+    head = ''.join(text for text, _ in segments)
+
+    spans = []
+    offset = 0
+    for text, reading in segments:
+        if reading is not None:
+            spans.append([offset, offset + len(text), reading])
+        offset += len(text)
+    last = max(i for i, (_, reading) in enumerate(segments) if reading is not None)
+    fixed, after = (''.join(reading or to_hiragana(text) for text, reading in part)
+                    for part in (segments[:last], segments[last + 1:]))
+    last_text = segments[last][0]
+    last_reading = segments[last][1]
+
+    cells = []
+    forms = dict(word['conjugations'], dictionary=form['kana'])
+    for ctype in TYPES:
+        kana = forms.get(ctype)
+        cell = None
+        if kana is not None:
+            kana = to_hiragana(kana)
+            for reading in (last_reading,) + IRREGULAR_READINGS.get(last_text, ()):
+                if kana.startswith(fixed + reading + after):
+                    n = len(fixed) + len(reading) + len(after)
+                    cell = n if reading == last_reading else [n, reading]
+                    break
+        cells.append(cell)
+    return [head, spans, cells]
+
+
+def build_table(words, version='2.0'):
+    entries = {}
+    for word in words:
+        row = entry_row(word)
+        if row is not None:
+            entries[word['id']] = row
+    return {'version': version, 'types': list(TYPES), 'entries': entries}
+
+
+def render(table, word, ctype):
+    """Reference lookup: (surface, [(text, reading | None), ...]) for a form, or None."""
+    row = table['entries'].get(word['id'])
+    if row is None:
+        return None
+    head, spans, cells = row
+    cell = cells[table['types'].index(ctype)]
+    if cell is None:
+        return None
+    n, last_reading = (cell, None) if isinstance(cell, int) else cell
+    kana = word['dictionary_form']['kana'] if ctype == 'dictionary' else word['conjugations'][ctype]
+    segments = []
+    offset = 0
+    for i, (start, end, reading) in enumerate(spans):
+        if start > offset:
+            segments.append((head[offset:start], None))
+        if i == len(spans) - 1 and last_reading is not None:
+            reading = last_reading
+        segments.append((head[start:end], reading))
+        offset = end
+    if offset < len(head):
+        segments.append((head[offset:], None))
+    if kana[n:]:
+        segments.append((kana[n:], None))
+    return ''.join(text for text, _ in segments), segments
+
+
+def check(table, words):
+    """Every rendered form must read back as its kana. Returns (forms rendered, [bad (id, type)])."""
+    rendered = 0
+    bad = []
+    for word in words:
+        for ctype in TYPES:
+            if ctype != 'dictionary' and ctype not in word['conjugations']:
+                continue
+            result = render(table, word, ctype)
+            if result is None:
+                continue
+            rendered += 1
+            kana = word['dictionary_form']['kana'] if ctype == 'dictionary' else word['conjugations'][ctype]
+            reading = ''.join(to_hiragana(reading or text) for text, reading in result[1])
+            if reading != to_hiragana(kana):
+                bad.append((word['id'], ctype))
+    return rendered, bad
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--input', default=BASE_FILE)
+    parser.add_argument('--output', default=OUTPUT_FILE)
+    args = parser.parse_args()
+
+    with open(args.input, 'r', encoding='utf-8') as f:
+        dictionary = json.load(f)
+    words = dictionary['words']
+    table = build_table(words, dictionary['version'])
+
+    rendered, bad = check(table, words)
+    for entry_id, ctype in bad[:20]:
+        print(f"❌ {entry_id} {ctype} does not read back as its kana", file=sys.stderr)
+    if bad:
+        sys.exit(1)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(table, f, ensure_ascii=False, separators=(',', ':'))
+
+    kana_only = sum(cell is None for word in words if word['id'] in table['entries']
+                    for ctype, cell in zip(TYPES, table['entries'][word['id']][2])
+                    if ctype == 'dictionary' or ctype in word['conjugations'])
+    unaligned = sum(1 for w in words if w['dictionary_form']['kanji'] != w['dictionary_form']['kana']
+                    and w['id'] not in table['entries'])
+    print(f"Wrote {args.output}: {len(table['entries'])} of {len(words)} words with kanji, "
+          f"{rendered} forms with furigana, {kana_only} kana only; {unaligned} spellings not aligned",
+          file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
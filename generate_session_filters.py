@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Precomputes the bitsets buildPracticeSession (src/lib/sessionBuilder.ts) filters
+the word list with, so a session pool is a few ANDs over 32-bit words instead
+of a scan of every entry.
+
+Bit i of a set stands for base.json's i-th word, which is also the i-th word
+loadDictionary returns. There is one set per JLPT level, group, word type and
+conjugation type; a word is in a conjugation type's set when it has that form
+and the form is valid for its word type (CONJS_FOR_WORD_TYPE).
+
+Output (compact JSON):
+
+    {
+      "version": "2.0",
+      "count": 1140,                   # words, i.e. bits in use
+      "ids_digest": "acd2f957",        # ids_digest() of base.json's ids, in order
+      "level": {"N5": [word, ...], ...},
+      "group": {"godan": [...], ...},
+      "word_type": {"verb": [...], ...},
+      "form": {"polite": [...], ...}
+    }
+
+Each set is a list of ceil(count / 32) unsigned 32-bit words, bit i of the
+whole set being bit i % 32 of word i // 32. The client only uses the sets
+when ids_digest matches the words it loaded, so a base.json regenerated in a
+different order never picks the wrong words. src/lib/sessionFilter.test.ts
+checks the sets against the naive filter, and --check does the same for
+query() here over every combination of levels, word types and groups.
+"""
+
+import argparse
+import itertools
+import json
+import sys
+
+from conjugation_engine import ADJ_FORMS, VERB_FORMS
+
+BASE_FILE = "src/data/dictionaries/base.json"
+OUTPUT_FILE = "src/data/dictionaries/filters.json"
+WORD_BITS = 32
+DIMENSIONS = ('level', 'group', 'word_type', 'form')
+
+# CONJS_FOR_WORD_TYPE in src/lib/distractorEngine.ts
+FORMS_BY_WORD_TYPE = {'verb': VERB_FORMS, 'i-adj': ADJ_FORMS, 'na-adj': ADJ_FORMS}
+
+
+def ids_digest(ids):
+    """
+    32-bit FNV-1a over the ids joined by newlines, taken as UTF-16 code units
+    so idsDigest in src/lib/sessionFilter.ts can compute it synchronously.
+    """
+    data = '\n'.join(ids).encode('utf-16-le')
+    h = 0x811c9dc5
+    for i in range(0, len(data), 2):
+        h = ((h ^ (data[i] | data[i + 1] << 8)) * 0x01000193) & 0xffffffff
+    return f"{h:08x}"
+
+
+def word_keys(word):
+    """(dimension, value) for every set `word` belongs to."""
+    yield 'level', word['level']
+    yield 'group', word['group']
+    yield 'word_type', word['word_type']
+    for form in FORMS_BY_WORD_TYPE[word['word_type']]:
+        if form in word['conjugations']:
+            yield 'form', form
+
+
+def build_index(words, version='2.0'):
+    """One bitset over word ordinals per level, group, word type and form."""
+    size = -(-len(words) // WORD_BITS)
+    index = {'version': version, 'count': len(words), 'ids_digest': ids_digest([w['id'] for w in words])}
+    for dimension in DIMENSIONS:
+        index[dimension] = {}
+    for i, word in enumerate(words):
+        word_index, bit = divmod(i, WORD_BITS)
+        for dimension, value in word_keys(word):
+            bits = index[dimension].setdefault(value, [0] * size)
+            bits[word_index] |= 1 << bit
+    for dimension in DIMENSIONS:
+        index[dimension] = dict(sorted(index[dimension].items()))
+    return index
+
+
+def _union(index, dimension, values):
+    """OR of the sets for `values`, or None (no constraint) when values is None."""
+    if values is None:
+        return None
+    total = 0
+    for value in values:
+        for i, word in enumerate(index[dimension].get(value, ())):
+            total |= word << (i * WORD_BITS)
+    return total
+
+
+def query(index, levels=None, word_types=None, groups=None, forms=None):
+    """
+    Reference query: ordinals of the words matching any of `levels`, any of
+    `word_types`, any of `groups` and having any of `forms`, ascending. A None
+    argument does not constrain; an empty one matches nothing.
+    """
+    pool = (1 << index['count']) - 1
+    for dimension, values in (('level', levels), ('word_type', word_types),
+                              ('group', groups), ('form', forms)):
+        bits = _union(index, dimension, values)
+        if bits is not None:
+            pool &= bits
+    ordinals = []
+    while pool:
+        low = pool & -pool
+        ordinals.append(low.bit_length() - 1)
+        pool ^= low
+    return ordinals
+
+
+def naive_filter(words, levels=None, word_types=None, groups=None, forms=None):
+    """query() as a scan over the word list, for checking it."""
+    return [i for i, word in enumerate(words)
+            if (levels is None or word['level'] in levels)
+            and (word_types is None or word['word_type'] in word_types)
+            and (groups is None or word['group'] in groups)
+            and (forms is None or any(form in FORMS_BY_WORD_TYPE[word['word_type']]
+                                      and form in word['conjugations'] for form in forms))]
+
+
+def _subsets(values):
+    return [list(combo) for n in range(1, len(values) + 1) for combo in itertools.combinations(values, n)]
+
+
+def check(words, index):
+    """Compare query() with the naive filter; returns (queries, [mismatches])."""
+    levels = sorted({w['level'] for w in words})
+    word_types = sorted({w['word_type'] for w in words})
+    groups = sorted({w['group'] for w in words})
+    form_choices = [None, list(VERB_FORMS), list(ADJ_FORMS)] + [[form] for form in VERB_FORMS]
+    queries = 0
+    mismatches = []
+    for level_set, type_set in itertools.product(_subsets(levels) + [None], _subsets(word_types) + [None]):
+        for group_set in [None] + [[group] for group in groups]:
+            for form_set in form_choices:
+                queries += 1
+                expected = naive_filter(words, level_set, type_set, group_set, form_set)
+                actual = query(index, level_set, type_set, group_set, form_set)
+                if actual != expected:
+                    mismatches.append((level_set, type_set, group_set, form_set))
+    return queries, mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--input', default=BASE_FILE)
+    parser.add_argument('--output', default=OUTPUT_FILE)
+    parser.add_argument('--check', action='store_true',
+                        help='compare query() with the naive filter over every combination')
+    args = parser.parse_args()
+
+    with open(args.input, 'r', encoding='utf-8') as f:
+        dictionary = json.load(f)
+    words = dictionary['words']
+    index = build_index(words, dictionary['version'])
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+    sets = sum(len(index[dimension]) for dimension in DIMENSIONS)
+    print(f"Wrote {args.output}: {sets} sets over {len(words)} words", file=sys.stderr)
+
+    if args.check:
+        queries, mismatches = check(words, index)
+        for level_set, type_set, group_set, form_set in mismatches[:20]:
+            print(f"❌ levels={level_set} word_types={type_set} groups={group_set} forms={form_set}")
+        if mismatches:
+            print(f"❌ {len(mismatches)} of {queries} queries differ from the naive filter")
+            sys.exit(1)
+        print(f"✅ {queries} queries match the naive filter")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Pooled keep-alive HTTP client for the data scripts.
+
+Connections are kept open per (scheme, host, port) and handed to one thread
+at a time, so consecutive requests skip the TCP/TLS handshake. Requests ask
+for gzip and responses are decompressed as bytes, which json.loads parses
+directly without a str copy. Failures are raised as urllib.error.HTTPError /
+URLError so callers written against urllib keep their retry handling.
+
+Also home to the helpers every fetching script shares: the rate limiter,
+Retry-After parsing and atomic file writes.
+
+    python http_client.py URL [URL ...]     # fetch and print transfer stats
+"""
+
+import argparse
+import email.utils
+import gzip
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+
+MAX_IDLE = 8    # idle connections kept per host
+TIMEOUT = 15    # seconds
+
+# Errors that mean a kept-alive connection was closed by the server between requests
+_STALE = (http.client.RemoteDisconnected, http.client.BadStatusLine,
+          ConnectionResetError, BrokenPipeError)
+
+
+class HttpClient:
+    """
+    Thread-safe keep-alive connection pool. `stats` counts requests, new and
+    reused connections, bytes received on the wire and bytes after decoding.
+    """
+
+    def __init__(self, max_idle=MAX_IDLE, timeout=TIMEOUT, headers=None):
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self.headers = dict(headers or {})
+        self.stats = {'requests': 0, 'connections': 0, 'reused': 0,
+                      'bytes_received': 0, 'bytes_decoded': 0}
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def _acquire(self, key):
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop(), True
+            self.stats['connections'] += 1
+        scheme, host, port = key
+        cls = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+        return cls(host, port, timeout=self.timeout), False
+
+    def _release(self, key, conn):
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def request(self, method, url, body=None, headers=None):
+        """Send a request and return the decoded response body as bytes."""
+        parts = urllib.parse.urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port)
+        target = parts.path or '/'
+        if parts.query:
+            target += '?' + parts.query
+        send_headers = {'Accept-Encoding': 'gzip', 'Connection': 'keep-alive',
+                        **self.headers, **(headers or {})}
+
+        for attempt in range(2):
+            conn, reused = self._acquire(key)
+            try:
+                conn.request(method, target, body=body, headers=send_headers)
+                resp = conn.getresponse()
+                raw = resp.read()
+            except _STALE as e:
+                conn.close()
+                if reused and attempt == 0:
+                    continue  # the server dropped an idle connection; retry on a fresh one
+                raise urllib.error.URLError(e) from e
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                raise urllib.error.URLError(e) from e
+            break
+
+        if resp.will_close:
+            conn.close()
+        else:
+            self._release(key, conn)
+
+        data = raw
+        if (resp.getheader('Content-Encoding') or '').lower() == 'gzip':
+            data = gzip.decompress(raw)
+        with self._lock:
+            self.stats['requests'] += 1
+            self.stats['reused'] += reused
+            self.stats['bytes_received'] += len(raw)
+            self.stats['bytes_decoded'] += len(data)
+
+        if resp.status >= 400:
+            raise urllib.error.HTTPError(url, resp.status, resp.reason, resp.headers, None)
+        return data
+
+    def get_json(self, url, headers=None):
+        return json.loads(self.request('GET', url, headers=headers))
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+
+# ---------------------------------------------------------------------------
+# Shared by the data scripts
+# ---------------------------------------------------------------------------
+class TokenBucket:
+    """
+    Thread-safe token bucket shared by every worker of a script. `pause`
+    blocks all callers until a deadline, so one 429 slows the whole pool down.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                else:
+                    self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0
+            self.updated = max(self.updated, self.paused_until)
+
+
+def retry_after(err):
+    """Seconds requested by a Retry-After header (delta or HTTP date), or None."""
+    value = err.headers.get('Retry-After') if err.headers else None
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def write_atomic(path, body):
+    """Replace `path` with `body` through a temp file, so readers never see a partial file."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(body)
+    os.replace(tmp_path, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('urls', nargs='+')
+    args = parser.parse_args()
+
+    client = HttpClient()
+    try:
+        for url in args.urls:
+            body = client.request('GET', url)
+            print(f"{url}: {len(body):,} bytes", file=sys.stderr)
+    finally:
+        client.close()
+    stats = client.stats
+    print(f"{stats['requests']} requests over {stats['connections']} connections "
+          f"({stats['reused']} reused); {stats['bytes_received']:,} bytes received, "
+          f"{stats['bytes_decoded']:,} decoded", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
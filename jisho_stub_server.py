@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Jisho search API, for exercising the generator's
+fetch scheduler and HTTP client without touching jisho.org. It speaks
+HTTP/1.1 keep-alive and gzips responses when asked to, and counts the
+connections and bytes it serves.
+
+Pages are served from a fixture ({"n5": [raw, ...], ...}) or, by default,
+synthesized from the existing dictionary.json. Rate-limit and server errors
+can be injected to check backoff behaviour:
+
+    python jisho_stub_server.py --port 8765 --throttle-every 5 --error-every 11
+    python generate_dictionary_jisho.py --no-cache --rate 20 \\
+        --api-url http://127.0.0.1:8765/api/v1/search/words --output /tmp/dictionary.json
+"""
+
+import argparse
+import gzip
+import json
+import sys
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DICTIONARY_FILE = "src/data/dictionaries/dictionary.json"
+PAGE_SIZE = 20
+
+_POS_BY_GROUP = {
+    'godan': 'Godan verb with u ending',
+    'ichidan': 'Ichidan verb',
+    'suru': 'Suru verb',
+    'kuru': 'Kuru verb - special class',
+    'i-adj': 'I-adjective (keiyoushi)',
+    'na-adj': 'Na-adjective (keiyodoshi)',
+}
+
+
+def fixture_from_dictionary(path=DICTIONARY_FILE):
+    """Turn built entries back into Jisho-shaped raw results, grouped by level."""
+    with open(path, 'r', encoding='utf-8') as f:
+        words = json.load(f)['words']
+    levels = {}
+    for word in words:
+        kana = word['dictionary_form']['kana']
+        kanji = word['dictionary_form']['kanji']
+        # Jisho lists suru nouns without the trailing する
+        if word['group'] == 'suru' and kana != 'する':
+            kana, kanji = kana[:-2], kanji[:-2]
+        levels.setdefault(word['level'].lower(), []).append({
+            'slug': kanji,
+            'japanese': [{'word': kanji, 'reading': kana}],
+            'senses': [{
+                'english_definitions': word.get('meaning', '').split('; ')[:2],
+                'parts_of_speech': [_POS_BY_GROUP[word['group']]],
+            }],
+            'jlpt': [f"jlpt-{word['level'].lower()}"],
+        })
+    return levels
+
+
+class StubState:
+    """Fixture plus fault-injection settings and request statistics."""
+
+    def __init__(self, levels, throttle_every=0, error_every=0, retry_after=1, latency=0.0):
+        self.levels = levels
+        self.throttle_every = throttle_every
+        self.error_every = error_every
+        self.retry_after = retry_after
+        self.latency = latency
+        self.requests = 0
+        self.throttled = 0
+        self.errors = 0
+        self.active = 0
+        self.max_active = 0
+        self.connections = 0
+        self.bytes_sent = 0
+        self.lock = threading.Lock()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    state = None  # set by make_server
+    protocol_version = 'HTTP/1.1'  # keep connections open between requests
+
+    def setup(self):
+        super().setup()
+        with self.state.lock:
+            self.state.connections += 1
+
+    def do_GET(self):
+        state = self.state
+        with state.lock:
+            state.requests += 1
+            n = state.requests
+            state.active += 1
+            state.max_active = max(state.max_active, state.active)
+        try:
+            if state.latency:
+                time.sleep(state.latency)
+            if state.throttle_every and n % state.throttle_every == 0:
+                with state.lock:
+                    state.throttled += 1
+                self._send(429, {'meta': {'status': 429}},
+                           {'Retry-After': str(state.retry_after)})
+                return
+            if state.error_every and n % state.error_every == 0:
+                with state.lock:
+                    state.errors += 1
+                self._send(503, {'meta': {'status': 503}})
+                return
+
+            query = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+            keyword = query.get('keyword', [''])[0]
+            page = int(query.get('page', ['1'])[0])
+            level = keyword.replace('#jlpt-', '')
+            words = state.levels.get(level, [])
+            start = (page - 1) * PAGE_SIZE
+            self._send(200, {'meta': {'status': 200}, 'data': words[start:start + PAGE_SIZE]})
+        finally:
+            with state.lock:
+                state.active -= 1
+
+    def _send(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        gzipped = 'gzip' in self.headers.get('Accept-Encoding', '')
+        if gzipped:
+            body = gzip.compress(body)
+        with self.state.lock:
+            self.state.bytes_sent += len(body)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if gzipped:
+            self.send_header('Content-Encoding', 'gzip')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(state, host='127.0.0.1', port=0):
+    """Create (but do not start) a stub server; port 0 picks a free port."""
+    handler = type('BoundStubHandler', (StubHandler,), {'state': state})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def start_server(state, host='127.0.0.1', port=0):
+    """Serve in a daemon thread. Returns (server, api_url)."""
+    server = make_server(state, host, port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}/api/v1/search/words"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--fixture', help='JSON file of {level: [raw results]}')
+    parser.add_argument('--throttle-every', type=int, default=0,
+                        help='answer every Nth request with 429')
+    parser.add_argument('--error-every', type=int, default=0,
+                        help='answer every Nth request with 503')
+    parser.add_argument('--retry-after', type=int, default=1)
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='seconds to sleep before each response')
+    args = parser.parse_args()
+
+    if args.fixture:
+        with open(args.fixture, 'r', encoding='utf-8') as f:
+            levels = json.load(f)
+    else:
+        levels = fixture_from_dictionary()
+    state = StubState(levels, args.throttle_every, args.error_every,
+                      args.retry_after, args.latency)
+    server = make_server(state, args.host, args.port)
+    print(f"Serving {sum(map(len, levels.values()))} words on "
+          f"http://{args.host}:{server.server_address[1]}/api/v1/search/words", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"requests={state.requests} connections={state.connections} "
+              f"bytes_sent={state.bytes_sent} throttled={state.throttled} errors={state.errors} "
+              f"max_concurrency={state.max_active}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
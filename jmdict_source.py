@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Streaming reader for a local JMdict / JMdict_e XML dump (plain or gzipped).
+
+Entries are parsed one at a time with iterparse and cleared as soon as they
+have been read, so memory stays flat over the ~200k entries of a full dump.
+JMdict writes parts of speech as DTD entities (&v5r;, &adj-i;, ...) that the
+parser expands to their descriptions; the DTD at the top of the file is read
+first so each description can be mapped back to its code.
+
+    python jmdict_source.py JMdict_e.gz --limit 5     # print the first entries
+"""
+
+import argparse
+import gzip
+import re
+import sys
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+
+HEADER_LIMIT = 4 * 1024 * 1024  # the DTD sits in the first ~100 KB
+_XML_LANG = '{http://www.w3.org/XML/1998/namespace}lang'
+_ENTITY = re.compile(r'<!ENTITY\s+(\S+)\s+"([^"]*)"\s*>')
+
+# kanji: first <keb> or None; kana: first <reb>; pos: codes across all senses
+# in order; glosses: English glosses of each sense
+JMdictEntry = namedtuple('JMdictEntry', 'seq kanji kana pos glosses')
+
+
+def _open(path):
+    with open(path, 'rb') as f:
+        gzipped = f.read(2) == b'\x1f\x8b'
+    return gzip.open(path, 'rb') if gzipped else open(path, 'rb')
+
+
+def read_entities(path):
+    """{description: code} for the entities declared in the dump's DTD."""
+    with _open(path) as f:
+        head = b''
+        while b']>' not in head and len(head) < HEADER_LIMIT:
+            block = f.read(64 * 1024)
+            if not block:
+                break
+            head += block
+    text = head.decode('utf-8', errors='replace')
+    return {description: code for code, description in _ENTITY.findall(text)}
+
+
+def iter_jmdict(path):
+    """Yield a JMdictEntry for every <entry> in the dump, in file order."""
+    codes = read_entities(path)
+    with _open(path) as f:
+        events = ET.iterparse(f, events=('start', 'end'))
+        _, root = next(events)
+        for event, elem in events:
+            if event != 'end' or elem.tag != 'entry':
+                continue
+            keb = elem.find('k_ele/keb')
+            reb = elem.find('r_ele/reb')
+            pos, glosses = [], []
+            for sense in elem.iterfind('sense'):
+                for tag in sense.iterfind('pos'):
+                    text = tag.text or ''
+                    pos.append(codes.get(text, text))
+                glosses.append([g.text for g in sense.iterfind('gloss')
+                                if g.text and g.get(_XML_LANG, 'eng') == 'eng'])
+            yield JMdictEntry(
+                elem.findtext('ent_seq'),
+                keb.text if keb is not None else None,
+                reb.text if reb is not None else '',
+                pos,
+                glosses,
+            )
+            # Drop the finished entry (and anything before it) from the tree
+            root.clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('path')
+    parser.add_argument('--limit', type=int, default=10, help='entries to print (0: just count)')
+    args = parser.parse_args()
+
+    count = 0
+    for entry in iter_jmdict(args.path):
+        if count < args.limit:
+            print(entry)
+        count += 1
+    print(f"{count} entries", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Runs the dictionary data scripts as one DAG of stages:
+
+    fetch → build → split → translate-{zh,vi,ne,my} ─┐
+                          └→ verify ────────────────┴→ emit-{shards,patches,distractors,filters,furigana,forms,confusable}
+
+`build` is normalize + conjugate: the generator streams pages through both
+in a single pass, so they are one stage here. Every stage is a run of one of
+the existing scripts. Its fingerprint covers its command, the content of its
+input files, and the source of the script plus every local module it
+imports. A stage is skipped when its fingerprint matches the last
+successful run and its outputs are still as that run left them. Stages
+whose dependencies are done run in parallel, so the four translations
+overlap.
+
+`fetch` always runs unless --offline: the remote data can change, and the
+page cache already makes a fresh page free. Downstream stages only see the
+cached page contents, so an unchanged fetch skips everything after it.
+
+    python katachi_data.py                    # everything that is stale
+    python katachi_data.py verify --offline   # up to verify, from cached pages
+    python katachi_data.py --list             # show the stages and whether they are fresh
+    python katachi_data.py emit --force build
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+STATE_FILE = ".cache/katachi-data.json"
+LOG_DIR = ".cache/katachi-data"
+STATE_VERSION = 1
+JOBS = 4
+
+DICTIONARY_DIR = "src/data/dictionaries"
+DICTIONARY = f"{DICTIONARY_DIR}/dictionary.json"
+BASE = f"{DICTIONARY_DIR}/base.json"
+ENGLISH = f"{DICTIONARY_DIR}/en.json"
+PAGE_INDEX = ".cache/jisho/index.json"
+LANGUAGES = ["zh", "vi", "ne", "my"]
+
+
+class Stage:
+    """One script run: `command` reads `inputs` and writes `outputs` (paths relative to the root)."""
+
+    def __init__(self, name, command, inputs=(), outputs=(), deps=(), volatile=False):
+        self.name = name
+        self.command = list(command)
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.deps = list(deps)
+        self.volatile = volatile  # reads something outside the tree, so it always runs
+
+
+def stages(translate_backend='gtx', offline=False):
+    """The DAG, in a valid run order."""
+    meaning_maps = [f"{DICTIONARY_DIR}/{language}.json" for language in LANGUAGES]
+    translations = [f"translate-{language}" for language in LANGUAGES]
+    dag = [
+        Stage('fetch', ['generate_dictionary_jisho.py', '--fetch-only'],
+              outputs=[PAGE_INDEX], volatile=True),
+        Stage('build', ['generate_dictionary_jisho.py', '--replay', '--incremental'],
+              inputs=[PAGE_INDEX], outputs=[DICTIONARY], deps=[] if offline else ['fetch']),
+        Stage('split', ['split_dictionary.py'],
+              inputs=[DICTIONARY], outputs=[BASE, ENGLISH], deps=['build']),
+    ]
+    for language, name, path in zip(LANGUAGES, translations, meaning_maps):
+        # One translation memory per language so the parallel runs never share a file
+        dag.append(Stage(name, ['translate_meanings.py', '--languages', language,
+                                '--backend', translate_backend,
+                                '--memory', f".cache/translation-memory/{language}.json"],
+                         inputs=[ENGLISH], outputs=[path], deps=['split']))
+    dag += [
+        Stage('verify', ['verify_data.py', BASE, DICTIONARY],
+              inputs=[BASE, DICTIONARY], outputs=['.cache/verify-report.json'], deps=['split']),
+        Stage('emit-shards', ['split_dictionary.py', '--shards-only'],
+              inputs=[BASE, ENGLISH] + meaning_maps, outputs=['public/dictionaries/manifest.json'],
+              deps=['verify'] + translations),
+        Stage('emit-patches', ['dictionary_patches.py'],
+              inputs=[BASE, ENGLISH] + meaning_maps, outputs=['public/dictionaries/patches/versions.json'],
+              deps=['verify'] + translations),
+        Stage('emit-distractors', ['generate_distractors.py'],
+              inputs=[BASE], outputs=[f"{DICTIONARY_DIR}/distractors.json"], deps=['verify']),
+        Stage('emit-filters', ['generate_session_filters.py'],
+              inputs=[BASE], outputs=[f"{DICTIONARY_DIR}/filters.json"], deps=['verify']),
+        Stage('emit-furigana', ['generate_furigana.py'],
+              inputs=[BASE], outputs=[f"{DICTIONARY_DIR}/furigana.json"], deps=['verify']),
+        Stage('emit-forms', ['form_index.py', '--input', DICTIONARY,
+                             '--output', f"{DICTIONARY_DIR}/dictionary.forms.json"],
+              inputs=[DICTIONARY], outputs=[f"{DICTIONARY_DIR}/dictionary.forms.json"], deps=['verify']),
+        Stage('emit-confusable', ['confusability.py'],
+              inputs=[BASE], outputs=[f"{DICTIONARY_DIR}/confusable.json"], deps=['verify']),
+    ]
+    if offline:
+        dag = dag[1:]
+    return dag
+
+
+# ---------------------------------------------------------------------------
+# Fingerprints
+# ---------------------------------------------------------------------------
+def _sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _page_digest(path):
+    """The page cache index minus fetch times: which payload each page has."""
+    with open(path, 'r', encoding='utf-8') as f:
+        index = json.load(f)
+    pages = {key: record['hash'] for key, record in index.items()}
+    return hashlib.sha256(json.dumps(pages, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+# Files whose content is hashed some other way than byte for byte
+DIGESTS = {PAGE_INDEX: _page_digest}
+
+
+def digest(path):
+    """Content digest of a file, or None when it does not exist."""
+    if not os.path.exists(path):
+        return None
+    return DIGESTS.get(path, _sha256_file)(path)
+
+
+def local_modules(script, root=ROOT):
+    """The script and every module of the tree it imports, directly or not, sorted."""
+    seen = set()
+    todo = [os.path.splitext(script)[0]]
+    while todo:
+        name = todo.pop()
+        path = os.path.join(root, f"{name}.py")
+        if name in seen or not os.path.exists(path):
+            continue
+        seen.add(name)
+        with open(path, 'r', encoding='utf-8') as f:
+            tree = ast.parse(f.read(), path)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                todo += [alias.name.split('.')[0] for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                todo.append(node.module.split('.')[0])
+    return sorted(f"{name}.py" for name in seen)
+
+
+def fingerprint(stage, root=ROOT):
+    """Hash of everything that decides a stage's outputs."""
+    h = hashlib.sha256()
+    h.update(json.dumps(stage.command).encode('utf-8'))
+    for path in local_modules(stage.command[0], root):
+        h.update(f"\0code {path} {_sha256_file(os.path.join(root, path))}".encode('utf-8'))
+    for path in stage.inputs:
+        h.update(f"\0input {path} {digest(path)}".encode('utf-8'))
+    return h.hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+def load_state(path=STATE_FILE):
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get('version') == STATE_VERSION:
+            return state
+    return {'version': STATE_VERSION, 'stages': {}}
+
+
+def save_state(state, path=STATE_FILE):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+
+
+def is_fresh(stage, state):
+    """True when the last successful run had the same fingerprint and left these outputs."""
+    if stage.volatile:
+        return False
+    record = state['stages'].get(stage.name)
+    if not record or record['fingerprint'] != fingerprint(stage):
+        return False
+    return all(digest(path) == record['outputs'].get(path) for path in stage.outputs)
+
+
+def run_stage(stage, log_dir=LOG_DIR):
+    """Run a stage's script, logging its output. Returns (exit code, seconds)."""
+    os.makedirs(log_dir, exist_ok=True)
+    start = time.perf_counter()
+    with open(os.path.join(log_dir, f"{stage.name}.log"), 'wb') as log:
+        code = subprocess.call([sys.executable] + stage.command, stdout=log, stderr=subprocess.STDOUT)
+    return code, time.perf_counter() - start
+
+
+def _tail(path, lines=15):
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        return ''.join(f.readlines()[-lines:])
+
+
+def select(dag, targets):
+    """The stages needed for `targets` (stage names or prefixes like 'translate'), in DAG order."""
+    by_name = {stage.name: stage for stage in dag}
+    wanted = set()
+    todo = []
+    for target in targets:
+        matches = [name for name in by_name if name == target or name.startswith(f"{target}-")]
+        if not matches:
+            raise SystemExit(f"Unknown stage {target!r}; see --list")
+        todo += matches
+    while todo:
+        name = todo.pop()
+        if name in wanted or name not in by_name:
+            continue
+        wanted.add(name)
+        todo += by_name[name].deps
+    return [stage for stage in dag if stage.name in wanted]
+
+
+def run(dag, state, jobs=JOBS, force=()):
+    """
+    Run every stale stage of `dag`, each as soon as its dependencies are
+    done, up to `jobs` at a time. Stages downstream of a failure are not
+    run. Returns {stage name: 'skipped' | 'ran' | 'failed' | 'blocked'}.
+    """
+    names = {stage.name for stage in dag}
+    pending = {stage.name: stage for stage in dag}
+    status = {}
+    running = {}
+
+    def ready(stage):
+        return all(status.get(dep) in ('skipped', 'ran') for dep in stage.deps if dep in names)
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while pending or running:
+            for name, stage in list(pending.items()):
+                if any(status.get(dep) in ('failed', 'blocked') for dep in stage.deps):
+                    status[name] = 'blocked'
+                    del pending[name]
+                elif ready(stage):
+                    del pending[name]
+                    if name not in force and is_fresh(stage, state):
+                        status[name] = 'skipped'
+                        print(f"  {name:<18} fresh, skipped", file=sys.stderr)
+                        continue
+                    # Fingerprint before running: inputs are settled once dependencies are done
+                    print(f"  {name:<18} running", file=sys.stderr)
+                    running[pool.submit(run_stage, stage)] = (stage, fingerprint(stage))
+            if not running:
+                if pending and not any(ready(s) for s in pending.values()):
+                    for name in pending:
+                        status[name] = 'blocked'
+                    break
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, stage_fingerprint = running.pop(future)
+                code, seconds = future.result()
+                if code:
+                    status[stage.name] = 'failed'
+                    print(f"❌ {stage.name} failed (exit {code}) after {seconds:.1f}s:\n"
+                          f"{_tail(os.path.join(LOG_DIR, f'{stage.name}.log'))}", file=sys.stderr)
+                    continue
+                status[stage.name] = 'ran'
+                state['stages'][stage.name] = {
+                    'fingerprint': stage_fingerprint,
+                    'outputs': {path: digest(path) for path in stage.outputs},
+                    'seconds': round(seconds, 3),
+                }
+                save_state(state)
+                print(f"  {stage.name:<18} done in {seconds:.1f}s", file=sys.stderr)
+    return status
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('targets', nargs='*',
+                        help='stages to bring up to date, with what they depend on '
+                             '(a prefix like "emit" or "translate" selects the group; default: all)')
+    parser.add_argument('--offline', action='store_true',
+                        help='skip fetch and build from the cached pages')
+    parser.add_argument('--force', nargs='+', default=[], metavar='STAGE',
+                        help='rerun these stages even if fresh; stages whose inputs they change follow')
+    parser.add_argument('--jobs', type=int, default=JOBS,
+                        help='stages run at once (default: %(default)s)')
+    parser.add_argument('--translate-backend', choices=['gtx', 'stub'], default='gtx')
+    parser.add_argument('--list', action='store_true', help='print the stages and exit')
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    dag = stages(args.translate_backend, args.offline)
+    selected = select(dag, args.targets) if args.targets else dag
+    force = {stage.name for target in args.force for stage in dag
+             if stage.name == target or stage.name.startswith(f"{target}-")}
+    state = load_state()
+
+    if args.list:
+        for stage in selected:
+            fresh = 'always runs' if stage.volatile else ('fresh' if is_fresh(stage, state) else 'stale')
+            deps = f" ← {', '.join(stage.deps)}" if stage.deps else ''
+            print(f"{stage.name:<18} {fresh:<12} {' '.join(stage.command)}{deps}")
+        return
+
+    start = time.perf_counter()
+    print(f"=== {len(selected)} stages, up to {args.jobs} at once ===", file=sys.stderr)
+    status = run(selected, state, args.jobs, force)
+    counts = {}
+    for value in status.values():
+        counts[value] = counts.get(value, 0) + 1
+    summary = ', '.join(f"{n} {value}" for value, n in sorted(counts.items()))
+    failed = counts.get('failed', 0) + counts.get('blocked', 0)
+    print(f"{'❌' if failed else '✅'} {summary} in {time.perf_counter() - start:.1f}s")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -6,4 +6,9 @@ const withSerwist = withSerwistInit({
   disable: process.env.NODE_ENV !== "production",
 });
 
-export default withSerwist({});
+export default withSerwist({
+  // Pre-rendered audio (prerender_tts.py) is read from disk by /api/tts
+  outputFileTracingIncludes: {
+    "/api/tts": ["./public/audio/tts/**"],
+  },
+});
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Pre-renders TTS audio for every word and conjugation in the dictionary.
+
+Every distinct string the practice screen can speak (dictionary kana and
+kanji, and every conjugated form) is synthesized once, however many entries
+or forms share it. The requests run concurrently under a shared rate limit.
+The audio is stored as content-hashed files: identical audio is kept only
+once, and the files can be cached forever. manifest.json maps each text to
+its file, and /api/tts serves listed texts from disk instead of synthesizing
+them. A rerun only renders texts that are missing from the manifest.
+
+    python prerender_tts.py                              # Google Translate TTS
+    python prerender_tts.py --dry-run
+    python prerender_tts.py --backend stub --out-dir /tmp/tts
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from http_client import HttpClient, TokenBucket, retry_after, write_atomic
+
+DICTIONARY_FILE = "src/data/dictionaries/dictionary.json"
+OUT_DIR = "public/audio/tts"
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+GOOGLE_TTS = "https://translate.google.com/translate_tts"
+# Same client string as src/app/api/tts/route.ts, so pre-rendered and live audio match
+USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+              '(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36')
+WORKERS = 4
+RATE = 2.0             # requests per second across all workers
+ATTEMPTS = 5
+BACKOFF_BASE = 1.5
+
+
+# ---------------------------------------------------------------------------
+# Backends
+# ---------------------------------------------------------------------------
+class GoogleBackend:
+    """Google Translate TTS, the endpoint /api/tts falls back to, over pooled connections."""
+
+    name = 'google-ja'
+
+    def __init__(self, api_url=GOOGLE_TTS, limiter=None, workers=WORKERS):
+        self.api_url = api_url
+        self.limiter = limiter
+        self.client = HttpClient(max_idle=workers, headers={'User-Agent': USER_AGENT})
+        self.requests = 0
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def synthesize(self, text):
+        query = urllib.parse.urlencode({
+            'ie': 'UTF-8', 'q': text, 'tl': 'ja', 'total': 1, 'idx': 0,
+            'textlen': len(text), 'client': 'tw-ob', 'prev': 'input',
+        })
+        for attempt in range(ATTEMPTS):
+            if self.limiter is not None:
+                self.limiter.acquire()
+            self._count()
+            delay = BACKOFF_BASE * 2 ** attempt * random.uniform(0.75, 1.25)
+            try:
+                audio = self.client.request('GET', f"{self.api_url}?{query}")
+                if audio:
+                    return audio
+                print(f"  Retry {attempt+1}/{ATTEMPTS} ({text}): empty response", file=sys.stderr)
+            except urllib.error.HTTPError as e:
+                if e.code != 429 and e.code < 500:
+                    raise
+                requested = retry_after(e)
+                if requested is not None:
+                    delay = requested
+                if self.limiter is not None:
+                    self.limiter.pause(delay)
+            except urllib.error.URLError as e:
+                print(f"  Retry {attempt+1}/{ATTEMPTS} ({text}): {e}", file=sys.stderr)
+            self._count(retry=True)
+            time.sleep(delay)
+        raise RuntimeError(f"synthesis of {text!r} failed after {ATTEMPTS} attempts")
+
+    def _count(self, retry=False):
+        with self._lock:
+            if retry:
+                self.retries += 1
+            else:
+                self.requests += 1
+
+    def close(self):
+        self.client.close()
+
+
+class StubBackend:
+    """Offline backend for tests: a fake MPEG frame header followed by the text."""
+
+    name = 'stub'
+
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def synthesize(self, text):
+        with self._lock:
+            self.requests += 1
+        return b'\xff\xfb\x90\x00' + text.encode('utf-8')
+
+    def close(self):
+        pass
+
+
+# ---------------------------------------------------------------------------
+# Pipeline
+# ---------------------------------------------------------------------------
+def collect_texts(words):
+    """Distinct strings the practice screen can speak, in first-seen order."""
+    texts = {}
+    for word in words:
+        form = word['dictionary_form']
+        for text in (form['kana'], form.get('kanji'), *word['conjugations'].values()):
+            if text:
+                texts[text] = None
+    return list(texts)
+
+
+def load_manifest(out_dir):
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def plan(texts, manifest, out_dir, backend_name):
+    """Texts with no usable audio: missing from the manifest, its file, or from another backend."""
+    if not manifest or manifest.get('backend') != backend_name:
+        return list(texts)
+    files = manifest['files']
+    return [text for text in texts
+            if text not in files or not os.path.exists(os.path.join(out_dir, files[text]))]
+
+
+def store(out_dir, audio):
+    """Write audio as <sha256 prefix>.mp3 unless that file exists; returns the file name."""
+    name = f"{hashlib.sha256(audio).hexdigest()[:16]}.mp3"
+    path = os.path.join(out_dir, name)
+    if not os.path.exists(path):
+        write_atomic(path, audio)
+    return name
+
+
+def render_all(todo, backend, out_dir, workers=WORKERS):
+    """Synthesize every text concurrently; returns {text: file name} for those that succeeded."""
+    rendered = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(backend.synthesize, text): text for text in todo}
+        for done, future in enumerate(as_completed(futures), 1):
+            text = futures[future]
+            try:
+                rendered[text] = store(out_dir, future.result())
+            except Exception as e:
+                print(f"  {text}: failed: {e}", file=sys.stderr)
+                continue
+            if done % 100 == 0 or done == len(todo):
+                print(f"  [{done}/{len(todo)}] rendered", file=sys.stderr)
+    return rendered
+
+
+def write_manifest(out_dir, backend_name, files):
+    """Write the manifest for `files` and delete audio no text refers to any more."""
+    manifest = {'version': MANIFEST_VERSION, 'backend': backend_name, 'files': files}
+    body = json.dumps(manifest, ensure_ascii=False, indent=2, sort_keys=True)
+    write_atomic(os.path.join(out_dir, MANIFEST_NAME), body.encode('utf-8'))
+    live = set(files.values())
+    removed = 0
+    for name in os.listdir(out_dir):
+        if name.endswith('.mp3') and name not in live:
+            os.remove(os.path.join(out_dir, name))
+            removed += 1
+    return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--dictionary', default=DICTIONARY_FILE)
+    parser.add_argument('--out-dir', default=OUT_DIR)
+    parser.add_argument('--backend', choices=['google', 'stub'], default='google')
+    parser.add_argument('--api-url', default=GOOGLE_TTS)
+    parser.add_argument('--workers', type=int, default=WORKERS)
+    parser.add_argument('--rate', type=float, default=RATE,
+                        help='max requests per second across all workers (default: %(default)s)')
+    parser.add_argument('--dry-run', action='store_true', help='report what would be rendered')
+    args = parser.parse_args()
+
+    with open(args.dictionary, 'r', encoding='utf-8') as f:
+        words = json.load(f)['words']
+    texts = collect_texts(words)
+    forms = sum(1 + len(w['conjugations']) for w in words)
+
+    if args.backend == 'stub':
+        backend = StubBackend()
+    else:
+        backend = GoogleBackend(args.api_url, TokenBucket(args.rate), args.workers)
+    manifest = load_manifest(args.out_dir)
+    todo = plan(texts, manifest, args.out_dir, backend.name)
+    print(f"{len(words)} entries, {forms} forms; {len(texts)} distinct texts, "
+          f"{len(todo)} to render with {backend.name}", file=sys.stderr)
+    if args.dry_run:
+        backend.close()
+        return
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    start = time.perf_counter()
+    try:
+        rendered = render_all(todo, backend, args.out_dir, args.workers)
+    finally:
+        backend.close()
+
+    files = {}
+    if manifest and manifest.get('backend') == backend.name:
+        wanted = set(texts)
+        files = {text: name for text, name in manifest['files'].items() if text in wanted}
+    files.update(rendered)
+    removed = write_manifest(args.out_dir, backend.name, files)
+    audio_files = len(set(files.values()))
+    print(f"Done in {time.perf_counter() - start:.1f}s: {backend.requests} requests, "
+          f"{backend.retries} retries; {len(files)} texts in {audio_files} audio files, "
+          f"{removed} stale files removed", file=sys.stderr)
+    missing = len(texts) - len(files)
+    if missing:
+        print(f"❌ {missing} texts have no audio; rerun to retry them")
+        sys.exit(1)
+    print(f"✅ Every text has audio in {args.out_dir}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Splits dictionary.json into the files the app loads: base.json (entries
+without meanings) and en.json (id -> English meaning). With --shards it also
+writes content-hashed per-level base shards and per-level, per-language
+meaning shards plus a manifest, so a client can fetch only the level and
+language being studied. With --patches it records the result as a new
+dictionary release with a delta patch from the previous one (see
+dictionary_patches.py). --shards-only writes the shards from the existing
+base.json, en.json and translations without splitting dictionary.json again.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+
+from dictionary_patches import PATCH_DIR, load_release, write_release
+
+DICTIONARY_DIR = "src/data/dictionaries"
+DICTIONARY_FILE = os.path.join(DICTIONARY_DIR, "dictionary.json")
+SHARD_DIR = "public/dictionaries"
+LANGUAGES = ["en", "zh", "vi", "ne", "my"]
+LEVELS = ["N5", "N4", "N3"]
+# Names _dump_shard gives shards; only these are pruned from the shard dir
+SHARD_FILE = re.compile(r"(base|meanings-[^.]+)-[^.]+\.[0-9a-f]{12}\.json")
+
+
+def split(words):
+    """Return (base words without 'meaning', {id: English meaning})."""
+    base = []
+    meanings = {}
+    for word in words:
+        word = dict(word)
+        meanings[word['id']] = word.pop('meaning', '')
+        base.append(word)
+    return base, meanings
+
+
+def _dump_pretty(path, data):
+    # Through a temp file: other scripts may be reading the previous copy
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _dump_shard(shard_dir, stem, data):
+    """Write compact JSON as <stem>.<hash>.json and return its manifest record."""
+    body = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    digest = hashlib.sha256(body).hexdigest()
+    name = f"{stem}.{digest[:12]}.json"
+    path = os.path.join(shard_dir, name)
+    if not os.path.exists(path):
+        with open(path, 'wb') as f:
+            f.write(body)
+    return {'file': name, 'bytes': len(body), 'sha256': digest}
+
+
+def write_shards(version, base, meaning_maps, shard_dir=SHARD_DIR):
+    """
+    Write one base shard per level and one meaning shard per (language, level),
+    then manifest.json describing them. Shards no longer referenced by the
+    manifest are removed; other files in shard_dir are left alone. Returns
+    the manifest.
+    """
+    os.makedirs(shard_dir, exist_ok=True)
+    levels = [level for level in LEVELS if any(w['level'] == level for w in base)]
+    levels += sorted({w['level'] for w in base} - set(levels))
+
+    manifest = {'version': version, 'levels': levels, 'base': {}, 'meanings': {}}
+    ids_by_level = {}
+    for level in levels:
+        words = [w for w in base if w['level'] == level]
+        ids_by_level[level] = [w['id'] for w in words]
+        record = _dump_shard(shard_dir, f"base-{level.lower()}", {'version': version, 'words': words})
+        manifest['base'][level] = dict(record, count=len(words))
+
+    for language, meanings in meaning_maps.items():
+        manifest['meanings'][language] = {}
+        for level in levels:
+            shard = {i: meanings[i] for i in ids_by_level[level] if i in meanings}
+            record = _dump_shard(shard_dir, f"meanings-{language}-{level.lower()}", shard)
+            manifest['meanings'][language][level] = dict(record, count=len(shard))
+
+    live = {r['file'] for r in manifest['base'].values()}
+    live |= {r['file'] for per_level in manifest['meanings'].values() for r in per_level.values()}
+    for name in os.listdir(shard_dir):
+        if SHARD_FILE.fullmatch(name) and name not in live:
+            os.remove(os.path.join(shard_dir, name))
+
+    _dump_pretty(os.path.join(shard_dir, 'manifest.json'), manifest)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--input', default=DICTIONARY_FILE)
+    parser.add_argument('--out-dir', default=DICTIONARY_DIR,
+                        help='where base.json and en.json go (default: %(default)s)')
+    parser.add_argument('--shards', nargs='?', const=SHARD_DIR, metavar='DIR',
+                        help=f'also write level/language shards (default dir: {SHARD_DIR})')
+    parser.add_argument('--patches', nargs='?', const=PATCH_DIR, metavar='DIR',
+                        help=f'also record a release and its delta patch (default dir: {PATCH_DIR})')
+    parser.add_argument('--shards-only', action='store_true',
+                        help='write shards from the existing base.json and en.json in --out-dir '
+                             'without rewriting them (implies --shards)')
+    args = parser.parse_args()
+
+    if args.shards_only:
+        with open(os.path.join(args.out_dir, 'base.json'), 'r', encoding='utf-8') as f:
+            dictionary = json.load(f)
+        base = dictionary['words']
+        with open(os.path.join(args.out_dir, 'en.json'), 'r', encoding='utf-8') as f:
+            english = json.load(f)
+        args.shards = args.shards or SHARD_DIR
+    else:
+        with open(args.input, 'r', encoding='utf-8') as f:
+            dictionary = json.load(f)
+        base, english = split(dictionary['words'])
+
+        _dump_pretty(os.path.join(args.out_dir, 'base.json'), {'version': dictionary['version'], 'words': base})
+        _dump_pretty(os.path.join(args.out_dir, 'en.json'), english)
+        print(f"Wrote base.json and en.json for {len(base)} words to {args.out_dir}", file=sys.stderr)
+
+    if args.shards:
+        meaning_maps = {'en': english}
+        for language in LANGUAGES[1:]:
+            path = os.path.join(args.out_dir, f"{language}.json")
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    meaning_maps[language] = json.load(f)
+        manifest = write_shards(dictionary['version'], base, meaning_maps, args.shards)
+        total = sum(r['bytes'] for r in manifest['base'].values())
+        for level, record in manifest['base'].items():
+            sizes = ', '.join(f"{language} {per_level[level]['bytes'] // 1024} KB"
+                              for language, per_level in manifest['meanings'].items())
+            print(f"  {level}: base {record['count']} words, {record['bytes'] // 1024} KB; "
+                  f"meanings {sizes}", file=sys.stderr)
+        print(f"Wrote {args.shards}/manifest.json ({total // 1024} KB of base shards)", file=sys.stderr)
+
+    if args.patches:
+        manifest, record = write_release(load_release(args.out_dir), args.patches)
+        if record:
+            print(f"Release {record['to']}: {record['bytes']:,} byte patch from {record['from']}",
+                  file=sys.stderr)
+        else:
+            print(f"Release {manifest['latest']} is current", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
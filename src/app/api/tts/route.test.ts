@@ -1,4 +1,4 @@
-import { beforeEach, describe, expect, it, vi } from 'vitest';
+import { afterEach, beforeEach, describe, expect, it, vi } from 'vitest';
 
 describe('GET /api/tts', () => {
   beforeEach(() => {
@@ -6,6 +6,10 @@ describe('GET /api/tts', () => {
     vi.resetModules();
   });
 
+  afterEach(() => {
+    vi.doUnmock('node:fs/promises');
+  });
+
   it('requires text parameter', async () => {
     const { GET } = await import('./route');
     const response = await GET(new Request('http://localhost/api/tts'));
@@ -81,6 +85,50 @@ describe('GET /api/tts', () => {
     expect(Buffer.from(data).toString()).toBe('789');
   });
 
+  it('serves pre-rendered audio listed in the manifest without calling Google', async () => {
+    vi.doMock('node:fs/promises', () => ({
+      readFile: vi.fn(async (file: string) => {
+        if (file.endsWith('manifest.json')) {
+          return JSON.stringify({ version: 1, backend: 'stub', files: { 'たべる': 'abc123.mp3' } });
+        }
+        if (file.endsWith('abc123.mp3')) {
+          return Buffer.from('prerendered-audio');
+        }
+        throw new Error('ENOENT');
+      }),
+    }));
+
+    const { GET } = await import('./route');
+    const response = await GET(new Request(`http://localhost/api/tts?text=${encodeURIComponent('たべる')}`));
+
+    expect(response.status).toBe(200);
+    expect(vi.mocked(fetch)).not.toHaveBeenCalled();
+    const data = await response.arrayBuffer();
+    expect(Buffer.from(data).toString()).toBe('prerendered-audio');
+  });
+
+  it('falls back to Google TTS for texts missing from the manifest', async () => {
+    vi.doMock('node:fs/promises', () => ({
+      readFile: vi.fn(async (file: string) => {
+        if (file.endsWith('manifest.json')) {
+          return JSON.stringify({ version: 1, backend: 'stub', files: {} });
+        }
+        throw new Error('ENOENT');
+      }),
+    }));
+    const mockAudio = new Uint8Array(Buffer.from('live-audio'));
+    vi.mocked(fetch).mockResolvedValue({
+      ok: true,
+      arrayBuffer: () => Promise.resolve(mockAudio.buffer),
+    } as Response);
+
+    const { GET } = await import('./route');
+    const response = await GET(new Request('http://localhost/api/tts?text=constructor'));
+
+    expect(response.status).toBe(200);
+    expect(vi.mocked(fetch)).toHaveBeenCalledTimes(1);
+  });
+
   it('handles Google TTS failures', async () => {
     vi.mocked(fetch).mockResolvedValue({
       ok: false,
@@ -1,7 +1,38 @@
+import { readFile } from 'node:fs/promises';
+import path from 'node:path';
 import { NextResponse } from 'next/server';
 
 const audioCache = new Map<string, Buffer>();
 
+// Written by prerender_tts.py: manifest.json maps text -> content-hashed audio file.
+// A manifest from the offline stub backend holds placeholder audio and is ignored.
+const PRERENDERED_DIR = path.join(process.cwd(), 'public', 'audio', 'tts');
+let prerenderedFiles: Promise<Record<string, string>> | null = null;
+
+function loadPrerenderedFiles() {
+    if (!prerenderedFiles) {
+        prerenderedFiles = readFile(path.join(PRERENDERED_DIR, 'manifest.json'), 'utf8')
+            .then((body) => {
+                const manifest = JSON.parse(body) as { backend?: string; files?: Record<string, string> };
+                return manifest.backend === 'stub' ? {} : manifest.files ?? {};
+            })
+            .catch(() => ({}));
+    }
+    return prerenderedFiles;
+}
+
+async function readPrerenderedAudio(text: string) {
+    const files = await loadPrerenderedFiles();
+    if (!Object.prototype.hasOwnProperty.call(files, text)) {
+        return null;
+    }
+    try {
+        return await readFile(path.join(PRERENDERED_DIR, path.basename(files[text])));
+    } catch {
+        return null;
+    }
+}
+
 const baseAudioHeaders = {
     'Content-Type': 'audio/mpeg',
     'Cache-Control': 'public, max-age=31536000, immutable',
@@ -64,6 +95,13 @@ export async function GET(request: Request) {
             return buildBufferedAudioResponse(cachedAudio, rangeHeader);
         }
 
+        // Served from disk on every request rather than held in audioCache, which would
+        // otherwise grow to the size of the whole pre-rendered set
+        const prerenderedAudio = await readPrerenderedAudio(text);
+        if (prerenderedAudio) {
+            return buildBufferedAudioResponse(prerenderedAudio, rangeHeader);
+        }
+
         // Google Translate TTS endpoint is more stable than unofficial Edge TTS WebSocket endpoints
         const googleTtsUrl = `https://translate.google.com/translate_tts?ie=UTF-8&q=${encodeURIComponent(text)}&tl=ja&total=1&idx=0&textlen=${text.length}&client=tw-ob&prev=input`;
 
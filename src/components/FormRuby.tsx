@@ -0,0 +1,35 @@
+'use client';
+
+import { useEffect, useState } from 'react';
+import type { ConjugationType, WordEntry } from '@/lib/distractorEngine';
+import { getFormDisplaySegments, loadFuriganaTable, type FuriganaTable } from '@/lib/furigana';
+
+/** A conjugated form in kanji with furigana; shows the kana until the table has loaded. */
+export default function FormRuby({ word, type }: { word: WordEntry; type: ConjugationType }) {
+  const [table, setTable] = useState<FuriganaTable | null>(null);
+
+  useEffect(() => {
+    let cancelled = false;
+    void loadFuriganaTable().then((loaded) => {
+      if (!cancelled) setTable(loaded);
+    });
+    return () => {
+      cancelled = true;
+    };
+  }, []);
+
+  return (
+    <>
+      {getFormDisplaySegments(table, word, type).map((segment, index) =>
+        segment.reading ? (
+          <ruby key={index}>
+            {segment.text}
+            <rt className="text-[0.6em] font-bold text-[color:var(--muted)]">{segment.reading}</rt>
+          </ruby>
+        ) : (
+          <span key={index}>{segment.text}</span>
+        )
+      )}
+    </>
+  );
+}
@@ -14,6 +14,7 @@ import * as wanakana from 'wanakana';
 import Logo from '@/components/Logo';
 import DynamicStatusBar from '@/components/DynamicStatusBar';
 import Portal from '@/components/Portal';
+import FormRuby from '@/components/FormRuby';
 import { feedbackSounds } from '@/lib/feedbackSounds';
 
 const SpeakerIcon = ({ className = "w-5 h-5" }: { className?: string }) => (
@@ -404,7 +405,7 @@ export default function PracticeSession() {
                                             <div key={item.unitKey} className="grid grid-cols-[1fr_auto_1fr] items-center border-b border-[color:var(--border)] px-3 py-2 text-sm font-black last:border-b-0">
                                                 <span>{item.word.dictionary_form.kanji}</span>
                                                 <span className="text-[color:var(--muted)]">→</span>
-                                                <span className="text-right">{item.word.conjugations[item.type]}</span>
+                                                <span className="text-right"><FormRuby word={item.word} type={item.type} /></span>
                                             </div>
                                         ))}
                                     </div>
@@ -1,3 +1,5 @@
+import { lookupDistractorCandidates, withFallbackCandidates, type DistractorTable } from './distractorTable';
+
 export type WordGroup = 'godan' | 'ichidan' | 'suru' | 'kuru' | 'i-adj' | 'na-adj';
 export type WordType = 'verb' | 'i-adj' | 'na-adj';
 export type ConjugationType =
@@ -45,7 +47,21 @@ export interface WordEntry {
  * Distractor Engine Logic
  * Generates 3 plausible incorrect answers based on Japanese grammar rules beginners often confuse.
  */
-export function generateDistractors(word: WordEntry, type: ConjugationType): string[] {
+export function generateDistractors(
+  word: WordEntry,
+  type: ConjugationType,
+  table: DistractorTable | null = null
+): string[] {
+  return ((table && lookupDistractorCandidates(table, word, type)) ?? distractorCandidates(word, type))
+    .sort(() => Math.random() - 0.5)
+    .slice(0, 3);
+}
+
+/**
+ * Every plausible incorrect answer for a question, in rule order and without the correct answer.
+ * Deterministic, so the data pipeline can precompute it (see generate_distractors.py).
+ */
+export function distractorCandidates(word: WordEntry, type: ConjugationType): string[] {
   const correct = word.conjugations[type];
   const distractors: Set<string> = new Set();
 
@@ -99,20 +115,7 @@ export function generateDistractors(word: WordEntry, type: ConjugationType): str
     distractors.add('いいて'); // Standard 'ku' rule instead of 'itte'
   }
 
-  // Fallback: Random other correct conjugations
-  const otherForms = Object.keys(word.conjugations) as ConjugationType[];
-  for (const form of otherForms) {
-    if (distractors.size >= 10) break;
-    const val = word.conjugations[form];
-    if (val !== correct) distractors.add(val);
-  }
-
-  // Convert to array, filter out any accidental correct answers, and pick 3
-  const finalArray = Array.from(distractors)
-    .filter(d => d !== correct)
-    .sort(() => Math.random() - 0.5);
-
-  return finalArray.slice(0, 3);
+  return withFallbackCandidates(word, type, distractors);
 }
 
 // Internal Mock Rules for Rule A
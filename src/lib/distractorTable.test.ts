@@ -0,0 +1,40 @@
+import { describe, expect, it } from 'vitest';
+import baseData from '@/data/dictionaries/base.json';
+import distractorData from '@/data/dictionaries/distractors.json';
+import { CONJS_FOR_WORD_TYPE, distractorCandidates, type WordEntry } from '@/lib/distractorEngine';
+import { loadDistractorTable, lookupDistractorCandidates, type DistractorTable } from '@/lib/distractorTable';
+
+const words = (baseData as { words: Omit<WordEntry, 'meaning'>[] }).words.map((word) => ({
+  ...word,
+  meaning: '',
+})) as WordEntry[];
+const table = distractorData as unknown as DistractorTable;
+
+describe('precomputed distractor table', () => {
+  it('has a row for every dictionary word', () => {
+    expect(Object.keys(table.entries).sort()).toEqual(words.map((word) => word.id).sort());
+  });
+
+  it('matches the TS engine for every word and conjugation type', () => {
+    const mismatches: string[] = [];
+    for (const word of words) {
+      for (const type of CONJS_FOR_WORD_TYPE[word.word_type]) {
+        const expected = distractorCandidates(word, type);
+        const actual = lookupDistractorCandidates(table, word, type);
+        if (JSON.stringify(actual) !== JSON.stringify(expected)) {
+          mismatches.push(`${word.id} ${type}`);
+        }
+      }
+    }
+    expect(mismatches).toEqual([]);
+  });
+
+  it('loads the same table lazily', async () => {
+    expect(await loadDistractorTable()).toEqual(table);
+  });
+
+  it('returns null for unknown words', () => {
+    const missing = { id: 'missing', dictionary_form: { kanji: '', kana: '', romaji: '' }, conjugations: {} };
+    expect(lookupDistractorCandidates(table, missing, 'polite')).toBeNull();
+  });
+});
@@ -0,0 +1,66 @@
+import type { ConjugationType, WordEntry } from './distractorEngine';
+
+/**
+ * Rule-made distractor candidates precomputed by generate_distractors.py.
+ * A row maps a type index to piece indices; a piece [drop, suffix] spells a
+ * candidate as the dictionary kana minus its last `drop` characters plus `suffix`.
+ * The fallback candidates (the word's other conjugations) are not stored.
+ */
+export interface DistractorTable {
+  version: string;
+  types: ConjugationType[];
+  pieces: [number, string][];
+  entries: Record<string, Record<string, number[]>>;
+}
+
+/**
+ * Tops the rule-made candidates up to ten with the word's other conjugations,
+ * then drops the correct answer.
+ */
+export function withFallbackCandidates(
+  word: Pick<WordEntry, 'conjugations'>,
+  type: ConjugationType,
+  rules: Iterable<string>
+): string[] {
+  const correct = word.conjugations[type];
+  const candidates = new Set(rules);
+  for (const value of Object.values(word.conjugations)) {
+    if (candidates.size >= 10) break;
+    if (value !== correct) candidates.add(value);
+  }
+  return Array.from(candidates).filter((candidate) => candidate !== correct);
+}
+
+/** Candidate pool for a question, or null if the table has no row for the word. */
+export function lookupDistractorCandidates(
+  table: DistractorTable,
+  word: Pick<WordEntry, 'id' | 'dictionary_form' | 'conjugations'>,
+  type: ConjugationType
+): string[] | null {
+  const row = table.entries[word.id];
+  if (!row) return null;
+  const kana = word.dictionary_form.kana;
+  const rules = (row[table.types.indexOf(type)] ?? []).map((code) => {
+    const [drop, suffix] = table.pieces[code];
+    return kana.slice(0, kana.length - drop) + suffix;
+  });
+  return withFallbackCandidates(word, type, rules);
+}
+
+let tablePromise: Promise<DistractorTable | null> | null = null;
+
+/**
+ * The table, fetched as its own chunk on first use so it stays out of the
+ * session bundle. Resolves to null if the chunk fails to load; the next call
+ * tries again.
+ */
+export function loadDistractorTable(): Promise<DistractorTable | null> {
+  tablePromise ??= import('@/data/dictionaries/distractors.json').then(
+    (module) => module.default as unknown as DistractorTable,
+    () => {
+      tablePromise = null;
+      return null;
+    }
+  );
+  return tablePromise;
+}
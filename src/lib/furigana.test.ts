@@ -0,0 +1,65 @@
+import { describe, expect, it } from 'vitest';
+import baseData from '@/data/dictionaries/base.json';
+import furiganaData from '@/data/dictionaries/furigana.json';
+import type { WordEntry } from '@/lib/distractorEngine';
+import { getFormDisplaySegments, loadFuriganaTable, lookupFurigana, type FuriganaTable } from '@/lib/furigana';
+
+const words = (baseData as { words: Omit<WordEntry, 'meaning'>[] }).words;
+const table = furiganaData as unknown as FuriganaTable;
+const toHiragana = (text: string) =>
+  text.replace(/[ァ-ヶ]/g, (ch) => String.fromCharCode(ch.charCodeAt(0) - 0x60));
+
+function wordById(id: string) {
+  const word = words.find((entry) => entry.id === id);
+  if (!word) throw new Error(`missing ${id}`);
+  return word;
+}
+
+describe('precomputed furigana', () => {
+  it('reads back as the kana of every form', () => {
+    const mismatches: string[] = [];
+    for (const word of words) {
+      for (const type of table.types) {
+        const kana = type === 'dictionary' ? word.dictionary_form.kana : word.conjugations[type];
+        if (kana === undefined) continue;
+        const result = lookupFurigana(table, word, type);
+        if (!result) continue;
+        const reading = result.segments.map((segment) => segment.reading ?? segment.text).join('');
+        if (toHiragana(reading) !== toHiragana(kana)) mismatches.push(`${word.id} ${type}`);
+      }
+    }
+    expect(mismatches).toEqual([]);
+  });
+
+  it('spells the dictionary form as its kanji', () => {
+    expect(lookupFurigana(table, wordById('v_kaeru'), 'dictionary')?.surface).toBe('帰る');
+  });
+
+  it('keeps the kanji head across okurigana changes', () => {
+    expect(lookupFurigana(table, wordById('v_kaeru'), 'te_form')?.segments).toEqual([
+      { text: '帰', reading: 'かえ' },
+      { text: 'って' },
+    ]);
+    expect(lookupFurigana(table, wordById('v_benkyousuru'), 'potential')?.surface).toBe('勉強できる');
+  });
+
+  it('changes the reading of 来 with the form', () => {
+    const kuru = wordById('v_kuru');
+    expect(lookupFurigana(table, kuru, 'polite')?.segments[0]).toEqual({ text: '来', reading: 'き' });
+    expect(lookupFurigana(table, kuru, 'negative_plain')?.segments[0]).toEqual({ text: '来', reading: 'こ' });
+    expect(lookupFurigana(table, kuru, 'conditional_ba')?.segments[0]).toEqual({ text: '来', reading: 'く' });
+  });
+
+  it('falls back to kana for forms the kanji cannot spell', () => {
+    const aru = wordById('v_aru');
+    expect(lookupFurigana(table, aru, 'negative_plain')).toBeNull();
+    expect(getFormDisplaySegments(table, aru, 'negative_plain')).toEqual([{ text: 'ない' }]);
+  });
+
+  it('shows the kana until the table is loaded', async () => {
+    const kaeru = wordById('v_kaeru');
+    expect(getFormDisplaySegments(null, kaeru, 'te_form')).toEqual([{ text: kaeru.conjugations.te_form }]);
+    const loaded = await loadFuriganaTable();
+    expect(getFormDisplaySegments(loaded, kaeru, 'te_form')[0]).toEqual({ text: '帰', reading: 'かえ' });
+  });
+});
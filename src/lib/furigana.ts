@@ -0,0 +1,77 @@
+import type { ConjugationType, WordEntry } from './distractorEngine';
+
+export type FuriganaFormType = ConjugationType | 'dictionary';
+
+/**
+ * Kanji surfaces precomputed by generate_furigana.py.
+ * Each row is [head, ruby spans as [start, end, reading] into head, cell per type];
+ * a cell is null (kana only), n (surface = head + kana.slice(n)) or [n, reading]
+ * when the last span reads differently in that form (来ます, 来ない).
+ */
+export interface FuriganaTable {
+  version: string;
+  types: FuriganaFormType[];
+  entries: Record<string, [string, [number, number, string][], (number | [number, string] | null)[]]>;
+}
+
+export interface RubySegment {
+  text: string;
+  reading?: string;
+}
+
+/** Kanji surface and ruby segments for a form, or null if it is shown in kana. */
+export function lookupFurigana(
+  table: FuriganaTable,
+  word: Pick<WordEntry, 'id' | 'dictionary_form' | 'conjugations'>,
+  type: FuriganaFormType
+): { surface: string; segments: RubySegment[] } | null {
+  const row = table.entries[word.id];
+  if (!row) return null;
+  const [head, spans, cells] = row;
+  const cell = cells[table.types.indexOf(type)];
+  if (cell == null) return null;
+  const [cut, lastReading] = typeof cell === 'number' ? [cell, undefined] : cell;
+  const kana = type === 'dictionary' ? word.dictionary_form.kana : word.conjugations[type];
+
+  const segments: RubySegment[] = [];
+  let offset = 0;
+  spans.forEach(([start, end, reading], i) => {
+    if (start > offset) segments.push({ text: head.slice(offset, start) });
+    const isLast = i === spans.length - 1;
+    segments.push({ text: head.slice(start, end), reading: isLast && lastReading ? lastReading : reading });
+    offset = end;
+  });
+  if (offset < head.length) segments.push({ text: head.slice(offset) });
+  if (kana.length > cut) segments.push({ text: kana.slice(cut) });
+  return { surface: segments.map((segment) => segment.text).join(''), segments };
+}
+
+let tablePromise: Promise<FuriganaTable | null> | null = null;
+
+/**
+ * The table, fetched as its own chunk on first use so it stays out of every
+ * bundle importing this module. Resolves to null if the chunk fails to load,
+ * so forms stay in kana; the next call tries again.
+ */
+export function loadFuriganaTable(): Promise<FuriganaTable | null> {
+  tablePromise ??= import('@/data/dictionaries/furigana.json').then(
+    (module) => module.default as unknown as FuriganaTable,
+    () => {
+      tablePromise = null;
+      return null;
+    }
+  );
+  return tablePromise;
+}
+
+/**
+ * A conjugated form in kanji with its furigana (帰って: 帰[かえ]って), or the kana
+ * as a single segment when the form has no kanji surface or the table is not loaded.
+ */
+export function getFormDisplaySegments(
+  table: FuriganaTable | null,
+  word: Pick<WordEntry, 'id' | 'dictionary_form' | 'conjugations'>,
+  type: ConjugationType
+): RubySegment[] {
+  return (table && lookupFurigana(table, word, type)?.segments) || [{ text: word.conjugations[type] }];
+}
@@ -1,8 +1,12 @@
 import { ConjugationType, generateDistractors, WordEntry } from '@/lib/distractorEngine';
 import { loadDictionary } from '@/lib/dictionaryLoader';
+import baseData from '@/data/dictionaries/base.json';
+import filterData from '@/data/dictionaries/filters.json';
+import { loadDistractorTable, type DistractorTable } from '@/lib/distractorTable';
 import type { Language } from '@/lib/i18n';
 import { translations } from '@/lib/i18n';
 import { getLocalDateString, isSameLocalDate, type SessionConfig } from '@/lib/store';
+import { idsDigest, poolOrdinals, sessionPool, type SessionFilterIndex } from '@/lib/sessionFilter';
 import { selectPracticeUnits } from '@/lib/study/scheduler';
 import { makeUnitKey, type StudyState } from '@/lib/study/types';
 
@@ -10,6 +14,39 @@ interface BuildPracticeSessionOptions {
   focusUnitKey?: string;
 }
 
+const filterIndex = filterData as unknown as SessionFilterIndex;
+// Set once the table's chunk has loaded; until then the rules give the same candidates
+let distractorTable: DistractorTable | null = null;
+
+/**
+ * Ordinal of every id in base.json, the order loadDictionary returns words in,
+ * or null when the filter index was built from another base.json. Checked once.
+ */
+const filterOrdinals: Map<string, number> | null = (() => {
+  const ids = (baseData as { words: { id: string }[] }).words.map((word) => word.id);
+  if (filterIndex.count !== ids.length || filterIndex.ids_digest !== idsDigest(ids)) return null;
+  return new Map(ids.map((id, ordinal) => [id, ordinal]));
+})();
+
+/**
+ * Words at one of the config's levels and word types, in dictionary order,
+ * plus the focused word wherever it is.
+ */
+function selectAvailableWords(words: WordEntry[], config: SessionConfig, focusWordId?: string): WordEntry[] {
+  if (!filterOrdinals || filterIndex.count !== words.length) {
+    // Filter index built from another base.json: scan instead
+    return words.filter(
+      (word) =>
+        word.id === focusWordId ||
+        (config.levels.includes(word.level as 'N5' | 'N4' | 'N3') && config.wordTypes.includes(word.word_type))
+    );
+  }
+  const pool = sessionPool(filterIndex, { levels: config.levels, wordTypes: config.wordTypes });
+  const focusIndex = focusWordId ? filterOrdinals.get(focusWordId) : undefined;
+  if (focusIndex !== undefined) pool[focusIndex >> 5] |= 1 << (focusIndex & 31);
+  return poolOrdinals(pool).map((ordinal) => words[ordinal]);
+}
+
 /**
  * Count daily goal progress: only daily, non-retry attempts count.
  */
@@ -44,13 +81,15 @@ export function buildPracticeSession(
     return typeof value === 'string' ? value : key;
   };
 
+  if (config.mode === 'choice' && !distractorTable) {
+    void loadDistractorTable().then((table) => {
+      distractorTable = table;
+    });
+  }
+
   const dictionaryData = { words: loadDictionary(language ?? 'en') };
   const focusedUnit = parseFocusUnitKey(options.focusUnitKey);
-  const availableWords = dictionaryData.words.filter(
-    (word) =>
-      word.id === focusedUnit?.wordId ||
-      (config.levels.includes(word.level as 'N5' | 'N4' | 'N3') && config.wordTypes.includes(word.word_type))
-  );
+  const availableWords = selectAvailableWords(dictionaryData.words, config, focusedUnit?.wordId);
 
   if (availableWords.length === 0) {
     return { error: t('noWordsMatch') };
@@ -110,7 +149,7 @@ export function buildPracticeSession(
   const sessionWords = orderedUnits.map(({ word, conjugationType }) => {
     const choices =
       config.mode === 'choice'
-        ? [word.conjugations[conjugationType], ...generateDistractors(word, conjugationType)].sort(
+        ? [word.conjugations[conjugationType], ...generateDistractors(word, conjugationType, distractorTable)].sort(
             () => Math.random() - 0.5
           )
         : [];
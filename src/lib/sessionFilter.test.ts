@@ -0,0 +1,55 @@
+import { describe, expect, it } from 'vitest';
+import baseData from '@/data/dictionaries/base.json';
+import filterData from '@/data/dictionaries/filters.json';
+import { CONJS_FOR_WORD_TYPE, type ConjugationType, type WordEntry, type WordType } from '@/lib/distractorEngine';
+import { idsDigest, poolOrdinals, sessionPool, type SessionFilterIndex } from '@/lib/sessionFilter';
+
+const words = (baseData as { words: Omit<WordEntry, 'meaning'>[] }).words;
+const index = filterData as unknown as SessionFilterIndex;
+
+function subsets<T>(values: T[]): T[][] {
+  return Array.from({ length: (1 << values.length) - 1 }, (_, mask) =>
+    values.filter((_, i) => (mask + 1) & (1 << i))
+  );
+}
+
+function hasForm(word: Omit<WordEntry, 'meaning'>, form: ConjugationType) {
+  return CONJS_FOR_WORD_TYPE[word.word_type].includes(form) && form in word.conjugations;
+}
+
+describe('session filter bitsets', () => {
+  it('covers every dictionary word', () => {
+    expect(index.count).toBe(words.length);
+    expect(index.ids_digest).toBe(idsDigest(words.map((word) => word.id)));
+  });
+
+  it('digests ids in order', () => {
+    expect(idsDigest(['a', 'b'])).not.toBe(idsDigest(['b', 'a']));
+  });
+
+  it('matches the naive filter for every level and word type combination', () => {
+    const mismatches: string[] = [];
+    for (const levels of subsets(['N5', 'N4', 'N3'])) {
+      for (const wordTypes of subsets<WordType>(['verb', 'i-adj', 'na-adj'])) {
+        const expected = words.flatMap((word, i) =>
+          levels.includes(word.level) && wordTypes.includes(word.word_type) ? [i] : []
+        );
+        const pool = sessionPool(index, { levels, wordTypes });
+        if (JSON.stringify(poolOrdinals(pool)) !== JSON.stringify(expected)) {
+          mismatches.push(`${levels} ${wordTypes}`);
+        }
+      }
+    }
+    expect(mismatches).toEqual([]);
+  });
+
+  it('restricts by group and form', () => {
+    const pool = sessionPool(index, { groups: ['godan'], forms: ['potential'] });
+    const expected = words.flatMap((word, i) => (word.group === 'godan' && hasForm(word, 'potential') ? [i] : []));
+    expect(poolOrdinals(pool)).toEqual(expected);
+  });
+
+  it('matches nothing for an empty list', () => {
+    expect(poolOrdinals(sessionPool(index, { levels: [] }))).toEqual([]);
+  });
+});
@@ -0,0 +1,77 @@
+import type { ConjugationType, WordGroup, WordType } from './distractorEngine';
+
+/**
+ * Bitsets over dictionary ordinals precomputed by generate_session_filters.py.
+ * Bit i (bit i % 32 of word i >> 5) stands for the i-th word of base.json.
+ */
+export interface SessionFilterIndex {
+  version: string;
+  count: number;
+  /** idsDigest of the ids the bits stand for; the sets are stale when it differs */
+  ids_digest: string;
+  level: Record<string, number[]>;
+  group: Partial<Record<WordGroup, number[]>>;
+  word_type: Partial<Record<WordType, number[]>>;
+  form: Partial<Record<ConjugationType, number[]>>;
+}
+
+export interface SessionFilter {
+  levels?: readonly string[];
+  wordTypes?: readonly WordType[];
+  groups?: readonly WordGroup[];
+  forms?: readonly ConjugationType[];
+}
+
+/** 32-bit FNV-1a over the ids joined by newlines, as generate_session_filters.py computes it. */
+export function idsDigest(ids: readonly string[]): string {
+  const text = ids.join('\n');
+  let hash = 0x811c9dc5;
+  for (let i = 0; i < text.length; i++) {
+    hash = Math.imul(hash ^ text.charCodeAt(i), 0x01000193);
+  }
+  return (hash >>> 0).toString(16).padStart(8, '0');
+}
+
+function union(size: number, sets: (number[] | undefined)[]): Uint32Array {
+  const bits = new Uint32Array(size);
+  for (const set of sets) {
+    if (!set) continue;
+    for (let i = 0; i < size; i++) bits[i] |= set[i];
+  }
+  return bits;
+}
+
+/**
+ * Words matching any of each given list (levels AND word types AND groups AND
+ * having any of the forms). An omitted list does not constrain.
+ */
+export function sessionPool(index: SessionFilterIndex, filter: SessionFilter): Uint32Array {
+  const size = Math.ceil(index.count / 32);
+  const pool = new Uint32Array(size).fill(0xffffffff);
+  if (index.count % 32) pool[size - 1] = (1 << (index.count % 32)) - 1;
+
+  const constraints: (number[] | undefined)[][] = [];
+  if (filter.levels) constraints.push(filter.levels.map((level) => index.level[level]));
+  if (filter.wordTypes) constraints.push(filter.wordTypes.map((wordType) => index.word_type[wordType]));
+  if (filter.groups) constraints.push(filter.groups.map((group) => index.group[group]));
+  if (filter.forms) constraints.push(filter.forms.map((form) => index.form[form]));
+  for (const sets of constraints) {
+    const bits = union(size, sets);
+    for (let i = 0; i < size; i++) pool[i] &= bits[i];
+  }
+  return pool;
+}
+
+/** Ordinals set in `bits`, ascending. */
+export function poolOrdinals(bits: Uint32Array): number[] {
+  const ordinals: number[] = [];
+  for (let i = 0; i < bits.length; i++) {
+    let word = bits[i];
+    while (word) {
+      const low = word & -word;
+      ordinals.push(i * 32 + 31 - Math.clz32(low));
+      word ^= low;
+    }
+  }
+  return ordinals;
+}
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Translates en.json into the per-language meaning maps (zh, vi, ne, my).
+
+Each distinct English gloss is translated once per language, however many
+entries share it. Strings are sent in batches, concurrently under a shared
+rate limit, and every result goes into an on-disk translation memory. A rerun
+therefore only translates entries whose en.json value is new or changed.
+Existing translations whose English source is unchanged are kept as they
+are, so hand edits survive.
+
+    python translate_meanings.py                      # all languages via Google gtx
+    python translate_meanings.py --languages vi --dry-run
+    python translation_stub_server.py --port 8766 &
+    python translate_meanings.py --api-url http://127.0.0.1:8766/translate_a/single \\
+        --out-dir /tmp/meanings --memory /tmp/tm.json
+"""
+
+import argparse
+import bisect
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from http_client import HttpClient, TokenBucket, retry_after, write_atomic
+
+DICTIONARY_DIR = "src/data/dictionaries"
+SOURCE_LANGUAGE = "en"
+LANGUAGES = ["zh", "vi", "ne", "my"]
+GTX_API = "https://translate.googleapis.com/translate_a/single"
+# App language code -> translation API code
+API_LANGUAGE = {'zh': 'zh-CN'}
+MEMORY_FILE = ".cache/translation-memory.json"
+BATCH_SIZE = 40        # strings per request
+BATCH_CHARS = 1800     # keeps request bodies small
+WORKERS = 4
+RATE = 2.0             # requests per second across all workers
+ATTEMPTS = 5
+BACKOFF_BASE = 1.5
+
+
+# ---------------------------------------------------------------------------
+# Backends
+# ---------------------------------------------------------------------------
+def align(texts, segments):
+    """
+    Split the reply to a newline-joined batch back into one translation per
+    text. gtx returns every translated segment with the source sentence it
+    came from; each source must be the next piece of the batch and lie inside
+    a single text, whose translation is then its segments joined. Returns None
+    when they do not line up, so no translation is credited to the wrong text.
+    """
+    source = '\n'.join(texts)
+    starts = []
+    offset = 0
+    for text in texts:
+        starts.append(offset)
+        offset += len(text) + 1
+    pieces = [[] for _ in texts]
+    pos = 0
+    for translated, original in segments:
+        original = (original or '').strip()
+        while pos < len(source) and source[pos].isspace():
+            pos += 1
+        if not original:
+            if translated.strip():
+                return None
+            continue
+        if not source.startswith(original, pos):
+            return None
+        n = bisect.bisect_right(starts, pos) - 1
+        if pos + len(original) > starts[n] + len(texts[n]):
+            return None
+        pieces[n].append(translated)
+        pos += len(original)
+    if source[pos:].strip() or any(text.strip() and not piece for text, piece in zip(texts, pieces)):
+        return None
+    return [''.join(piece).strip() for piece in pieces]
+
+
+class GtxBackend:
+    """
+    Google's gtx endpoint (or a stand-in speaking the same protocol). A batch
+    is sent as one newline-joined POST and mapped back to its texts through
+    the source sentence of every returned segment (see align); if that fails
+    the batch is retried per string. Requests share pooled keep-alive
+    connections.
+    """
+
+    def __init__(self, api_url=GTX_API, limiter=None, workers=WORKERS):
+        self.api_url = api_url
+        self.limiter = limiter
+        self.client = HttpClient(max_idle=workers, timeout=30, headers={'User-Agent': 'Mozilla/5.0'})
+        self.requests = 0
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def translate_batch(self, texts, target, source=SOURCE_LANGUAGE):
+        if len(texts) > 1:
+            translations = align(texts, self._request('\n'.join(texts), target, source))
+            if translations is not None:
+                return translations
+        return [''.join(translated for translated, _ in self._request(text, target, source)).strip()
+                for text in texts]
+
+    def _count(self, retry=False):
+        with self._lock:
+            if retry:
+                self.retries += 1
+            else:
+                self.requests += 1
+
+    def _request(self, text, target, source):
+        """[(translated, source sentence), ...] for the segments gtx splits `text` into."""
+        query = urllib.parse.urlencode({
+            'client': 'gtx', 'sl': source, 'tl': API_LANGUAGE.get(target, target), 'dt': 't',
+        })
+        body = urllib.parse.urlencode({'q': text}).encode('utf-8')
+        for attempt in range(ATTEMPTS):
+            if self.limiter is not None:
+                self.limiter.acquire()
+            self._count()
+            delay = BACKOFF_BASE * 2 ** attempt * random.uniform(0.75, 1.25)
+            try:
+                data = json.loads(self.client.request(
+                    'POST', f"{self.api_url}?{query}", body=body,
+                    headers={'Content-Type': 'application/x-www-form-urlencoded'}))
+                return [(segment[0], segment[1]) for segment in data[0] if segment[0]]
+            except urllib.error.HTTPError as e:
+                if e.code != 429 and e.code < 500:
+                    raise
+                requested = retry_after(e)
+                if requested is not None:
+                    delay = requested
+                if self.limiter is not None:
+                    self.limiter.pause(delay)
+            except (urllib.error.URLError, TimeoutError) as e:
+                print(f"  Retry {attempt+1}/{ATTEMPTS} ({target}): {e}", file=sys.stderr)
+            self._count(retry=True)
+            time.sleep(delay)
+        raise RuntimeError(f"translation to {target} failed after {ATTEMPTS} attempts")
+
+    def close(self):
+        self.client.close()
+
+
+class StubBackend:
+    """Offline backend for tests: tags each string with its target language."""
+
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def translate_batch(self, texts, target, source=SOURCE_LANGUAGE):
+        with self._lock:
+            self.requests += 1
+        return [f"[{target}] {text}" for text in texts]
+
+    def close(self):
+        pass
+
+
+# ---------------------------------------------------------------------------
+# Translation memory
+# ---------------------------------------------------------------------------
+class TranslationMemory:
+    """
+    {"memory": {lang: {english: translation}}, "sources": {lang: {id: english}}}.
+    `sources` records which English text each shipped translation came from.
+    """
+
+    def __init__(self, path=MEMORY_FILE):
+        self.path = path
+        self.memory = {}
+        self.sources = {}
+        self.exists = os.path.exists(path)
+        if self.exists:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.memory = data.get('memory', {})
+            self.sources = data.get('sources', {})
+
+    def seed(self, language, english, existing):
+        """Adopt translations made before the memory existed, assuming they match en.json."""
+        memory = self.memory.setdefault(language, {})
+        sources = self.sources.setdefault(language, {})
+        for entry_id, translation in existing.items():
+            if entry_id in english:
+                memory.setdefault(english[entry_id], translation)
+                sources.setdefault(entry_id, english[entry_id])
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        body = json.dumps({'version': 1, 'memory': self.memory, 'sources': self.sources},
+                          ensure_ascii=False, indent=2, sort_keys=True)
+        write_atomic(self.path, body.encode('utf-8'))
+
+
+# ---------------------------------------------------------------------------
+# Pipeline
+# ---------------------------------------------------------------------------
+def plan(english, existing, tm, languages):
+    """
+    Work out what each language needs. Returns {lang: [english text, ...]} of
+    distinct strings missing from the translation memory.
+    """
+    todo = {}
+    for language in languages:
+        memory = tm.memory.setdefault(language, {})
+        sources = tm.sources.setdefault(language, {})
+        current = existing.get(language, {})
+        missing = {}
+        for entry_id, text in english.items():
+            if entry_id in current and sources.get(entry_id) == text:
+                continue
+            if text and text not in memory:
+                missing[text] = None
+        todo[language] = list(missing)
+    return todo
+
+
+def batches(texts, size=BATCH_SIZE, max_chars=BATCH_CHARS):
+    batch, chars = [], 0
+    for text in texts:
+        if batch and (len(batch) >= size or chars + len(text) > max_chars):
+            yield batch
+            batch, chars = [], 0
+        batch.append(text)
+        chars += len(text) + 1
+    if batch:
+        yield batch
+
+
+def translate_all(todo, backend, tm, workers=WORKERS):
+    """
+    Run every batch concurrently, recording results in the memory as they
+    land. Returns the number of batches that failed.
+    """
+    failed = 0
+    jobs = [(language, batch) for language, texts in todo.items() for batch in batches(texts)]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(backend.translate_batch, batch, language): (language, batch)
+                   for language, batch in jobs}
+        for done, future in enumerate(as_completed(futures), 1):
+            language, batch = futures[future]
+            try:
+                results = future.result()
+            except Exception as e:
+                print(f"  {language}: batch of {len(batch)} failed: {e}", file=sys.stderr)
+                failed += 1
+                continue
+            tm.memory[language].update(zip(batch, results))
+            print(f"  [{done}/{len(jobs)}] {language}: {len(batch)} strings", file=sys.stderr)
+    return failed
+
+
+def assemble(english, existing, tm, language):
+    """
+    Meaning map for one language in en.json order. An entry whose gloss has no
+    translation yet keeps its previous value, or is left out if it has none
+    (the app falls back to English for it); English is never written here.
+    """
+    memory = tm.memory[language]
+    sources = tm.sources[language]
+    current = existing.get(language, {})
+    out = {}
+    for entry_id, text in english.items():
+        if entry_id in current and sources.get(entry_id) == text:
+            out[entry_id] = current[entry_id]
+        elif text in memory:
+            out[entry_id] = memory[text]
+            sources[entry_id] = text
+        elif entry_id in current:
+            out[entry_id] = current[entry_id]
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--languages', nargs='+', default=LANGUAGES, choices=LANGUAGES)
+    parser.add_argument('--dictionary-dir', default=DICTIONARY_DIR)
+    parser.add_argument('--out-dir', help='where to write <lang>.json (default: --dictionary-dir)')
+    parser.add_argument('--memory', default=MEMORY_FILE)
+    parser.add_argument('--backend', choices=['gtx', 'stub'], default='gtx')
+    parser.add_argument('--api-url', default=GTX_API)
+    parser.add_argument('--workers', type=int, default=WORKERS)
+    parser.add_argument('--rate', type=float, default=RATE,
+                        help='max requests per second across all workers (default: %(default)s)')
+    parser.add_argument('--dry-run', action='store_true', help='report what would be translated')
+    args = parser.parse_args()
+    out_dir = args.out_dir or args.dictionary_dir
+
+    with open(os.path.join(args.dictionary_dir, 'en.json'), 'r', encoding='utf-8') as f:
+        english = json.load(f)
+    existing = {}
+    for language in args.languages:
+        path = os.path.join(args.dictionary_dir, f"{language}.json")
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                existing[language] = json.load(f)
+
+    tm = TranslationMemory(args.memory)
+    if not tm.exists:
+        for language, current in existing.items():
+            tm.seed(language, english, current)
+
+    todo = plan(english, existing, tm, args.languages)
+    distinct = len({text for texts in todo.values() for text in texts})
+    total = sum(map(len, todo.values()))
+    print(f"{len(english)} entries, {len(set(english.values()))} distinct glosses; "
+          f"{total} translations needed ({distinct} distinct source strings)", file=sys.stderr)
+    for language, texts in todo.items():
+        print(f"  {language}: {len(texts)} strings in {len(list(batches(texts)))} batches", file=sys.stderr)
+    if args.dry_run:
+        return
+
+    if args.backend == 'stub':
+        backend = StubBackend()
+    else:
+        backend = GtxBackend(args.api_url, TokenBucket(args.rate), args.workers)
+    start = time.perf_counter()
+    try:
+        failed = translate_all(todo, backend, tm, args.workers)
+    finally:
+        backend.close()
+
+    os.makedirs(out_dir, exist_ok=True)
+    for language in args.languages:
+        with open(os.path.join(out_dir, f"{language}.json"), 'w', encoding='utf-8') as f:
+            json.dump(assemble(english, existing, tm, language), f, ensure_ascii=False, indent=2)
+    tm.save()
+    print(f"Done in {time.perf_counter() - start:.1f}s: {backend.requests} requests, "
+          f"{backend.retries} retries; wrote {', '.join(args.languages)} to {out_dir}", file=sys.stderr)
+    if failed:
+        print(f"❌ {failed} batches failed; their entries keep their previous translation. "
+              f"Rerun to retry them")
+        sys.exit(1)
+    print("✅ Every entry is translated")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Google gtx translate endpoint, for exercising
+translate_meanings.py without network access. Every line of `q` comes back
+as "[<tl>] <line>"; 429s can be injected to check backoff.
+
+    python translation_stub_server.py --port 8766 --throttle-every 7
+"""
+
+import argparse
+import json
+import sys
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubState:
+    def __init__(self, throttle_every=0, retry_after=1):
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self.requests = 0
+        self.throttled = 0
+        self.strings = 0
+        self.lock = threading.Lock()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    state = None  # set by make_server
+
+    def do_GET(self):
+        self._translate(urllib.parse.urlparse(self.path).query)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        form = self.rfile.read(length).decode('utf-8')
+        self._translate(urllib.parse.urlparse(self.path).query + '&' + form)
+
+    def _translate(self, query):
+        state = self.state
+        with state.lock:
+            state.requests += 1
+            n = state.requests
+        if state.throttle_every and n % state.throttle_every == 0:
+            with state.lock:
+                state.throttled += 1
+            self._send(429, [], {'Retry-After': str(state.retry_after)})
+            return
+
+        params = urllib.parse.parse_qs(query)
+        target = params.get('tl', ['?'])[0]
+        lines = params.get('q', [''])[0].split('\n')
+        with state.lock:
+            state.strings += len(lines)
+        segments = [[f"[{target}] {line}" + ('\n' if i < len(lines) - 1 else ''),
+                     line, None, None, 10] for i, line in enumerate(lines)]
+        self._send(200, [segments, None, params.get('sl', ['en'])[0]])
+
+    def _send(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(state, host='127.0.0.1', port=0):
+    """Create (but do not start) a stub server; port 0 picks a free port."""
+    handler = type('BoundStubHandler', (StubHandler,), {'state': state})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def start_server(state, host='127.0.0.1', port=0):
+    """Serve in a daemon thread. Returns (server, api_url)."""
+    server = make_server(state, host, port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}/translate_a/single"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--throttle-every', type=int, default=0,
+                        help='answer every Nth request with 429')
+    parser.add_argument('--retry-after', type=int, default=1)
+    args = parser.parse_args()
+
+    state = StubState(args.throttle_every, args.retry_after)
+    server = make_server(state, args.host, args.port)
+    print(f"Serving on http://{args.host}:{server.server_address[1]}/translate_a/single", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"requests={state.requests} throttled={state.throttled} strings={state.strings}",
+              file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
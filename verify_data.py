@@ -1,41 +1,234 @@
+#!/usr/bin/env python3
+"""
+Verifies every conjugation of every entry against conjugation_engine, plus
+invariants that must hold between forms, with the work split across a
+process pool. Writes a machine-readable report and exits non-zero on any
+issue.
+
+    python verify_data.py [FILE ...] [--workers N] [--report PATH]
+"""
+
+import argparse
 import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from conjugation_engine import ADJ_FORMS, VERB_FORMS, conjugate_many
+
+DICTIONARY_FILES = ["src/data/dictionaries/base.json", "src/data/dictionaries/dictionary.json"]
+REPORT_FILE = ".cache/verify-report.json"
+# Smallest chunk worth sending to a worker process; smaller files stay in one chunk
+MIN_CHUNK_SIZE = 200
+
+WORD_TYPE_BY_GROUP = {
+    'godan': 'verb', 'ichidan': 'verb', 'suru': 'verb', 'kuru': 'verb',
+    'i-adj': 'i-adj', 'na-adj': 'na-adj',
+}
+FORMS_BY_WORD_TYPE = {'verb': VERB_FORMS, 'i-adj': ADJ_FORMS, 'na-adj': ADJ_FORMS}
+
+_TE_TO_TA = {'て': 'た', 'で': 'だ'}
+
+
+def _swap_ending(text, old, new):
+    return text[:-len(old)] + new if text.endswith(old) else None
+
+
+# (name, word types it applies to, form, derive the expected form from the others)
+INVARIANTS = [
+    ('conditional_tara = past_plain + ら', ('verb', 'i-adj', 'na-adj'), 'conditional_tara',
+     lambda c: c['past_plain'] + 'ら'),
+    ('past_negative_plain = negative_plain ない→なかった', ('verb', 'i-adj', 'na-adj'), 'past_negative_plain',
+     lambda c: _swap_ending(c['negative_plain'], 'ない', 'なかった')),
+    ('negative_polite = polite ます→ません', ('verb',), 'negative_polite',
+     lambda c: _swap_ending(c['polite'], 'ます', 'ません')),
+    ('past_polite = polite ます→ました', ('verb',), 'past_polite',
+     lambda c: _swap_ending(c['polite'], 'ます', 'ました')),
+    ('past_negative_polite = negative_polite + でした', ('verb', 'na-adj'), 'past_negative_polite',
+     lambda c: c['negative_polite'] + 'でした'),
+    ('past_plain = te_form て→た', ('verb',), 'past_plain',
+     lambda c: c['te_form'][:-1] + _TE_TO_TA.get(c['te_form'][-1:], '?')),
+    ('causative_passive = causative る→られる', ('verb',), 'causative_passive',
+     lambda c: _swap_ending(c['causative'], 'る', 'られる')),
+    ('negative_polite = negative_plain + です', ('i-adj',), 'negative_polite',
+     lambda c: c['negative_plain'] + 'です'),
+    ('past_polite = past_plain + です', ('i-adj',), 'past_polite',
+     lambda c: c['past_plain'] + 'です'),
+    ('past_negative_polite = past_negative_plain + です', ('i-adj',), 'past_negative_polite',
+     lambda c: c['past_negative_plain'] + 'です'),
+]
+
+# Hand-checked answers, independent of the engine everything else is compared with
+SPOT_CHECKS = [
+    ("いく", "godan", "いって", "いかない"),       # Iku exception
+    ("かえる", "godan", "かえって", "かえらない"), # Godan Ru-trap
+    ("たべる", "ichidan", "たべて", "たべない"),   # Standard Ichidan
+    ("くる", "kuru", "きて", "こない"),            # Irregular
+    ("よい", "i-adj", "よくて", "よくない")        # Adjective exception; polite stays いいです
+]
+
+
+def verify_chunk(words):
+    """Check one slice of entries. Returns (forms checked, [issue, ...])."""
+    issues = []
+    checked = 0
+    expected_all = conjugate_many((w['dictionary_form']['kana'], w['group']) for w in words)
+
+    for word, expected in zip(words, expected_all):
+        entry_id = word['id']
+        conj = word['conjugations']
+        group_type = WORD_TYPE_BY_GROUP.get(word['group'])
+        word_type = word.get('word_type') or group_type
+
+        if group_type != word_type:
+            issues.append({'id': entry_id, 'kind': 'schema', 'form': 'word_type',
+                           'expected': group_type, 'actual': word_type})
+        forms = FORMS_BY_WORD_TYPE.get(word_type, ())
+        if tuple(conj) != forms:
+            issues.append({'id': entry_id, 'kind': 'schema', 'form': 'conjugations',
+                           'expected': list(forms), 'actual': list(conj)})
+
+        if expected is None:
+            issues.append({'id': entry_id, 'kind': 'unconjugatable', 'form': None,
+                           'expected': None, 'actual': word['dictionary_form']['kana']})
+        else:
+            for form, value in expected.items():
+                checked += 1
+                if conj.get(form) != value:
+                    issues.append({'id': entry_id, 'kind': 'mismatch', 'form': form,
+                                   'expected': value, 'actual': conj.get(form)})
+
+        for name, word_types, form, derive in INVARIANTS:
+            if word_type not in word_types:
+                continue
+            try:
+                derived = derive(conj)
+            except KeyError:
+                continue  # missing forms are already reported as schema issues
+            if conj.get(form) != derived:
+                issues.append({'id': entry_id, 'kind': 'invariant', 'form': form, 'rule': name,
+                               'expected': derived, 'actual': conj.get(form)})
+    return checked, issues
+
+
+def spot_check(words):
+    """The original hand-written checks, printed as a table. Returns the failure count."""
+    by_kana = {w["dictionary_form"]["kana"]: w for w in words}
+    by_id = {w["id"]: w for w in words}
+    failures = 0
 
-def verify():
-    with open("src/data/dictionaries/dictionary.json", "r", encoding="utf-8") as f:
-        data = json.load(f)
-    
-    words = {w["dictionary_form"]["kana"]: w for w in data["words"]}
-    words_by_id = {w["id"]: w for w in data["words"]}
-    
-    # Target words that are commonly conjugated incorrectly in automated scripts
-    test_cases = [
-        ("いく", "godan", "いって", "いかない"),       # Iku exception
-        ("かえる", "godan", "かえって", "かえらない"), # Godan Ru-trap
-        ("たべる", "ichidan", "たべて", "たべない"),   # Standard Ichidan
-        ("くる", "kuru", "きて", "こない"),            # Irregular
-        ("よい", "i-adj", "よくて", "よくない")        # Adjective exception; polite stays いいです
-    ]
-    
     print(f"{'Word':<10} | {'Group':<10} | {'Te-Form':<10} | {'Negative':<10} | {'Status'}")
     print("-" * 65)
-    
-    for kana, group, exp_te, exp_neg in test_cases:
-        w = words.get(kana)
+    for kana, group, exp_te, exp_neg in SPOT_CHECKS:
+        w = by_kana.get(kana)
         if not w and kana == "よい":
-            w = words.get("いい") or words_by_id.get("ia_yoi")
+            w = by_kana.get("いい") or by_id.get("ia_yoi")
         if not w:
             print(f"{kana:<10} | {'MISSING':<10}")
             continue
-            
+
         te = w["conjugations"].get("te_form", "")
         neg = w["conjugations"].get("negative_plain", "")
-        
         is_correct = (te == exp_te and neg == exp_neg and w["group"] == group)
+        failures += not is_correct
         status = "✅ PASS" if is_correct else "❌ FAIL"
-        
         print(f"{kana:<10} | {w['group']:<10} | {te:<10} | {neg:<10} | {status}")
         if not is_correct:
             print(f"   Expected: {group:<10} | {exp_te:<10} | {exp_neg:<10}")
+    return failures
+
+
+def verify_file(path, workers):
+    """Verify one dictionary file. Returns its report section."""
+    start = time.perf_counter()
+    with open(path, "r", encoding="utf-8") as f:
+        words = json.load(f)["words"]
+    loaded = time.perf_counter()
+
+    issues = []
+    seen = set()
+    for word in words:
+        if word['id'] in seen:
+            issues.append({'id': word['id'], 'kind': 'duplicate_id', 'form': None,
+                           'expected': None, 'actual': word['id']})
+        seen.add(word['id'])
+
+    # One chunk per worker, so --workers splits the file whatever its size
+    size = max(MIN_CHUNK_SIZE, -(-len(words) // max(workers, 1)))
+    chunks = [words[i:i + size] for i in range(0, len(words), size)]
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+            results = list(pool.map(verify_chunk, chunks))
+    else:
+        results = [verify_chunk(chunk) for chunk in chunks]
+    checked = sum(n for n, _ in results)
+    for _, chunk_issues in results:
+        issues.extend(chunk_issues)
+    verified = time.perf_counter()
+
+    print(f"\n=== {path} ===")
+    spot_failures = spot_check(words)
+    counts = {}
+    for issue in issues:
+        counts[issue['kind']] = counts.get(issue['kind'], 0) + 1
+
+    return {
+        'file': path,
+        'entries': len(words),
+        'forms_checked': checked,
+        'spot_check_failures': spot_failures,
+        'issue_counts': counts,
+        'issues': issues,
+        'timing': {
+            'load_seconds': round(loaded - start, 4),
+            'verify_seconds': round(verified - loaded, 4),
+            'chunks': len(chunks),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('files', nargs='*', default=DICTIONARY_FILES)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='processes to verify with (default: %(default)s)')
+    parser.add_argument('--report', default=REPORT_FILE,
+                        help='JSON report path, "-" for stdout (default: %(default)s)')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    sections = [verify_file(path, args.workers) for path in args.files]
+    elapsed = time.perf_counter() - start
+    report = {
+        'workers': args.workers,
+        'seconds': round(elapsed, 4),
+        'files': sections,
+    }
+
+    body = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.report == '-':
+        print(body)
+    else:
+        os.makedirs(os.path.dirname(args.report) or '.', exist_ok=True)
+        with open(args.report, 'w', encoding='utf-8') as f:
+            f.write(body)
+
+    print(f"\n{'File':<42} | {'Entries':>7} | {'Forms':>7} | {'Issues':>6} | {'Seconds':>7}")
+    print("-" * 80)
+    failed = False
+    for section in sections:
+        n_issues = len(section['issues']) + section['spot_check_failures']
+        failed |= n_issues > 0
+        seconds = section['timing']['load_seconds'] + section['timing']['verify_seconds']
+        print(f"{section['file']:<42} | {section['entries']:>7} | {section['forms_checked']:>7} | "
+              f"{n_issues:>6} | {seconds:>7.3f}")
+        for kind, count in sorted(section['issue_counts'].items()):
+            print(f"   {kind}: {count}")
+    print(f"Total {elapsed:.3f}s with {args.workers} workers; report: {args.report}")
+    print("❌ FAIL" if failed else "✅ PASS")
+    sys.exit(1 if failed else 0)
+
 
 if __name__ == "__main__":
-    verify()
+    main()